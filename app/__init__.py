@@ -26,19 +26,79 @@ def create_app():
         'pool_pre_ping': True
     }
 
+    # Snapshot de l'index d'autocomplétion (flask --app run autocomplete-index)
+    app.config['AUTOCOMPLETE_INDEX'] = os.getenv(
+        'AUTOCOMPLETE_INDEX',
+        os.path.join(os.path.dirname(app.root_path), 'data', 'autocomplete.idx')
+    )
+
+    # Snapshot colonnaire des facettes (flask --app run facets-snapshot)
+    app.config['FACETS_SNAPSHOT'] = os.getenv(
+        'FACETS_SNAPSHOT',
+        os.path.join(os.path.dirname(app.root_path), 'data', 'facets')
+    )
+
+    # Cache des recherches partagé entre workers (SEARCH_CACHE_PATH vide : désactivé)
+    app.config['SEARCH_CACHE_PATH'] = os.getenv(
+        'SEARCH_CACHE_PATH',
+        os.path.join(os.path.dirname(app.root_path), 'data', 'search_cache.sqlite')
+    )
+    app.config['SEARCH_CACHE_MAX_ENTRIES'] = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 10000))
+    app.config['SEARCH_CACHE_TTL'] = int(os.getenv('SEARCH_CACHE_TTL', 600))
+
+    # Instrumentation SQL (désactivée par défaut) : Server-Timing, instructions
+    # lentes consignées dans un journal rotatif, EXPLAIN ANALYZE en option,
+    # page /debug/sql (ADMIN_TOKEN vide : fermée)
+    app.config['SQL_PROFILING'] = os.getenv('SQL_PROFILING', '0') == '1'
+    app.config['SQL_SLOW_MS'] = float(os.getenv('SQL_SLOW_MS', 500))
+    app.config['SQL_EXPLAIN'] = os.getenv('SQL_EXPLAIN', '0') == '1'
+    app.config['SQL_EXPLAIN_INTERVAL'] = float(os.getenv('SQL_EXPLAIN_INTERVAL', 60))
+    app.config['SQL_SLOW_LOG'] = os.getenv(
+        'SQL_SLOW_LOG',
+        os.path.join(os.path.dirname(app.root_path), 'data', 'slow_queries.log')
+    )
+    app.config['ADMIN_TOKEN'] = os.getenv('ADMIN_TOKEN', '')
+
     # Initialisation extensions
     db.init_app(app)
     migrate.init_app(app, db)
 
+    from app.utils import sql_profiler
+    with app.app_context():
+        sql_profiler.init_app(app, db.engine)
+
     # Enregistrement des blueprints
     from app.routes.main import main_bp
     from app.routes.search import search_bp
     from app.routes.entreprise import entreprise_bp
     from app.routes.export import export_bp
+    from app.routes.debug import debug_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(search_bp, url_prefix='/search')
     app.register_blueprint(entreprise_bp, url_prefix='/entreprise')
     app.register_blueprint(export_bp, url_prefix='/export')
+    app.register_blueprint(debug_bp, url_prefix='/debug')
+
+    @app.cli.command('autocomplete-index')
+    def autocomplete_index():
+        """Construit le snapshot de l'index d'autocomplétion"""
+        from app.utils.autocomplete import build_snapshot, load_rows, write_snapshot
+        from app.utils.cache import current_generation
+
+        path = app.config['AUTOCOMPLETE_INDEX']
+        data = build_snapshot(load_rows(), generation=current_generation())
+        write_snapshot(path, data)
+        print(f"Index d'autocomplétion écrit : {path} ({len(data) / 1024**2:,.1f} Mo)")
+
+    @app.cli.command('facets-snapshot')
+    def facets_snapshot():
+        """Construit le snapshot colonnaire des facettes"""
+        from app.utils.cache import current_generation
+        from app.utils.facets import build_snapshot, load_rows
+
+        path = app.config['FACETS_SNAPSHOT']
+        rows = build_snapshot(load_rows(), path, generation=current_generation())
+        print(f"Snapshot des facettes écrit : {path} ({rows:,} entreprises)")
 
     return app
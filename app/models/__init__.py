@@ -1,4 +1,5 @@
 from app.models.unite_legale import UniteLegale
 from app.models.etablissement import Etablissement
+from app.models.search_document import SearchDocument
 
-__all__ = ['UniteLegale', 'Etablissement']
+__all__ = ['UniteLegale', 'Etablissement', 'SearchDocument']
@@ -48,6 +48,8 @@ class Etablissement(db.Model):
     # Géolocalisation
     coordonnee_lambert_x = db.Column(db.Numeric(15, 2))
     coordonnee_lambert_y = db.Column(db.Numeric(15, 2))
+    latitude = db.Column(db.Numeric(9, 6))     # WGS84, calculées à l'import
+    longitude = db.Column(db.Numeric(9, 6))
     identifiant_adresse = db.Column(db.String(50))
 
     # Dates
@@ -82,6 +84,13 @@ class Etablissement(db.Model):
         """Retourne l'adresse sur une seule ligne"""
         return self.adresse_complete.replace('\n', ', ')
 
+    @property
+    def gps(self):
+        """Retourne (latitude, longitude) WGS84 ou (None, None)"""
+        if self.latitude is None or self.longitude is None:
+            return None, None
+        return float(self.latitude), float(self.longitude)
+
     @property
     def est_actif(self):
         """Vérifie si l'établissement est actif"""
@@ -107,6 +116,8 @@ class Etablissement(db.Model):
             'adresse': self.adresse_ligne,
             'code_postal': self.code_postal,
             'ville': self.libelle_commune,
+            'latitude': float(self.latitude) if self.latitude is not None else None,
+            'longitude': float(self.longitude) if self.longitude is not None else None,
             'date_creation': self.date_creation.isoformat() if self.date_creation else None
         }
 
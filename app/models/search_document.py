@@ -0,0 +1,88 @@
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app import db
+
+
+class SearchDocument(db.Model):
+    """
+    Document de recherche : une ligne par entreprise avec son siège
+
+    Table dénormalisée reconstruite par scripts/import_csv.py après chaque
+    import. Lecture seule côté application.
+    """
+    __tablename__ = 'search_document'
+
+    siren = db.Column(db.String(9), primary_key=True)
+    nom_complet = db.Column(db.String(255))
+    nom_recherche = db.Column(db.Text)
+    noms_secondaires = db.deferred(db.Column(db.Text))
+    denomination = db.Column(db.String(255))
+    sigle = db.Column(db.String(50))
+    nom = db.Column(db.String(100))
+    prenom_1 = db.Column(db.String(100))
+    categorie_juridique = db.Column(db.String(10))
+    activite_principale = db.Column(db.String(10))
+    categorie_entreprise = db.Column(db.String(5))
+    tranche_effectifs = db.Column(db.String(5))
+    etat_administratif = db.Column(db.String(1))
+    date_creation = db.Column(db.Date)
+
+    # Siège
+    siret_siege = db.Column(db.String(14))
+    adresse = db.Column(db.String(500))
+    code_postal = db.Column(db.String(10))
+    code_commune = db.Column(db.String(10))
+    libelle_commune = db.Column(db.String(100))
+    latitude = db.Column(db.Numeric(9, 6))
+    longitude = db.Column(db.Numeric(9, 6))
+
+    # Plein texte (colonne générée, index GIN idx_sd_recherche)
+    recherche = db.deferred(db.Column(TSVECTOR))
+
+    @property
+    def est_active(self):
+        """Vérifie si l'entreprise est active"""
+        return self.etat_administratif == 'A'
+
+    @property
+    def adresse_voie(self):
+        """Adresse du siège sans code postal ni commune (colonnes à part des exports)"""
+        adresse = self.adresse or ''
+        ville = ' '.join(filter(None, [self.code_postal, self.libelle_commune]))
+        if ville and adresse.endswith(ville):
+            adresse = adresse[:-len(ville)].rstrip(', ')
+        return adresse
+
+    @property
+    def gps(self):
+        """Retourne (latitude, longitude) WGS84 du siège ou (None, None)"""
+        if self.latitude is None or self.longitude is None:
+            return None, None
+        return float(self.latitude), float(self.longitude)
+
+    def to_dict(self):
+        """Sérialisation pour API (mêmes clés que UniteLegale.to_dict + siège)"""
+        data = {
+            'siren': self.siren,
+            'denomination': self.nom_complet,
+            'sigle': self.sigle,
+            'categorie_juridique': self.categorie_juridique,
+            'activite_principale': self.activite_principale,
+            'categorie_entreprise': self.categorie_entreprise,
+            'tranche_effectifs': self.tranche_effectifs,
+            'etat_administratif': self.etat_administratif,
+            'est_active': self.est_active,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'siret_siege': self.siret_siege
+        }
+        if self.siret_siege:
+            data['siege'] = {
+                'siret': self.siret_siege,
+                'adresse': self.adresse or '',
+                'code_postal': self.code_postal,
+                'ville': self.libelle_commune
+            }
+        return data
+
+    def __repr__(self):
+        return f'<SearchDocument {self.siren} - {self.nom_complet}>'
@@ -0,0 +1,28 @@
+import hmac
+
+from flask import Blueprint, render_template, request, current_app, abort
+from app.utils.sql_profiler import route_stats, slow_entries
+
+debug_bp = Blueprint('debug', __name__)
+
+
+@debug_bp.before_request
+def require_admin():
+    """Accès réservé : jeton ADMIN_TOKEN (en-tête X-Admin-Token ou paramètre token)"""
+    expected = current_app.config['ADMIN_TOKEN']
+    given = request.headers.get('X-Admin-Token') or request.args.get('token', '')
+    if not expected or not hmac.compare_digest(given.encode(), expected.encode()):
+        abort(404)
+
+
+@debug_bp.route('/sql')
+def sql():
+    """Instrumentation SQL : agrégats par route et instructions lentes"""
+    return render_template(
+        'debug/sql.html',
+        enabled=current_app.config['SQL_PROFILING'],
+        slow_ms=current_app.config['SQL_SLOW_MS'],
+        explain=current_app.config['SQL_EXPLAIN'],
+        routes=route_stats(),
+        entries=slow_entries(current_app.config['SQL_SLOW_LOG']) if current_app.config['SQL_SLOW_LOG'] else []
+    )
@@ -1,6 +1,5 @@
 from flask import Blueprint, render_template, jsonify, abort
-from app.models import UniteLegale, Etablissement
-from app import db
+from app.utils.etablissements import load_entreprise, split_siege
 
 entreprise_bp = Blueprint('entreprise', __name__)
 
@@ -12,27 +11,13 @@ def detail(siren):
     if not siren.isdigit() or len(siren) != 9:
         abort(400, description="SIREN invalide")
 
-    entreprise = db.session.query(UniteLegale).get(siren)
+    # Entreprise puis établissements (siège en premier, actifs ensuite)
+    entreprise, etablissements = load_entreprise(siren)
     if not entreprise:
         abort(404, description="Entreprise non trouvée")
 
-    # Récupérer les établissements
-    etablissements = db.session.query(Etablissement).filter_by(
-        siren=siren
-    ).order_by(
-        Etablissement.etablissement_siege.desc(),  # Siège en premier
-        Etablissement.etat_administratif.asc(),    # Actifs en premier
-        Etablissement.date_creation.desc()
-    ).all()
-
     # Séparer siège et autres établissements
-    siege = None
-    autres = []
-    for etab in etablissements:
-        if etab.etablissement_siege:
-            siege = etab
-        else:
-            autres.append(etab)
+    siege, autres = split_siege(etablissements)
 
     return render_template(
         'entreprise/detail.html',
@@ -49,18 +34,10 @@ def detail_json(siren):
     if not siren.isdigit() or len(siren) != 9:
         return jsonify({'error': 'SIREN invalide'}), 400
 
-    entreprise = db.session.query(UniteLegale).get(siren)
+    entreprise, etablissements = load_entreprise(siren)
     if not entreprise:
         return jsonify({'error': 'Entreprise non trouvée'}), 404
 
-    # Récupérer les établissements
-    etablissements = db.session.query(Etablissement).filter_by(
-        siren=siren
-    ).order_by(
-        Etablissement.etablissement_siege.desc(),
-        Etablissement.etat_administratif.asc()
-    ).all()
-
     return jsonify({
         'entreprise': entreprise.to_dict(),
         'etablissements': [e.to_dict() for e in etablissements],
@@ -70,26 +47,22 @@ def detail_json(siren):
 
 @entreprise_bp.route('/siret/<siret>')
 def detail_by_siret(siret):
-    """Redirection SIRET vers page entreprise"""
+    """Page entreprise avec l'établissement du SIRET mis en évidence"""
     if not siret.isdigit() or len(siret) != 14:
         abort(400, description="SIRET invalide")
 
-    etab = db.session.query(Etablissement).get(siret)
-    if not etab:
+    # Le SIREN est le préfixe du SIRET : mêmes requêtes que la page entreprise
+    entreprise, etablissements = load_entreprise(siret[:9])
+    if not any(e.siret == siret for e in etablissements):
         abort(404, description="Établissement non trouvé")
 
-    # Rediriger vers la page entreprise avec ancre sur l'établissement
+    siege, autres = split_siege(etablissements)
+
     return render_template(
         'entreprise/detail.html',
-        entreprise=etab.unite_legale,
-        siege=db.session.query(Etablissement).filter_by(
-            siren=etab.siren,
-            etablissement_siege=True
-        ).first(),
-        etablissements=db.session.query(Etablissement).filter(
-            Etablissement.siren == etab.siren,
-            Etablissement.etablissement_siege == False
-        ).all(),
-        total_etablissements=db.session.query(Etablissement).filter_by(siren=etab.siren).count(),
+        entreprise=entreprise,
+        siege=siege,
+        etablissements=autres,
+        total_etablissements=len(etablissements),
         highlight_siret=siret
     )
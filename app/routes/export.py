@@ -1,8 +1,11 @@
 from flask import Blueprint, request, jsonify, Response, send_file
-from sqlalchemy import or_
-from app.models import UniteLegale, Etablissement
+from app.models import SearchDocument
 from app import db
-from app.utils.geo import lambert93_to_gps, format_gps_link
+from app.utils.geo import format_gps_link
+from app.utils.search import search_params, apply_search_filters, order_by_relevance
+from app.utils.etablissements import (
+    unique_sirens, load_with_siege, load_etablissements, load_entreprise
+)
 import csv
 import io
 from datetime import datetime
@@ -32,18 +35,11 @@ def export_entreprise_excel(siren):
     if not siren.isdigit() or len(siren) != 9:
         return jsonify({'error': 'SIREN invalide'}), 400
 
-    entreprise = db.session.query(UniteLegale).get(siren)
+    # Entreprise et établissements (siège en premier)
+    entreprise, etablissements = load_entreprise(siren)
     if not entreprise:
         return jsonify({'error': 'Entreprise non trouvée'}), 404
 
-    # Récupérer les établissements
-    etablissements = db.session.query(Etablissement).filter_by(
-        siren=siren
-    ).order_by(
-        Etablissement.etablissement_siege.desc(),
-        Etablissement.etat_administratif.asc()
-    ).all()
-
     # Créer le workbook
     wb = Workbook()
 
@@ -126,8 +122,8 @@ def export_entreprise_excel(siren):
 
     # Données établissements
     for row_idx, etab in enumerate(etablissements, start=2):
-        # Conversion coordonnées GPS
-        lat, lon = lambert93_to_gps(etab.coordonnee_lambert_x, etab.coordonnee_lambert_y)
+        # Coordonnées GPS calculées à l'import
+        lat, lon = etab.gps
         gps_link = format_gps_link(lat, lon)
 
         data = [
@@ -198,11 +194,10 @@ def export_csv():
     if not sirens:
         return jsonify({'error': 'Liste de SIREN requise'}), 400
 
-    sirens = sirens[:10000]
+    sirens = unique_sirens(sirens)[:10000]
 
-    entreprises = db.session.query(UniteLegale).filter(
-        UniteLegale.siren.in_(sirens)
-    ).all()
+    # Entreprises et sièges en une seule requête
+    entreprises = load_with_siege(sirens)
 
     output = io.StringIO()
     writer = csv.writer(output, delimiter=';', quotechar='"')
@@ -214,15 +209,10 @@ def export_csv():
         'Code Postal', 'Ville', 'Latitude', 'Longitude'
     ])
 
-    for e in entreprises:
-        siege = db.session.query(Etablissement).filter_by(
-            siren=e.siren,
-            etablissement_siege=True
-        ).first()
-
+    for e, siege in entreprises:
         lat, lon = (None, None)
         if siege:
-            lat, lon = lambert93_to_gps(siege.coordonnee_lambert_x, siege.coordonnee_lambert_y)
+            lat, lon = siege.gps
 
         writer.writerow([
             e.siren,
@@ -259,17 +249,10 @@ def export_etablissements_csv(siren):
     if not siren.isdigit() or len(siren) != 9:
         return jsonify({'error': 'SIREN invalide'}), 400
 
-    entreprise = db.session.query(UniteLegale).get(siren)
+    entreprise, etablissements = load_entreprise(siren)
     if not entreprise:
         return jsonify({'error': 'Entreprise non trouvée'}), 404
 
-    etablissements = db.session.query(Etablissement).filter_by(
-        siren=siren
-    ).order_by(
-        Etablissement.etablissement_siege.desc(),
-        Etablissement.etat_administratif.asc()
-    ).all()
-
     output = io.StringIO()
     writer = csv.writer(output, delimiter=';', quotechar='"')
 
@@ -280,7 +263,7 @@ def export_etablissements_csv(siren):
     ])
 
     for e in etablissements:
-        lat, lon = lambert93_to_gps(e.coordonnee_lambert_x, e.coordonnee_lambert_y)
+        lat, lon = e.gps
         gps_link = format_gps_link(lat, lon)
 
         writer.writerow([
@@ -320,44 +303,10 @@ def export_search_excel():
     except ImportError:
         return jsonify({'error': 'openpyxl non installé'}), 500
 
-    q = request.args.get('q', '').strip()
-    code_postal = request.args.get('code_postal', '').strip()
-    ville = request.args.get('ville', '').strip()
-    activite = request.args.get('activite', '').strip()
-    categorie = request.args.get('categorie', '').strip()
-    etat = request.args.get('etat', '').strip()
-
-    query = db.session.query(UniteLegale)
-
-    if q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            or_(
-                UniteLegale.denomination.ilike(search_term),
-                UniteLegale.sigle.ilike(search_term),
-                UniteLegale.nom.ilike(search_term),
-                UniteLegale.siren.like(search_term)
-            )
-        )
-
-    if activite:
-        query = query.filter(UniteLegale.activite_principale.like(f"{activite}%"))
-    if categorie:
-        query = query.filter(UniteLegale.categorie_entreprise == categorie)
-    if etat:
-        query = query.filter(UniteLegale.etat_administratif == etat)
-
-    if code_postal or ville:
-        subquery = db.session.query(Etablissement.siren).filter(
-            Etablissement.etablissement_siege == True
-        )
-        if code_postal:
-            subquery = subquery.filter(Etablissement.code_postal.like(f"{code_postal}%"))
-        if ville:
-            subquery = subquery.filter(Etablissement.libelle_commune.ilike(f"%{ville}%"))
-        query = query.filter(UniteLegale.siren.in_(subquery))
-
-    entreprises = query.limit(10000).all()
+    # Une seule table : entreprise et siège dans search_document
+    params = search_params(request.args)
+    query = apply_search_filters(db.session.query(SearchDocument), params)
+    entreprises = order_by_relevance(query, params).limit(10000).all()
 
     if not entreprises:
         return jsonify({'error': 'Aucun résultat à exporter'}), 404
@@ -388,16 +337,8 @@ def export_search_excel():
         cell.alignment = Alignment(horizontal='center')
 
     for row_idx, e in enumerate(entreprises, start=2):
-        siege = db.session.query(Etablissement).filter_by(
-            siren=e.siren,
-            etablissement_siege=True
-        ).first()
-
-        lat, lon = (None, None)
-        gps_link = None
-        if siege:
-            lat, lon = lambert93_to_gps(siege.coordonnee_lambert_x, siege.coordonnee_lambert_y)
-            gps_link = format_gps_link(lat, lon)
+        lat, lon = e.gps
+        gps_link = format_gps_link(lat, lon)
 
         data = [
             e.siren,
@@ -411,10 +352,10 @@ def export_search_excel():
             e.tranche_effectifs or '',
             'Actif' if e.etat_administratif == 'A' else 'Cessé',
             e.date_creation.strftime('%d/%m/%Y') if e.date_creation else '',
-            siege.siret if siege else '',
-            siege.adresse_ligne if siege else '',
-            siege.code_postal if siege else '',
-            siege.libelle_commune if siege else '',
+            e.siret_siege or '',
+            e.adresse_voie,
+            e.code_postal or '',
+            e.libelle_commune or '',
             lat or '',
             lon or '',
             gps_link or ''
@@ -447,16 +388,10 @@ def export_search_excel():
         cell.alignment = Alignment(horizontal='center')
 
     # Récupérer tous les établissements des entreprises trouvées
-    sirens = [e.siren for e in entreprises]
-    etablissements = db.session.query(Etablissement).filter(
-        Etablissement.siren.in_(sirens)
-    ).order_by(
-        Etablissement.siren,
-        Etablissement.etablissement_siege.desc()
-    ).all()
+    etablissements = load_etablissements([e.siren for e in entreprises])
 
     for row_idx, etab in enumerate(etablissements, start=2):
-        lat, lon = lambert93_to_gps(etab.coordonnee_lambert_x, etab.coordonnee_lambert_y)
+        lat, lon = etab.gps
         gps_link = format_gps_link(lat, lon)
 
         data = [
@@ -505,44 +440,10 @@ def export_search_excel():
 @export_bp.route('/search/csv')
 def export_search_csv():
     """Export des résultats de recherche en CSV avec GPS"""
-    q = request.args.get('q', '').strip()
-    code_postal = request.args.get('code_postal', '').strip()
-    ville = request.args.get('ville', '').strip()
-    activite = request.args.get('activite', '').strip()
-    categorie = request.args.get('categorie', '').strip()
-    etat = request.args.get('etat', '').strip()
-
-    query = db.session.query(UniteLegale)
-
-    if q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            or_(
-                UniteLegale.denomination.ilike(search_term),
-                UniteLegale.sigle.ilike(search_term),
-                UniteLegale.nom.ilike(search_term),
-                UniteLegale.siren.like(search_term)
-            )
-        )
-
-    if activite:
-        query = query.filter(UniteLegale.activite_principale.like(f"{activite}%"))
-    if categorie:
-        query = query.filter(UniteLegale.categorie_entreprise == categorie)
-    if etat:
-        query = query.filter(UniteLegale.etat_administratif == etat)
-
-    if code_postal or ville:
-        subquery = db.session.query(Etablissement.siren).filter(
-            Etablissement.etablissement_siege == True
-        )
-        if code_postal:
-            subquery = subquery.filter(Etablissement.code_postal.like(f"{code_postal}%"))
-        if ville:
-            subquery = subquery.filter(Etablissement.libelle_commune.ilike(f"%{ville}%"))
-        query = query.filter(UniteLegale.siren.in_(subquery))
-
-    entreprises = query.limit(10000).all()
+    # Une seule table : entreprise et siège dans search_document
+    params = search_params(request.args)
+    query = apply_search_filters(db.session.query(SearchDocument), params)
+    entreprises = order_by_relevance(query, params).limit(10000).all()
 
     output = io.StringIO()
     writer = csv.writer(output, delimiter=';', quotechar='"')
@@ -555,16 +456,8 @@ def export_search_csv():
     ])
 
     for e in entreprises:
-        siege = db.session.query(Etablissement).filter_by(
-            siren=e.siren,
-            etablissement_siege=True
-        ).first()
-
-        lat, lon = (None, None)
-        gps_link = None
-        if siege:
-            lat, lon = lambert93_to_gps(siege.coordonnee_lambert_x, siege.coordonnee_lambert_y)
-            gps_link = format_gps_link(lat, lon)
+        lat, lon = e.gps
+        gps_link = format_gps_link(lat, lon)
 
         writer.writerow([
             e.siren,
@@ -576,10 +469,10 @@ def export_search_csv():
             e.tranche_effectifs or '',
             'Actif' if e.est_active else 'Cessé',
             e.date_creation.strftime('%d/%m/%Y') if e.date_creation else '',
-            siege.siret if siege else '',
-            siege.adresse_ligne if siege else '',
-            siege.code_postal if siege else '',
-            siege.libelle_commune if siege else '',
+            e.siret_siege or '',
+            e.adresse_voie,
+            e.code_postal or '',
+            e.libelle_commune or '',
             lat or '',
             lon or '',
             gps_link or ''
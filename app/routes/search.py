@@ -1,6 +1,18 @@
-from flask import Blueprint, render_template, request, jsonify
-from sqlalchemy import or_, and_, func
-from app.models import UniteLegale, Etablissement
+from flask import Blueprint, render_template, request, jsonify, current_app, Response, stream_with_context
+from app.models import SearchDocument
+from app.utils.search import (
+    search_params, apply_search_filters, order_by_relevance, filter_identifier, sort_keys
+)
+from app.utils.pagination import (
+    TOTAL_MODES, InvalidCursor, params_fingerprint, encode_cursor, decode_cursor,
+    keyset_page, count_results
+)
+from app.utils.etablissements import unique_sirens, load_with_siege
+from app.utils.autocomplete import get_index
+from app.utils.cache import cached_response, get_cache, current_generation
+from app.utils.facets import NUMPY_AVAILABLE, get_snapshot, text_sirens, count_in_database
+from app.utils.geo_search import search_radius, search_nearest, MAX_RADIUS_KM, MAX_RESULTS
+from app.utils.bulk import iter_request_identifiers, load_lookup, stream_lookup
 from app import db
 
 search_bp = Blueprint('search', __name__)
@@ -13,97 +25,53 @@ def search_page():
 
 
 @search_bp.route('/api')
+@cached_response('search')
 def search_api():
-    """API de recherche d'entreprises"""
+    """
+    API de recherche d'entreprises (table search_document)
+
+    Deux paginations :
+    - par curseur (paramètre cursor, vide pour la première page) : coût
+      constant par page, jeton opaque next pour la page suivante, total
+      calculé sur la première page seulement (total=exact, borné à
+      COUNT_CAP, ou total=estimation, estimé par le planificateur) ;
+    - par numéro de page (page) : OFFSET et COUNT(*) complet.
+    """
     # Paramètres de recherche
-    q = request.args.get('q', '').strip()
+    params = search_params(request.args)
     siren = request.args.get('siren', '').strip()
     siret = request.args.get('siret', '').strip()
-    code_postal = request.args.get('code_postal', '').strip()
-    ville = request.args.get('ville', '').strip()
-    activite = request.args.get('activite', '').strip()
-    categorie = request.args.get('categorie', '').strip()
-    etat = request.args.get('etat', '').strip()
 
     # Pagination
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 25, type=int)
-    per_page = min(per_page, 100)  # Max 100 résultats par page
+    per_page = max(1, min(per_page, 100))  # Max 100 résultats par page
 
     # Construction de la requête
-    query = db.session.query(UniteLegale)
+    query = db.session.query(SearchDocument)
 
-    # Recherche par SIREN exact
+    # Recherche par SIREN ou SIRET exact (clé primaire)
     if siren:
-        query = query.filter(UniteLegale.siren == siren)
-
-    # Recherche par SIRET (via établissement)
+        query = filter_identifier(query, 'siren', siren)
+        params['q'] = ''
     elif siret:
-        etab = db.session.query(Etablissement).filter_by(siret=siret).first()
-        if etab:
-            query = query.filter(UniteLegale.siren == etab.siren)
-        else:
-            return jsonify({'results': [], 'total': 0, 'page': page, 'pages': 0})
-
-    # Recherche textuelle
-    elif q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            or_(
-                UniteLegale.denomination.ilike(search_term),
-                UniteLegale.sigle.ilike(search_term),
-                UniteLegale.nom.ilike(search_term),
-                UniteLegale.siren.like(search_term)
-            )
-        )
+        query = filter_identifier(query, 'siret', siret)
+        params['q'] = ''
 
-    # Filtres additionnels
-    if activite:
-        query = query.filter(UniteLegale.activite_principale.like(f"{activite}%"))
+    # Recherche textuelle et filtres additionnels
+    query = apply_search_filters(query, params)
 
-    if categorie:
-        query = query.filter(UniteLegale.categorie_entreprise == categorie)
+    if 'cursor' in request.args:
+        return search_api_keyset(query, dict(params, siren=siren, siret=siret), per_page)
 
-    if etat:
-        query = query.filter(UniteLegale.etat_administratif == etat)
-
-    # Filtre géographique (via établissement siège)
-    if code_postal or ville:
-        subquery = db.session.query(Etablissement.siren).filter(
-            Etablissement.etablissement_siege == True
-        )
-        if code_postal:
-            subquery = subquery.filter(Etablissement.code_postal.like(f"{code_postal}%"))
-        if ville:
-            subquery = subquery.filter(Etablissement.libelle_commune.ilike(f"%{ville}%"))
-        query = query.filter(UniteLegale.siren.in_(subquery))
-
-    # Tri par pertinence (entreprises actives d'abord)
-    query = query.order_by(
-        UniteLegale.etat_administratif.asc(),  # A avant C
-        UniteLegale.denomination.asc()
-    )
+    # Tri par pertinence (score plein texte, entreprises actives favorisées)
+    query = order_by_relevance(query, params)
 
     # Pagination
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
-    # Résultats avec info siège
-    results = []
-    for ul in pagination.items:
-        data = ul.to_dict()
-        # Récupérer info du siège
-        siege = db.session.query(Etablissement).filter_by(
-            siren=ul.siren,
-            etablissement_siege=True
-        ).first()
-        if siege:
-            data['siege'] = {
-                'siret': siege.siret,
-                'adresse': siege.adresse_ligne,
-                'code_postal': siege.code_postal,
-                'ville': siege.libelle_commune
-            }
-        results.append(data)
+    # Résultats avec info siège (déjà dans le document)
+    results = [doc.to_dict() for doc in pagination.items]
 
     return jsonify({
         'results': results,
@@ -114,6 +82,34 @@ def search_api():
     })
 
 
+def search_api_keyset(query, params, per_page):
+    """Page de search_api par curseur (clé de tri stable de sort_keys)"""
+    keys = sort_keys(params)
+    fingerprint = params_fingerprint(params)
+
+    token = request.args.get('cursor', '').strip()
+    try:
+        values = decode_cursor(token, fingerprint, len(keys)) if token else None
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+
+    data = {'per_page': per_page}
+
+    # Total sur la première page uniquement (l'interface le conserve)
+    if values is None:
+        total_mode = request.args.get('total', 'exact')
+        if total_mode not in TOTAL_MODES:
+            return jsonify({'error': f"total doit valoir {' ou '.join(TOTAL_MODES)}"}), 400
+        data['total'], data['total_exact'] = count_results(query, total_mode)
+        data['total_mode'] = total_mode
+
+    items, last = keyset_page(query, keys, per_page, values)
+    data['results'] = [doc.to_dict() for doc in items]
+    data['next'] = encode_cursor(last, fingerprint) if last is not None else None
+
+    return jsonify(data)
+
+
 @search_bp.route('/batch', methods=['POST'])
 def search_batch():
     """Recherche par liste de SIREN"""
@@ -124,27 +120,20 @@ def search_batch():
         return jsonify({'error': 'Liste de SIREN requise'}), 400
 
     # Nettoyer les SIREN
-    sirens = [s.strip() for s in sirens if s.strip()]
-    sirens = sirens[:1000]  # Limiter à 1000 SIREN
+    sirens = unique_sirens(sirens)[:1000]  # Limiter à 1000 SIREN
 
-    # Recherche
-    entreprises = db.session.query(UniteLegale).filter(
-        UniteLegale.siren.in_(sirens)
-    ).all()
+    # Entreprises et sièges en une seule requête
+    entreprises = load_with_siege(sirens)
 
     results = []
-    for ul in entreprises:
+    for ul, siege in entreprises:
         data = ul.to_dict()
-        siege = db.session.query(Etablissement).filter_by(
-            siren=ul.siren,
-            etablissement_siege=True
-        ).first()
         if siege:
             data['siege'] = siege.to_dict()
         results.append(data)
 
     # Identifier les SIREN non trouvés
-    found_sirens = {ul.siren for ul in entreprises}
+    found_sirens = {ul.siren for ul, _ in entreprises}
     not_found = [s for s in sirens if s not in found_sirens]
 
     return jsonify({
@@ -155,27 +144,148 @@ def search_batch():
     })
 
 
+@search_bp.route('/bulk', methods=['POST'])
+def search_bulk():
+    """
+    Recherche en masse de SIREN / SIRET, sans limite de 1000
+
+    Corps : tableau JSON, NDJSON (une valeur ou un objet {siren|siret} par
+    ligne) ou fichier CSV (champ file). Réponse NDJSON en flux : une ligne
+    par identifiant, dans l'ordre reçu (found vrai avec entreprise et siège
+    ou établissement, ou faux), puis une ligne summary.
+    """
+    try:
+        count = load_lookup(iter_request_identifiers(request))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+
+    if not count:
+        db.session.rollback()
+        return jsonify({'error': 'Liste de SIREN ou SIRET requise'}), 400
+
+    return Response(stream_with_context(stream_lookup()), mimetype='application/x-ndjson')
+
+
+@search_bp.route('/geo')
+def search_geo():
+    """
+    Recherche géographique d'établissements autour d'un point GPS
+
+    lat, lon : centre (WGS84) ; rayon (km) : établissements dans le cercle,
+    ou k : les k plus proches ; filtres optionnels activite (préfixe NAF) et
+    etat. Résultats du plus proche au plus éloigné.
+    """
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    rayon = request.args.get('rayon', type=float)
+    k = request.args.get('k', type=int)
+    activite = request.args.get('activite', '').strip()
+    etat = request.args.get('etat', '').strip()
+
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return jsonify({'error': 'lat et lon requis (WGS84)'}), 400
+    if (rayon is None) == (k is None):
+        return jsonify({'error': 'Préciser rayon (km) ou k'}), 400
+
+    if k is not None:
+        if not 1 <= k <= MAX_RESULTS:
+            return jsonify({'error': f'k doit être compris entre 1 et {MAX_RESULTS}'}), 400
+        rows, rayon = search_nearest(lat, lon, k, activite, etat)
+    else:
+        if not 0 < rayon <= MAX_RADIUS_KM:
+            return jsonify({'error': f'rayon doit être compris entre 0 et {MAX_RADIUS_KM} km'}), 400
+        limit = min(request.args.get('limit', 100, type=int), MAX_RESULTS)
+        rows = search_radius(lat, lon, rayon, activite, etat, limit=limit)
+
+    results = []
+    for etab, distance in rows:
+        data = etab.to_dict()
+        data['distance_km'] = round(float(distance), 3)
+        results.append(data)
+
+    return jsonify({
+        'results': results,
+        'total': len(results),
+        'rayon_km': rayon
+    })
+
+
+@search_bp.route('/facets')
+@cached_response('facets')
+def search_facets():
+    """
+    Comptages par facette (NAF, catégorie, tranche d'effectifs, département,
+    état) pour les filtres de search_api, sur le snapshot colonnaire
+    """
+    if not NUMPY_AVAILABLE:
+        return jsonify({'error': 'numpy non installé'}), 500
+
+    params = search_params(request.args)
+    limit = max(1, min(request.args.get('limit', 50, type=int), 1000))
+
+    generation = current_generation()
+    snapshot = get_snapshot(current_app.config['FACETS_SNAPSHOT'], generation)
+    if snapshot is None:
+        return jsonify({'error': 'Snapshot des facettes absent (flask --app run facets-snapshot)'}), 503
+    if snapshot.generation < generation:
+        # Comptages d'anciennes données : SIREN de q absents, totaux faux
+        # (un snapshot plus récent que la génération relue il y a moins de
+        # GENERATION_TTL secondes est valide)
+        return jsonify({
+            'error': 'Snapshot des facettes périmé (flask --app run facets-snapshot)',
+            'generation': snapshot.generation,
+            'generation_donnees': generation,
+        }), 503
+
+    # Recherche textuelle évaluée par PostgreSQL : SIREN retenus seulement,
+    # ou comptages en base si elle en retient trop
+    sirens = None
+    if params['q']:
+        query = apply_search_filters(
+            db.session.query(SearchDocument.siren), {'q': params['q'], 'mode': params['mode']}
+        )
+        sirens = text_sirens(query)
+
+    if params['q'] and sirens is None:
+        data = count_in_database(params, limit)
+        data['source'] = 'base'
+    else:
+        data = snapshot.counts(params, sirens, limit)
+        data['source'] = 'snapshot'
+    data['generation'] = snapshot.generation
+    return jsonify(data)
+
+
 @search_bp.route('/autocomplete')
+@cached_response('autocomplete')
 def autocomplete():
-    """Autocomplétion pour la recherche"""
+    """Autocomplétion pour la recherche (index de préfixes en mémoire)"""
     q = request.args.get('q', '').strip()
 
     if len(q) < 2:
         return jsonify([])
 
-    # Recherche rapide
-    results = db.session.query(
-        UniteLegale.siren,
-        UniteLegale.denomination
-    ).filter(
-        or_(
-            UniteLegale.denomination.ilike(f"{q}%"),
-            UniteLegale.siren.like(f"{q}%")
-        ),
-        UniteLegale.etat_administratif == 'A'
-    ).limit(10).all()
-
-    return jsonify([
-        {'siren': r.siren, 'denomination': r.denomination}
-        for r in results
+    generation = current_generation()
+    index = get_index(current_app.config['AUTOCOMPLETE_INDEX'], generation)
+    if index is None:
+        return jsonify({'error': "Index d'autocomplétion absent (flask --app run autocomplete-index)"}), 503
+
+    response = jsonify([
+        {'siren': siren, 'denomination': denomination}
+        for siren, denomination in index.search(q, limit=10)
     ])
+    if index.generation < generation:
+        # Snapshot pas encore réécrit par l'import : suggestions des données
+        # précédentes, à ne pas mettre en cache sous la nouvelle génération
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@search_bp.route('/cache/stats')
+def cache_stats():
+    """Compteurs du cache de recherche (succès, défauts, entrées)"""
+    cache = get_cache()
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(cache.stats(), enabled=True, generation=current_generation()))
@@ -1,3 +1,14 @@
 from app.utils.geo import lambert93_to_gps, format_gps_link
+from app.utils.search import (
+    search_params, apply_search_filters, order_by_relevance, exact_identifier, filter_identifier
+)
+from app.utils.etablissements import (
+    load_with_siege, load_sieges, load_etablissements, load_entreprise, split_siege
+)
 
-__all__ = ['lambert93_to_gps', 'format_gps_link']
+__all__ = [
+    'lambert93_to_gps', 'format_gps_link',
+    'search_params', 'apply_search_filters', 'order_by_relevance',
+    'exact_identifier', 'filter_identifier',
+    'load_with_siege', 'load_sieges', 'load_etablissements', 'load_entreprise', 'split_siege'
+]
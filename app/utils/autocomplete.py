@@ -0,0 +1,310 @@
+"""
+Index de préfixes en mémoire pour /search/autocomplete
+
+Les noms (nom complet, sigle) et SIREN des entreprises actives sont
+normalisés (minuscules, sans accents ni ponctuation), triés puis cherchés par
+dichotomie. Les suggestions sont classées par nombre d'établissements actifs.
+
+L'index est un fichier binaire (snapshot) ouvert en mmap : les workers
+gunicorn partagent les mêmes pages du cache système. Il est produit par
+scripts/import_csv.py à chaque publication de search_document (ou par
+`flask --app run autocomplete-index`) et porte la génération des données
+(dataset_generation) dont il est issu. Il n'est jamais construit pendant
+une requête : sans snapshot, /search/autocomplete répond 503.
+
+Format (little-endian) :
+    en-tête   MAGIC, génération, nb entrées, nb clés, nb préfixes lourds,
+              TOP_K, positions des sections
+    entrées   siren (9 octets), score, position et longueur du nom
+    clés      position et longueur de la clé, numéro d'entrée (triées)
+    lourds    préfixes couvrant plus de SCAN_LIMIT clés, avec leurs TOP_K
+              meilleures entrées précalculées
+    blob      noms, clés et préfixes (UTF-8)
+"""
+
+import heapq
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+
+MAGIC = b'SIRAC002'
+HEADER = struct.Struct('<8sQIIII QQQQ')
+ENTRY = struct.Struct('<9sIIH')      # siren, score, position du nom, longueur
+KEY = struct.Struct('<IHI')          # position de la clé, longueur, entrée
+HEAVY = struct.Struct('<IHI')        # position du préfixe, longueur, 1re liste
+TOP = struct.Struct('<I')            # numéro d'entrée (NO_ENTRY : vide)
+NO_ENTRY = 0xFFFFFFFF
+
+# Préfixe couvrant plus de SCAN_LIMIT clés : classement précalculé
+SCAN_LIMIT = 512
+# Suggestions précalculées par préfixe lourd (avant dédoublonnage par SIREN)
+TOP_K = 20
+
+# Entreprises actives et nombre d'établissements actifs (popularité)
+SOURCE_SQL = """
+SELECT sd.siren, sd.nom_complet, sd.sigle, COALESCE(e.nb, 0)
+FROM search_document sd
+LEFT JOIN (
+    SELECT siren, count(*) AS nb
+    FROM etablissement
+    WHERE etat_administratif = 'A'
+    GROUP BY siren
+) e ON e.siren = sd.siren
+WHERE sd.etat_administratif = 'A'
+"""
+
+NON_WORD = re.compile(r'[\W_]+')
+
+# Délai entre deux vérifications de la date du snapshot
+RELOAD_INTERVAL = 60
+
+
+def normalize(text):
+    """Minuscules, sans accents, ponctuation réduite à des espaces simples"""
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return NON_WORD.sub(' ', text.lower()).strip()
+
+
+def build_snapshot(rows, generation=0):
+    """
+    Construit l'index à partir de lignes (siren, nom, sigle, score) issues de
+    la génération generation des données
+
+    Returns:
+        bytes: contenu du snapshot
+    """
+    entries = []
+    keys = []
+    for siren, nom, sigle, score in rows:
+        entry = len(entries)
+        entries.append((siren, min(int(score or 0), NO_ENTRY - 1), nom or ''))
+        for text in {normalize(nom), normalize(sigle), siren}:
+            if text:
+                keys.append((text.encode('utf-8'), entry))
+    keys.sort()
+
+    heavy = heavy_prefixes(keys, entries)
+
+    blob = bytearray()
+
+    def put(data):
+        position = len(blob)
+        blob.extend(data)
+        return position
+
+    entry_section = bytearray()
+    for siren, score, nom in entries:
+        name = nom.encode('utf-8')[:0xFFFF]
+        entry_section += ENTRY.pack(siren.encode('ascii'), score, put(name), len(name))
+
+    key_section = bytearray()
+    for key, entry in keys:
+        key = key[:0xFFFF]
+        key_section += KEY.pack(put(key), len(key), entry)
+
+    heavy_section = bytearray()
+    top_section = bytearray()
+    for prefix, top in heavy:
+        heavy_section += HEAVY.pack(put(prefix), len(prefix), len(top_section) // TOP.size)
+        top = top + [NO_ENTRY] * (TOP_K - len(top))
+        for entry in top:
+            top_section += TOP.pack(entry)
+
+    offset = HEADER.size
+    sections = []
+    for section in (entry_section, key_section, heavy_section, top_section):
+        sections.append(offset)
+        offset += len(section)
+
+    header = HEADER.pack(MAGIC, generation, len(entries), len(keys), len(heavy), TOP_K,
+                         *sections)
+    return b''.join([header, entry_section, key_section, heavy_section,
+                     top_section, blob])
+
+
+def heavy_prefixes(keys, entries):
+    """
+    Préfixes couvrant plus de SCAN_LIMIT clés et leurs TOP_K meilleures entrées
+
+    Niveau par niveau (longueur 1, 2, ...) : seuls les groupes lourds du
+    niveau précédent sont redécoupés.
+    """
+    # Rang de chaque clé : score décroissant puis ordre d'entrée
+    ranks = [(entries[entry][1], -entry) for _, entry in keys]
+
+    heavy = []
+    groups = [(0, len(keys))] if len(keys) > SCAN_LIMIT else []
+    length = 1
+    while groups:
+        next_groups = []
+        for start, end in groups:
+            i = start
+            while i < end:
+                prefix = keys[i][0][:length]
+                j = i
+                while j < end and keys[j][0][:length] == prefix:
+                    j += 1
+                if j - i > SCAN_LIMIT and len(prefix) == length:
+                    heavy.append((prefix, best_entries(ranks[i:j], TOP_K)))
+                    next_groups.append((i, j))
+                i = j
+        groups = next_groups
+        length += 1
+    heavy.sort()
+    return heavy
+
+
+def best_entries(ranks, limit):
+    """Entrées distinctes les mieux classées parmi des rangs (score, -entrée)"""
+    best = []
+    for _, entry in heapq.nlargest(limit * 2, ranks):
+        if -entry not in best:
+            best.append(-entry)
+            if len(best) == limit:
+                break
+    return best
+
+
+class PrefixIndex:
+    """Lecture d'un snapshot (bytes ou mmap) : recherche par préfixe"""
+
+    def __init__(self, data, source=None):
+        self.data = data
+        self.source = source
+        (magic, self.generation, self.n_entries, self.n_keys, self.n_heavy, self.top_k,
+         self.entries_at, self.keys_at, self.heavy_at, self.top_at) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Snapshot d'autocomplétion invalide : {source}")
+        self.blob_at = self.top_at + self.top_k * self.n_heavy * TOP.size
+
+    @classmethod
+    def open(cls, path):
+        """Ouvre un snapshot en mmap (pages partagées entre processus)"""
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, source=path)
+
+    def _text(self, position, length):
+        start = self.blob_at + position
+        return self.data[start:start + length]
+
+    def _key(self, i):
+        position, length, entry = KEY.unpack_from(self.data, self.keys_at + i * KEY.size)
+        return self._text(position, length), entry
+
+    def _heavy(self, i):
+        position, length, top = HEAVY.unpack_from(self.data, self.heavy_at + i * HEAVY.size)
+        return self._text(position, length), top
+
+    def entry(self, i):
+        """(siren, nom, score) d'une entrée"""
+        siren, score, position, length = ENTRY.unpack_from(
+            self.data, self.entries_at + i * ENTRY.size
+        )
+        return siren.decode('ascii'), self._text(position, length).decode('utf-8'), score
+
+    def _bisect(self, count, read, target):
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if read(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def search(self, q, limit=10):
+        """Suggestions [(siren, nom)] dont un nom, sigle ou SIREN commence par q"""
+        prefix = normalize(q).encode('utf-8')
+        if not prefix:
+            return []
+
+        # Préfixe lourd : classement précalculé
+        i = self._bisect(self.n_heavy, lambda m: self._heavy(m)[0], prefix)
+        if i < self.n_heavy:
+            heavy_prefix, top = self._heavy(i)
+            if heavy_prefix == prefix:
+                entries = []
+                for k in range(self.top_k):
+                    (entry,) = TOP.unpack_from(self.data, self.top_at + (top + k) * TOP.size)
+                    if entry != NO_ENTRY:
+                        entries.append(entry)
+                return [self.entry(e)[:2] for e in entries[:limit]]
+
+        # Sinon au plus SCAN_LIMIT clés à classer
+        start = self._bisect(self.n_keys, lambda m: self._key(m)[0], prefix)
+        candidates = {}
+        for k in range(start, self.n_keys):
+            key, entry = self._key(k)
+            if not key.startswith(prefix):
+                break
+            if entry not in candidates:
+                candidates[entry] = self.entry(entry)
+        ranked = sorted(candidates.items(), key=lambda item: (-item[1][2], item[0]))
+        return [data[:2] for _, data in ranked[:limit]]
+
+
+def write_snapshot(path, data):
+    """Écrit le snapshot de façon atomique (les workers rouvrent le nouveau)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def load_rows():
+    """Lignes source de l'index, lues en flux depuis la base"""
+    from sqlalchemy import text
+    from app import db
+
+    connection = db.engine.connect().execution_options(stream_results=True)
+    try:
+        for row in connection.execute(text(SOURCE_SQL)):
+            yield tuple(row)
+    finally:
+        connection.close()
+
+
+_lock = threading.Lock()
+_state = {'index': None, 'mtime': None, 'checked': 0.0}
+
+
+def get_index(path, generation=None):
+    """
+    Index du processus : snapshot de path en mmap (rouvert s'il a été
+    remplacé), ou None tant qu'aucun snapshot lisible n'a été écrit
+
+    Si l'index chargé est antérieur à generation (données publiées), le
+    fichier est revérifié sans attendre RELOAD_INTERVAL. L'appelant compare
+    index.generation à la génération courante.
+    """
+    now = time.monotonic()
+    index = _state['index']
+    if (index is not None and now - _state['checked'] < RELOAD_INTERVAL
+            and (generation is None or index.generation >= generation)):
+        return index
+
+    with _lock:
+        _state['checked'] = now
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime is not None and mtime != _state['mtime']:
+            try:
+                _state['index'] = PrefixIndex.open(path)
+            except (ValueError, struct.error):
+                # Snapshot d'un format antérieur : ignoré jusqu'à sa réécriture
+                pass
+            _state['mtime'] = mtime
+
+    return _state['index']
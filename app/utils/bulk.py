@@ -0,0 +1,245 @@
+"""
+Recherche en masse de SIREN / SIRET (/search/bulk)
+
+La liste reçue (tableau JSON, NDJSON ou fichier CSV) est chargée par COPY
+dans une table temporaire, jointe en une seule requête à unite_legale et
+etablissement, et le résultat est relu par curseur serveur puis renvoyé en
+NDJSON au fil de l'eau : la mémoire reste bornée des deux côtés, quel que
+soit le nombre d'identifiants.
+"""
+
+import csv
+import io
+import itertools
+import json
+
+from sqlalchemy import table, column, func
+
+from app import db
+from app.models import UniteLegale, Etablissement
+
+# Nombre maximal d'identifiants par requête
+MAX_IDENTIFIERS = 1000000
+
+# Lignes relues par aller-retour du curseur serveur
+FETCH_ROWS = 2000
+
+LOOKUP_DDL = """
+CREATE TEMP TABLE bulk_lookup (
+    position INTEGER NOT NULL,
+    identifiant TEXT,
+    siren VARCHAR(9),
+    siret VARCHAR(14)
+) ON COMMIT DROP
+"""
+
+lookup = table(
+    'bulk_lookup',
+    column('position'), column('identifiant'), column('siren'), column('siret')
+)
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+def parse_identifier(value):
+    """(siren, siret) d'un identifiant reçu ; (None, None) s'il est invalide"""
+    digits = str(value).replace(' ', '').strip()
+    if digits.isdigit():
+        if len(digits) == 9:
+            return digits, None
+        if len(digits) == 14:
+            return None, digits
+    return None, None
+
+
+def _value(item):
+    """Identifiant d'un élément JSON : chaîne, nombre ou objet {siren|siret}"""
+    if isinstance(item, dict):
+        item = item.get('siret') or item.get('siren') or ''
+    return '' if item is None else str(item)
+
+
+def iter_request_identifiers(request):
+    """
+    Identifiants de la requête, dans l'ordre reçu
+
+    - NDJSON (Content-Type application/x-ndjson) : lu ligne à ligne ;
+    - fichier CSV (multipart, champ file) : colonne siret ou siren si
+      l'en-tête en contient une, sinon première colonne ;
+    - JSON : tableau, ou objet {"identifiants": [...]} / {"sirens": [...]}.
+
+    Lève ValueError si le corps est illisible.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        for line in request.stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield _value(json.loads(line))
+                except ValueError:
+                    raise ValueError(f"Ligne NDJSON invalide : {line[:50]!r}")
+        return
+
+    upload = request.files.get('file')
+    if upload is not None:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        try:
+            first = stream.readline()
+        except UnicodeDecodeError:
+            raise ValueError("Fichier CSV illisible : encodage UTF-8 attendu")
+        delimiter = ';' if ';' in first else ('\t' if '\t' in first else ',')
+        header = next(csv.reader([first], delimiter=delimiter), [])
+        names = [name.strip().lower() for name in header]
+        index = next((names.index(n) for n in ('siret', 'siren') if n in names), None)
+        if index is None:
+            index = 0
+            yield header[0] if header else ''
+        try:
+            for row in csv.reader(stream, delimiter=delimiter):
+                if len(row) > index:
+                    yield row[index]
+        except UnicodeDecodeError:
+            raise ValueError("Fichier CSV illisible : encodage UTF-8 attendu")
+        return
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('identifiants', data.get('sirens'))
+    if not isinstance(data, list):
+        raise ValueError("Corps attendu : tableau JSON, NDJSON ou fichier CSV (champ file)")
+    for item in data:
+        yield _value(item)
+
+
+class _CopyBuffer(io.TextIOBase):
+    """Fichier en lecture seule sur un itérateur de lignes (source de COPY)"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._lines, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def load_lookup(identifiers):
+    """
+    Crée la table temporaire bulk_lookup et y charge les identifiants par COPY
+
+    Le premier identifiant est lu avant COPY : un corps illisible lève
+    ValueError sans rien envoyer à la base. Une erreur plus loin dans le flux
+    (ligne invalide, plus de MAX_IDENTIFIERS, encodage) interrompt COPY et
+    est relevée telle quelle (ValueError), pas sous forme d'erreur psycopg2.
+
+    Returns:
+        int: nombre d'identifiants chargés (0 : liste vide, rien n'est créé)
+    """
+    identifiers = iter(identifiers)
+    first = next(identifiers, None)
+    if first is None:
+        return 0
+
+    counter = {'rows': 0}
+    failure = []
+
+    def csv_lines():
+        out = io.StringIO()
+        writer = csv.writer(out)
+        try:
+            for position, value in enumerate(itertools.chain([first], identifiers), start=1):
+                if position > MAX_IDENTIFIERS:
+                    raise ValueError(f"Au plus {MAX_IDENTIFIERS:,} identifiants par requête")
+                siren, siret = parse_identifier(value)
+                writer.writerow([position, value[:64], siren or '', siret or ''])
+                counter['rows'] = position
+                if out.tell() > 65536:
+                    yield out.getvalue()
+                    out.seek(0)
+                    out.truncate()
+        except ValueError as e:
+            # psycopg2 ne transmet que « error in .read() call »
+            failure.append(e)
+            raise
+        yield out.getvalue()
+
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute(LOOKUP_DDL)
+        cursor.copy_expert(
+            "COPY bulk_lookup (position, identifiant, siren, siret) "
+            "FROM STDIN WITH (FORMAT csv, NULL '')",
+            _CopyBuffer(csv_lines())
+        )
+    except Exception as e:
+        if failure:
+            raise failure[0] from e
+        raise
+    finally:
+        cursor.close()
+    return counter['rows']
+
+
+def stream_lookup():
+    """
+    Lignes NDJSON du résultat, dans l'ordre reçu, puis une ligne de synthèse
+
+    SIREN : entreprise et siège ; SIRET : entreprise et cet établissement.
+    Une seule requête (jointure sur la table temporaire) relue par curseur
+    serveur ; la transaction (et la table temporaire) se termine à la fin.
+    """
+    siren_key = func.coalesce(lookup.c.siren, func.left(lookup.c.siret, 9))
+    siret_key = func.coalesce(lookup.c.siret, UniteLegale.siren + UniteLegale.nic_siege)
+
+    query = db.session.query(
+        lookup.c.position, lookup.c.identifiant, lookup.c.siren, lookup.c.siret,
+        UniteLegale, Etablissement
+    ).select_from(lookup).outerjoin(
+        UniteLegale, UniteLegale.siren == siren_key
+    ).outerjoin(
+        Etablissement, Etablissement.siret == siret_key
+    ).order_by(lookup.c.position).yield_per(FETCH_ROWS)
+
+    found = not_found = 0
+    try:
+        for position, identifiant, siren, siret, ul, etab in query:
+            line = {'position': position, 'identifiant': identifiant}
+            if siren is None and siret is None:
+                line.update(found=False, error='Identifiant invalide')
+            elif ul is None or (siret is not None and etab is None):
+                line['found'] = False
+            else:
+                line.update(
+                    found=True,
+                    entreprise=ul.to_dict(),
+                    etablissement=etab.to_dict() if etab else None
+                )
+
+            if line['found']:
+                found += 1
+            else:
+                not_found += 1
+
+            # Mémoire bornée : les objets ne restent pas dans la session
+            for obj in (ul, etab):
+                if obj is not None and obj in db.session:
+                    db.session.expunge(obj)
+
+            yield json.dumps(line, ensure_ascii=False) + '\n'
+
+        yield json.dumps({'summary': {
+            'total': found + not_found, 'found': found, 'not_found': not_found
+        }}) + '\n'
+    finally:
+        db.session.rollback()
@@ -0,0 +1,291 @@
+"""
+Cache des réponses de recherche (search_api, autocomplete)
+
+Stockage SQLite local (un fichier partagé par tous les workers gunicorn, en
+WAL) : nombre d'entrées borné (éviction LRU approchée, appliquée par purges
+périodiques) et durée de vie (TTL). La clé
+contient les paramètres normalisés de la requête et la génération des
+données (table dataset_generation, incrémentée par scripts/import_csv.py à
+chaque publication) : après un import, les anciennes entrées ne sont plus
+jamais servies puis sont purgées.
+
+Le cache ne doit jamais faire échouer une requête : toute erreur SQLite est
+traitée comme un défaut de cache.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, request, make_response
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+
+# Délai de relecture de la génération des données (secondes)
+GENERATION_TTL = 5
+
+# Date d'accès (LRU) réécrite au plus une fois par intervalle et par entrée
+TOUCH_INTERVAL = 60
+
+# Compteurs succès / défauts : cumulés par processus, écrits par lots
+COUNTERS_FLUSH_INTERVAL = 10
+
+# Purge (générations périmées, TTL, borne LRU) : toutes les SWEEP_EVERY
+# écritures ou SWEEP_INTERVAL secondes par processus, pas à chaque écriture
+SWEEP_EVERY = 100
+SWEEP_INTERVAL = 30
+
+CACHE_DDL = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    expires REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0);
+"""
+
+_generation = {'value': 0, 'checked': None}
+_generation_lock = threading.Lock()
+
+
+def current_generation():
+    """Génération des données publiées (relue au plus toutes les GENERATION_TTL s)"""
+    now = time.monotonic()
+    checked = _generation['checked']
+    if checked is not None and now - checked < GENERATION_TTL:
+        return _generation['value']
+
+    with _generation_lock:
+        try:
+            value = db.session.execute(
+                text("SELECT COALESCE(max(id), 0) FROM dataset_generation")
+            ).scalar()
+        except SQLAlchemyError:
+            # Base antérieure à dataset_generation
+            db.session.rollback()
+            value = 0
+        _generation.update(value=value, checked=now)
+    return value
+
+
+def cache_key(namespace, args, generation):
+    """Clé d'une requête : espace, génération et paramètres normalisés"""
+    params = {}
+    for name in sorted(args):
+        value = ' '.join(args.get(name, '').split())
+        params[name] = value.lower() if name == 'q' else value
+    payload = json.dumps([namespace, generation, params], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Cache SQLite partagé entre processus : LRU borné, TTL, compteurs"""
+
+    def __init__(self, path, max_entries=10000, ttl=600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._counts = {'hits': 0, 'misses': 0}
+        self._counts_lock = threading.Lock()
+        self._flushed = time.monotonic()
+        self._writes = 0
+        self._swept = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(CACHE_DDL)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    @property
+    def conn(self):
+        """Une connexion par thread (sqlite3 ne les partage pas)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def get(self, key):
+        """
+        Corps en cache ou None
+
+        Une lecture n'écrit pas dans SQLite (verrou d'écriture partagé par
+        tous les workers) : les compteurs sont cumulés en mémoire puis écrits
+        par lots, et la date d'accès n'est rafraîchie que si elle a plus de
+        TOUCH_INTERVAL secondes (LRU approché).
+        """
+        now = time.time()
+        try:
+            row = self.conn.execute(
+                "SELECT body, last_access FROM entries WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        self._count('hits' if row else 'misses')
+        if row is None:
+            return None
+
+        body, last_access = row
+        if now - last_access > TOUCH_INTERVAL:
+            try:
+                self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                pass
+        return body
+
+    def _count(self, name):
+        with self._counts_lock:
+            self._counts[name] += 1
+            due = time.monotonic() - self._flushed >= COUNTERS_FLUSH_INTERVAL
+        if due:
+            self.flush_counters()
+
+    def flush_counters(self):
+        """Ajoute les compteurs du processus à ceux du fichier (conservés si verrou)"""
+        with self._counts_lock:
+            counts = dict(self._counts)
+            self._counts = {'hits': 0, 'misses': 0}
+            self._flushed = time.monotonic()
+        if not any(counts.values()):
+            return
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                for name, value in counts.items():
+                    self.conn.execute(
+                        "UPDATE counters SET value = value + ? WHERE name = ?", (value, name)
+                    )
+        except sqlite3.Error:
+            with self._counts_lock:
+                for name, value in counts.items():
+                    self._counts[name] += value
+
+    def set(self, key, body, generation):
+        """Enregistre un corps ; purge et borne LRU appliquées de temps en temps (sweep)"""
+        now = time.time()
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, generation, body, now + self.ttl, now)
+            )
+        except sqlite3.Error:
+            return
+
+        with self._counts_lock:
+            self._writes += 1
+            due = (self._writes >= SWEEP_EVERY
+                   or time.monotonic() - self._swept >= SWEEP_INTERVAL)
+            if due:
+                self._writes = 0
+                self._swept = time.monotonic()
+        if due:
+            self.sweep(generation)
+
+    def sweep(self, generation):
+        """
+        Supprime les entrées expirées ou d'une génération antérieure, puis les
+        moins récemment lues au-delà de max_entries
+
+        Seules les générations strictement inférieures sont purgées : un
+        worker dont la génération a jusqu'à GENERATION_TTL secondes de retard
+        ne supprime pas les entrées de la génération suivante.
+        """
+        now = time.time()
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.execute(
+                    "DELETE FROM entries WHERE generation < ? OR expires <= ?",
+                    (generation, now)
+                )
+                self.conn.execute("""
+                    DELETE FROM entries WHERE key IN (
+                        SELECT key FROM entries ORDER BY last_access
+                        LIMIT max((SELECT count(*) FROM entries) - ?, 0)
+                    )
+                """, (self.max_entries,))
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        """Compteurs (tous processus, lots en attente des autres exceptés) et taille du cache"""
+        self.flush_counters()
+        try:
+            counters = dict(self.conn.execute("SELECT name, value FROM counters"))
+            entries = self.conn.execute("SELECT count(*) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            counters, entries = {}, None
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+        }
+
+
+def get_cache():
+    """Cache de l'application (None si SEARCH_CACHE_PATH est vide)"""
+    cache = current_app.extensions.get('search_cache')
+    if cache is None and current_app.config.get('SEARCH_CACHE_PATH'):
+        cache = current_app.extensions['search_cache'] = ResponseCache(
+            current_app.config['SEARCH_CACHE_PATH'],
+            max_entries=current_app.config['SEARCH_CACHE_MAX_ENTRIES'],
+            ttl=current_app.config['SEARCH_CACHE_TTL'],
+        )
+    return cache
+
+
+def cached_response(namespace):
+    """
+    Met en cache les réponses 200 d'une vue JSON selon ses paramètres GET
+    (sauf Cache-Control: no-store, posé par une vue qui sert des données
+    d'une génération antérieure)
+
+    En-tête X-Cache : HIT ou MISS.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None:
+                return view(*args, **kwargs)
+
+            generation = current_generation()
+            key = cache_key(namespace, request.args, generation)
+            body = cache.get(key)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and 'no-store' not in response.headers.get('Cache-Control', ''):
+                cache.set(key, response.get_data(), generation)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,103 @@
+"""
+Chargement groupé des entreprises, sièges et établissements
+Un nombre constant de requêtes quel que soit le nombre de SIREN demandés
+(plus de requête « siège » par ligne dans les routes et les exports)
+"""
+
+from sqlalchemy import and_
+
+from app import db
+from app.models import UniteLegale, Etablissement
+
+# Ordre d'affichage des établissements d'une entreprise
+ETABLISSEMENT_ORDER = (
+    Etablissement.siren.asc(),
+    Etablissement.etablissement_siege.desc(),  # Siège en premier
+    Etablissement.etat_administratif.asc(),    # Actifs en premier
+    Etablissement.date_creation.desc(),
+    Etablissement.siret.asc()
+)
+
+# Jointure sur le siège (index partiel idx_etab_siege_siren)
+SIEGE_JOIN = and_(
+    Etablissement.siren == UniteLegale.siren,
+    Etablissement.etablissement_siege.is_(True)
+)
+
+
+def unique_sirens(sirens):
+    """SIREN nettoyés et dédoublonnés, dans l'ordre de la liste reçue"""
+    return list(dict.fromkeys(s.strip() for s in sirens if s and s.strip()))
+
+
+def load_with_siege(sirens):
+    """
+    Entreprises et sièges d'une liste de SIREN en une seule requête
+
+    Retourne une liste de (UniteLegale, Etablissement ou None) dans l'ordre
+    de la liste reçue ; les SIREN inconnus sont absents.
+    """
+    sirens = unique_sirens(sirens)
+    if not sirens:
+        return []
+
+    rows = db.session.query(UniteLegale, Etablissement).outerjoin(
+        Etablissement, SIEGE_JOIN
+    ).filter(
+        UniteLegale.siren.in_(sirens)
+    ).all()
+
+    by_siren = {ul.siren: (ul, siege) for ul, siege in rows}
+    return [by_siren[s] for s in sirens if s in by_siren]
+
+
+def load_sieges(sirens):
+    """Sièges d'une liste de SIREN en une seule requête : {siren: Etablissement}"""
+    sirens = unique_sirens(sirens)
+    if not sirens:
+        return {}
+
+    sieges = db.session.query(Etablissement).filter(
+        Etablissement.etablissement_siege.is_(True),
+        Etablissement.siren.in_(sirens)
+    ).all()
+    return {e.siren: e for e in sieges}
+
+
+def load_etablissements(sirens):
+    """
+    Établissements d'une liste de SIREN en une seule requête
+
+    Retourne la liste triée par SIREN puis siège, actifs et date de création.
+    """
+    sirens = unique_sirens(sirens)
+    if not sirens:
+        return []
+
+    return db.session.query(Etablissement).filter(
+        Etablissement.siren.in_(sirens)
+    ).order_by(*ETABLISSEMENT_ORDER).all()
+
+
+def load_entreprise(siren):
+    """
+    Entreprise et tous ses établissements (deux requêtes)
+
+    Retourne (UniteLegale ou None, liste des établissements triés).
+    """
+    entreprise = db.session.get(UniteLegale, siren)
+    if not entreprise:
+        return None, []
+    return entreprise, load_etablissements([siren])
+
+
+def split_siege(etablissements):
+    """Sépare le siège des autres établissements : (siège ou None, autres)"""
+    siege = None
+    autres = []
+    for etab in etablissements:
+        if etab.etablissement_siege and siege is None:
+            siege = etab
+        else:
+            autres.append(etab)
+    return siege, autres
@@ -0,0 +1,343 @@
+"""
+Comptages par facette (/search/facets) sur un snapshot colonnaire NumPy
+
+Une ligne par entreprise de search_document, triée par SIREN. Chaque colonne
+catégorielle est encodée par dictionnaire (tableau d'entiers + liste des
+valeurs distinctes) : un filtre s'évalue sur le dictionnaire (quelques
+milliers de valeurs) puis s'applique à la colonne par table de
+correspondance, et une facette se compte avec np.bincount.
+
+Les filtres ont la sémantique de search_api (app/utils/search.py) : préfixe
+pour activite et code_postal, « contient » sans casse pour ville, égalité
+pour categorie et etat. La recherche textuelle q est évaluée par PostgreSQL
+(mêmes index) et ne renvoie que des SIREN, lus en flux et positionnés par
+dichotomie ; au-delà de MAX_TEXT_SIRENS, tous les comptages sont faits par
+PostgreSQL.
+
+Le snapshot (fichiers .npy ouverts en mmap, partagés par les workers) est
+produit par scripts/import_csv.py à chaque publication de search_document
+(ou par `flask --app run facets-snapshot`). Il n'est jamais construit
+pendant une requête (plusieurs Go de mémoire, concurrence entre workers) :
+tant qu'il n'existe pas, ou qu'il date d'une génération antérieure des
+données, /search/facets répond 503.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Facettes renvoyées
+FACET_COLUMNS = (
+    'activite_principale', 'categorie_entreprise', 'tranche_effectifs',
+    'departement', 'etat_administratif'
+)
+
+# Colonnes encodées : facettes et colonnes des filtres de search_api
+ENCODED_COLUMNS = FACET_COLUMNS + ('code_postal', 'libelle_commune')
+
+# Filtre de search_api -> (colonne, test sur une valeur du dictionnaire)
+FILTERS = {
+    'activite': ('activite_principale', lambda value, wanted: value.startswith(wanted)),
+    'categorie': ('categorie_entreprise', lambda value, wanted: value == wanted),
+    'etat': ('etat_administratif', lambda value, wanted: value == wanted),
+    'code_postal': ('code_postal', lambda value, wanted: value.startswith(wanted)),
+    'ville': ('libelle_commune', lambda value, wanted: wanted.lower() in value.lower()),
+}
+
+SOURCE_SQL = """
+SELECT siren, activite_principale, categorie_entreprise, tranche_effectifs,
+       code_commune, etat_administratif, code_postal, libelle_commune
+FROM search_document
+ORDER BY siren
+"""
+
+# Délai entre deux vérifications du snapshot courant
+RELOAD_INTERVAL = 60
+
+# SIREN de la recherche textuelle lus dans le snapshot ; au-delà (q très
+# large), les comptages sont faits par PostgreSQL (count_in_database)
+MAX_TEXT_SIRENS = 200000
+
+# SIREN relus par aller-retour du curseur serveur
+FETCH_ROWS = 10000
+
+MANIFEST = 'current.json'
+LOCK_FILE = '.lock'
+BUILD_PREFIX = '.build-'
+
+
+def departement(code_commune):
+    """Département d'un code commune INSEE (2A/2B, 971 à 976)"""
+    if not code_commune:
+        return ''
+    return code_commune[:3] if code_commune.startswith('97') else code_commune[:2]
+
+
+def build_snapshot(rows, directory, generation=0):
+    """
+    Encode les lignes (ordre de SOURCE_SQL, triées par SIREN) et publie le
+    snapshot dans directory
+
+    Les colonnes sont accumulées dans des tableaux compacts (4 octets par
+    valeur) et écrites dans un répertoire temporaire propre au processus, puis
+    publiées sous un nom de version unique. Un verrou sur directory sérialise
+    les constructions concurrentes ; la version précédente est conservée pour
+    les lecteurs qui l'ouvrent au même moment.
+
+    Returns:
+        int: nombre d'entreprises
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        dictionaries = {column: {} for column in ENCODED_COLUMNS}
+        sirens = array('I')
+        codes = {column: array('I') for column in ENCODED_COLUMNS}
+
+        for siren, activite, categorie, tranche, code_commune, etat, code_postal, commune in rows:
+            sirens.append(int(siren))
+            values = {
+                'activite_principale': activite,
+                'categorie_entreprise': categorie,
+                'tranche_effectifs': tranche,
+                'departement': departement(code_commune),
+                'etat_administratif': etat,
+                'code_postal': code_postal,
+                'libelle_commune': commune,
+            }
+            for column, value in values.items():
+                dictionary = dictionaries[column]
+                codes[column].append(dictionary.setdefault(value or '', len(dictionary)))
+
+        version = f"{generation}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        target = tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=directory)
+        try:
+            np.save(os.path.join(target, 'siren.npy'), np.frombuffer(sirens, dtype=np.uint32))
+            for column in ENCODED_COLUMNS:
+                dtype = np.uint16 if len(dictionaries[column]) <= 0xFFFF else np.uint32
+                values = np.frombuffer(codes[column], dtype=np.uint32).astype(dtype)
+                np.save(os.path.join(target, f'{column}.npy'), values)
+                codes[column] = None
+
+            manifest = {
+                'version': version,
+                'generation': generation,
+                'rows': len(sirens),
+                'dictionaries': {column: list(values) for column, values in dictionaries.items()},
+            }
+            with open(os.path.join(target, 'dictionaries.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.rename(target, os.path.join(directory, version))
+        except Exception:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+
+        # Bascule atomique, puis suppression des versions antérieures à la
+        # précédente (les workers qui les ont ouvertes en mmap gardent leurs pages)
+        previous = current_version(directory)
+        tmp = os.path.join(directory, f'{MANIFEST}.tmp{os.getpid()}')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': version}, f)
+        os.replace(tmp, os.path.join(directory, MANIFEST))
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name not in (version, previous) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    return len(sirens)
+
+
+class FacetSnapshot:
+    """Snapshot colonnaire ouvert en mmap : filtres et comptages"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'dictionaries.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.version = manifest['version']
+        self.generation = manifest['generation']
+        self.rows = manifest['rows']
+        self.dictionaries = manifest['dictionaries']
+        self.siren = np.load(os.path.join(path, 'siren.npy'), mmap_mode='r')
+        self.codes = {
+            column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r')
+            for column in ENCODED_COLUMNS
+        }
+        # Comptages sans filtre, calculés une fois par processus
+        self._unfiltered = {}
+
+    def bincount(self, column, selected=None):
+        """Nombre de lignes par code de column (lignes selected, ou toutes)"""
+        if selected is None:
+            if column not in self._unfiltered:
+                self._unfiltered[column] = np.bincount(
+                    self.codes[column], minlength=len(self.dictionaries[column])
+                )
+            return self._unfiltered[column]
+        return np.bincount(self.codes[column][selected], minlength=len(self.dictionaries[column]))
+
+    def filter_mask(self, column, accept):
+        """Lignes dont la valeur de column satisfait accept (via le dictionnaire)"""
+        lookup = np.fromiter(
+            (accept(value) for value in self.dictionaries[column]),
+            dtype=bool, count=len(self.dictionaries[column])
+        )
+        return lookup[self.codes[column]]
+
+    def siren_mask(self, sirens):
+        """Lignes des SIREN donnés (résultat de la recherche textuelle)"""
+        mask = np.zeros(self.rows, dtype=bool)
+        wanted = np.unique(np.asarray(sirens, dtype=np.uint32))
+        positions = np.searchsorted(self.siren, wanted)
+        inside = positions < self.rows
+        positions, wanted = positions[inside], wanted[inside]
+        mask[positions[self.siren[positions] == wanted]] = True
+        return mask
+
+    def counts(self, params, sirens=None, limit=50):
+        """
+        Total et comptages par facette pour les filtres params
+
+        Chaque facette est comptée avec tous les filtres sauf le sien (les
+        autres valeurs de la facette restent visibles). sirens : SIREN
+        retenus par la recherche textuelle, None si q est vide.
+        """
+        masks = {}
+        for name, (column, accept) in FILTERS.items():
+            wanted = params.get(name)
+            if wanted:
+                masks[name] = self.filter_mask(column, lambda value: accept(value, wanted))
+        if sirens is not None:
+            masks['q'] = self.siren_mask(sirens)
+
+        def combine(exclude=None):
+            combined = None
+            for name, mask in masks.items():
+                if name != exclude:
+                    combined = mask if combined is None else combined & mask
+            return combined
+
+        everything = combine()
+        total = self.rows if everything is None else int(everything.sum())
+
+        facets = {}
+        for column in FACET_COLUMNS:
+            own = next((name for name, (c, _) in FILTERS.items() if c == column), None)
+            counts = self.bincount(column, combine(exclude=own))
+            order = np.argsort(counts, kind='stable')[::-1][:limit]
+            facets[column] = [
+                {'value': self.dictionaries[column][i] or None, 'count': int(counts[i])}
+                for i in order if counts[i]
+            ]
+
+        return {'total': total, 'facets': facets}
+
+
+def text_sirens(query, cap=MAX_TEXT_SIRENS):
+    """
+    SIREN d'une requête sur SearchDocument.siren (np.uint32), lus en flux par
+    curseur serveur ; None si elle en retient plus de cap
+    """
+    rows = query.limit(cap + 1).yield_per(FETCH_ROWS)
+    sirens = np.fromiter((int(siren) for (siren,) in rows), dtype=np.uint32)
+    return None if len(sirens) > cap else sirens
+
+
+def count_in_database(params, limit=50):
+    """
+    Total et comptages par facette calculés par PostgreSQL (GROUP BY), même
+    format et même sémantique que FacetSnapshot.counts : pour une recherche
+    textuelle trop large pour être évaluée sur le snapshot
+    """
+    from sqlalchemy import func, case
+    from app import db
+    from app.models import SearchDocument
+    from app.utils.search import apply_search_filters
+
+    expressions = {
+        column: getattr(SearchDocument, column)
+        for column in FACET_COLUMNS if column != 'departement'
+    }
+    code_commune = SearchDocument.code_commune
+    expressions['departement'] = case(
+        (code_commune.like('97%'), func.left(code_commune, 3)),
+        else_=func.left(code_commune, 2)
+    )
+
+    total = apply_search_filters(db.session.query(func.count()), params).scalar()
+
+    facets = {}
+    for column in FACET_COLUMNS:
+        own = next((name for name, (c, _) in FILTERS.items() if c == column), None)
+        value = expressions[column].label('value')
+        count = func.count().label('count')
+        query = apply_search_filters(
+            db.session.query(value, count),
+            {name: v for name, v in params.items() if name != own}
+        )
+        rows = query.group_by(value).order_by(count.desc(), value).limit(limit)
+        facets[column] = [{'value': v or None, 'count': n} for v, n in rows]
+
+    return {'total': total, 'facets': facets}
+
+
+def load_rows():
+    """Lignes source du snapshot, lues en flux depuis la base"""
+    from sqlalchemy import text
+    from app import db
+
+    connection = db.engine.connect().execution_options(stream_results=True)
+    try:
+        for row in connection.execute(text(SOURCE_SQL)):
+            yield tuple(row)
+    finally:
+        connection.close()
+
+
+_lock = threading.Lock()
+_state = {'snapshot': None, 'version': None, 'checked': 0.0}
+
+
+def current_version(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)['version']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def get_snapshot(directory, generation=None):
+    """
+    Snapshot du processus : version courante de directory (rouverte si elle
+    a changé), ou None tant qu'aucun snapshot n'a été construit
+
+    Si le snapshot chargé est antérieur à generation (données publiées), le
+    manifeste est relu sans attendre RELOAD_INTERVAL. L'appelant compare
+    snapshot.generation à la génération courante.
+    """
+    now = time.monotonic()
+    snapshot = _state['snapshot']
+    if (snapshot is not None and now - _state['checked'] < RELOAD_INTERVAL
+            and (generation is None or snapshot.generation >= generation)):
+        return snapshot
+
+    with _lock:
+        _state['checked'] = now
+        version = current_version(directory)
+        if version is not None and version != _state['version']:
+            _state['snapshot'] = FacetSnapshot(os.path.join(directory, version))
+            _state['version'] = version
+
+    return _state['snapshot']
@@ -0,0 +1,116 @@
+"""
+Recherche géographique d'établissements (rayon et plus proches voisins)
+
+Sans PostGIS : chaque établissement géolocalisé appartient à une cellule de
+0,01° x 0,01° (environ 1,1 km x 0,75 km en métropole), indexée par un B-tree
+sur expression (idx_etab_geo_cell). Pour une même ligne de latitude, les
+cellules d'un cercle ont des clés contiguës : un cercle de rayon R se réduit
+à quelques plages de clés (une par ligne de cellules), puis la distance exacte
+(haversine) filtre et ordonne les candidats.
+"""
+
+import math
+
+from sqlalchemy import or_, func, literal_column
+
+from app import db
+from app.models import Etablissement
+
+# Clé de cellule : identique à la définition de idx_etab_geo_cell
+# (scripts/import_csv.py, docs/schema.sql) pour que l'index soit utilisé
+GEO_CELL_SCALE = 100
+GEO_CELL_SQL = (
+    "((floor(etablissement.latitude * 100)::bigint + 9000) * 100000"
+    " + floor(etablissement.longitude * 100)::bigint + 18000)"
+)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Bornes des requêtes
+MAX_RADIUS_KM = 100
+MAX_RESULTS = 1000
+
+# Plus proches voisins : rayon initial, multiplié jusqu'à MAX_RADIUS_KM
+NEAREST_START_KM = 0.5
+NEAREST_GROWTH = 3
+
+
+def cell_key(row, col):
+    """Clé d'une cellule (ligne de latitude, colonne de longitude)"""
+    return (row + 9000) * 100000 + col + 18000
+
+
+def cell_ranges(lat, lon, radius_km):
+    """
+    Plages de clés [(début, fin)] couvrant le cercle (lat, lon, radius_km)
+
+    Une plage par ligne de cellules ; l'étendue en longitude est calculée à
+    la latitude la plus éloignée de l'équateur (ligne ou centre), avec 1 %
+    de marge pour l'approximation des petits angles.
+    """
+    epsilon = 1e-7  # arrondis flottants aux bords de cellule
+    dlat = radius_km / KM_PER_DEGREE
+    lat_min = max(lat - dlat, -90.0)
+    lat_max = min(lat + dlat, 90.0)
+
+    ranges = []
+    first = math.floor((lat_min - epsilon) * GEO_CELL_SCALE)
+    last = math.floor((lat_max + epsilon) * GEO_CELL_SCALE)
+    for row in range(first, last + 1):
+        edge = max(abs(row / GEO_CELL_SCALE), abs((row + 1) / GEO_CELL_SCALE), abs(lat))
+        cos_lat = math.cos(math.radians(min(edge, 90.0)))
+        dlon = 180.0 if cos_lat < 1e-6 else min(1.01 * dlat / cos_lat, 180.0)
+        col_min = math.floor((max(lon - dlon, -180.0) - epsilon) * GEO_CELL_SCALE)
+        col_max = math.floor((min(lon + dlon, 180.0) + epsilon) * GEO_CELL_SCALE)
+        ranges.append((cell_key(row, col_min), cell_key(row, col_max)))
+    return ranges
+
+
+def distance_km(lat, lon):
+    """Distance haversine (km) entre (lat, lon) et l'établissement"""
+    haversine = (
+        func.power(func.sin(func.radians(Etablissement.latitude - lat) / 2), 2)
+        + math.cos(math.radians(lat)) * func.cos(func.radians(Etablissement.latitude))
+        * func.power(func.sin(func.radians(Etablissement.longitude - lon) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(haversine, 1.0)))
+
+
+def search_radius(lat, lon, radius_km, activite=None, etat=None, limit=MAX_RESULTS):
+    """
+    Établissements à moins de radius_km de (lat, lon), du plus proche au plus
+    éloigné : [(Etablissement, distance en km)]
+    """
+    distance = distance_km(lat, lon)
+    cell = literal_column(GEO_CELL_SQL)
+
+    query = db.session.query(Etablissement, distance.label('distance_km')).filter(
+        Etablissement.latitude.isnot(None),
+        or_(*[cell.between(start, end) for start, end in cell_ranges(lat, lon, radius_km)]),
+        distance <= radius_km
+    )
+
+    if activite:
+        query = query.filter(Etablissement.activite_principale.like(f"{activite}%"))
+
+    if etat:
+        query = query.filter(Etablissement.etat_administratif == etat)
+
+    return query.order_by(distance, Etablissement.siret).limit(limit).all()
+
+
+def search_nearest(lat, lon, k, activite=None, etat=None):
+    """
+    Les k établissements les plus proches de (lat, lon), à moins de
+    MAX_RADIUS_KM : ([(Etablissement, distance en km)], rayon parcouru)
+
+    Le rayon grandit tant que le cercle contient moins de k établissements ;
+    dès qu'il en contient k, ce sont les k plus proches.
+    """
+    radius = NEAREST_START_KM
+    while True:
+        rows = search_radius(lat, lon, radius, activite, etat, limit=k)
+        if len(rows) >= k or radius >= MAX_RADIUS_KM:
+            return rows, radius
+        radius = min(radius * NEAREST_GROWTH, MAX_RADIUS_KM)
@@ -0,0 +1,128 @@
+"""
+Pagination par curseur (keyset) et totaux bornés ou estimés
+
+Chaque page reprend après la clé de tri de la dernière ligne de la page
+précédente : coût constant quelle que soit la profondeur, sans OFFSET ni
+COUNT(*) complet.
+"""
+
+import hashlib
+import json
+
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+from sqlalchemy import and_, or_, tuple_, func
+
+from app import db
+
+# Total exact jusqu'à ce plafond, puis « 10 000+ »
+COUNT_CAP = 10000
+
+# Modes de calcul du total (paramètre total=)
+TOTAL_MODES = ('exact', 'estimation')
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible, altéré ou émis pour une autre recherche"""
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='search-cursor')
+
+
+def params_fingerprint(params):
+    """Empreinte des filtres : un curseur n'est valable que pour sa recherche"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(values, fingerprint):
+    """Jeton opaque (signé) de la clé de tri de la dernière ligne"""
+    return _serializer().dumps({'k': list(values), 'f': fingerprint})
+
+
+def decode_cursor(token, fingerprint, size):
+    """Valeurs de la clé de tri d'un jeton, ou InvalidCursor"""
+    try:
+        payload = _serializer().loads(token)
+    except BadSignature:
+        raise InvalidCursor("Curseur invalide")
+    if not isinstance(payload, dict) or payload.get('f') != fingerprint:
+        raise InvalidCursor("Curseur invalide pour cette recherche")
+    values = payload.get('k')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Curseur invalide pour cette recherche")
+    return values
+
+
+def after_keys(keys, values):
+    """
+    Condition « strictement après values » dans l'ordre keys
+
+    Sens uniforme : comparaison de lignes (a, b, c) > (x, y, z), servie par
+    un index composite. Sens mixtes : développement en OR.
+    """
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1:
+        row = tuple_(*[expression for expression, _ in keys])
+        bound = tuple_(*values)
+        return row < bound if directions.pop() else row > bound
+
+    conditions = []
+    for i, (expression, descending) in enumerate(keys):
+        equal = [keys[j][0] == values[j] for j in range(i)]
+        beyond = expression < values[i] if descending else expression > values[i]
+        conditions.append(and_(*equal, beyond))
+    return or_(*conditions)
+
+
+def keyset_page(query, keys, per_page, values=None):
+    """
+    Une page après values (None : première page)
+
+    Returns:
+        tuple: (lignes, valeurs de la clé de tri de la dernière ligne ou None
+        s'il n'y a pas de page suivante)
+    """
+    if values is not None:
+        query = query.filter(after_keys(keys, values))
+
+    query = query.add_columns(*[
+        expression.label(f'cle_{i}') for i, (expression, _) in enumerate(keys)
+    ]).order_by(*[
+        expression.desc() if descending else expression.asc()
+        for expression, descending in keys
+    ])
+
+    rows = query.limit(per_page + 1).all()
+    items = [row[0] for row in rows[:per_page]]
+    if len(rows) <= per_page:
+        return items, None
+    return items, list(rows[per_page - 1][1:])
+
+
+def capped_count(query, cap=COUNT_CAP):
+    """(total, exact) : COUNT limité à cap + 1 lignes"""
+    limited = query.order_by(None).limit(cap + 1).subquery()
+    total = db.session.query(func.count()).select_from(limited).scalar()
+    if total > cap:
+        return cap, False
+    return total, True
+
+
+def estimated_count(query):
+    """(total, False) : nombre de lignes estimé par le planificateur (EXPLAIN)"""
+    compiled = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows']), False
+
+
+def count_results(query, mode='exact'):
+    """Total selon le mode : 'exact' (borné à COUNT_CAP) ou 'estimation'"""
+    if mode == 'estimation':
+        return estimated_count(query)
+    return capped_count(query)
@@ -0,0 +1,161 @@
+"""
+Filtres de recherche d'entreprises sur la table search_document
+Partagés par l'API de recherche et les exports
+"""
+
+import re
+
+from sqlalchemy import or_, false, func, case, cast, select, Float
+
+from app.models import SearchDocument, Etablissement
+
+# Paramètres de filtre acceptés (query string)
+SEARCH_FILTERS = ('q', 'mode', 'code_postal', 'ville', 'activite', 'categorie', 'etat')
+
+# Configuration plein texte créée par scripts/import_csv.py (unaccent + french)
+SEARCH_TS_CONFIG = 'fr_unaccent'
+
+# Classement plein texte : multiplicateur appliqué aux entreprises actives
+ACTIVE_BOOST = 2.0
+
+# Tri par défaut : valeur de tri des entreprises sans état administratif
+# (même expression que l'index idx_sd_tri de scripts/import_csv.py)
+UNKNOWN_STATE = 'Z'
+
+
+def search_params(args):
+    """Extrait les filtres de recherche d'une query string (request.args)"""
+    return {name: args.get(name, '').strip() for name in SEARCH_FILTERS}
+
+
+def exact_identifier(q):
+    """('siren' | 'siret', valeur) si q est un SIREN ou SIRET complet, sinon None"""
+    digits = q.replace(' ', '')
+    if digits.isdigit():
+        if len(digits) == 9:
+            return 'siren', digits
+        if len(digits) == 14:
+            return 'siret', digits
+    return None
+
+
+def filter_identifier(query, kind, value):
+    """Recherche exacte par clé primaire (SIREN, ou SIRET via etablissement)"""
+    if kind == 'siren':
+        return query.filter(SearchDocument.siren == value)
+    siren = select(Etablissement.siren).where(Etablissement.siret == value).scalar_subquery()
+    return query.filter(SearchDocument.siren == siren)
+
+
+def text_query(q):
+    """
+    tsquery de q : tous les mots, chacun en préfixe (« boul pari » donne
+    boul:* & pari:*), ou None si q ne contient aucun mot
+    """
+    words = re.findall(r'[^\W_]+', q)
+    if not words:
+        return None
+    return func.to_tsquery(SEARCH_TS_CONFIG, ' & '.join(f"{w}:*" for w in words))
+
+
+def search_mode(params):
+    """
+    Mode de recherche textuelle : 'identifiant' (SIREN/SIRET exact),
+    'contient' (trigrammes, mode=contient), 'texte' (plein texte) ou None
+    """
+    q = params.get('q')
+    if not q:
+        return None
+    if exact_identifier(q):
+        return 'identifiant'
+    if params.get('mode') == 'contient':
+        return 'contient'
+    return 'texte'
+
+
+def apply_search_filters(query, params):
+    """
+    Applique les filtres de recherche à une requête sur SearchDocument
+
+    Chaque filtre correspond à un index de search_document (GIN plein texte,
+    trigrammes pour les recherches « contient », varchar_pattern_ops pour les
+    préfixes). Un SIREN ou SIRET complet est recherché par clé primaire.
+    """
+    q = params.get('q')
+    mode = search_mode(params)
+    if mode == 'identifiant':
+        query = filter_identifier(query, *exact_identifier(q))
+
+    elif mode == 'contient':
+        conditions = [SearchDocument.nom_recherche.ilike(f"%{q}%")]
+        if q.isdigit():
+            conditions.append(SearchDocument.siren.like(f"{q}%"))
+        query = query.filter(or_(*conditions))
+
+    elif mode == 'texte':
+        conditions = []
+        tsquery = text_query(q)
+        if tsquery is not None:
+            conditions.append(SearchDocument.recherche.op('@@')(tsquery))
+        if q.isdigit():
+            conditions.append(SearchDocument.siren.like(f"{q}%"))
+        query = query.filter(or_(*conditions) if conditions else false())
+
+    if params.get('activite'):
+        query = query.filter(SearchDocument.activite_principale.like(f"{params['activite']}%"))
+
+    if params.get('categorie'):
+        query = query.filter(SearchDocument.categorie_entreprise == params['categorie'])
+
+    if params.get('etat'):
+        query = query.filter(SearchDocument.etat_administratif == params['etat'])
+
+    # Filtre géographique (adresse du siège)
+    if params.get('code_postal'):
+        query = query.filter(SearchDocument.code_postal.like(f"{params['code_postal']}%"))
+
+    if params.get('ville'):
+        query = query.filter(SearchDocument.libelle_commune.ilike(f"%{params['ville']}%"))
+
+    return query
+
+
+def relevance_rank(tsquery):
+    """
+    Score plein texte, multiplié par ACTIVE_BOOST pour les entreprises actives
+    (double precision : valeur exacte une fois relue dans un curseur)
+    """
+    return cast(func.ts_rank_cd(SearchDocument.recherche, tsquery, 1) * case(
+        (SearchDocument.etat_administratif == 'A', ACTIVE_BOOST),
+        else_=1.0
+    ), Float)
+
+
+def sort_keys(params=None):
+    """
+    Clé de tri stable : [(expression, décroissant)], terminée par siren (unique)
+
+    En plein texte : score ts_rank_cd (noms pondérés A, noms secondaires B),
+    entreprises actives favorisées. Sinon : entreprises actives d'abord puis
+    ordre alphabétique du nom affiché (index idx_sd_tri, sur les mêmes
+    expressions). L'état est coalescé : une comparaison de lignes avec NULL
+    n'est jamais vraie, le curseur sauterait les lignes sans état.
+    """
+    tsquery = text_query(params['q']) if search_mode(params or {}) == 'texte' else None
+    if tsquery is not None:
+        return [(relevance_rank(tsquery), True), (SearchDocument.siren, False)]
+
+    return [
+        # A avant C, état inconnu en dernier (comme NULL en tri croissant)
+        (func.coalesce(SearchDocument.etat_administratif, UNKNOWN_STATE), False),
+        (SearchDocument.nom_complet, False),
+        (SearchDocument.siren, False)
+    ]
+
+
+def order_by_relevance(query, params=None):
+    """Tri par pertinence (voir sort_keys)"""
+    return query.order_by(*[
+        expression.desc() if descending else expression.asc()
+        for expression, descending in sort_keys(params)
+    ])
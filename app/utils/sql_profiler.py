@@ -0,0 +1,265 @@
+"""
+Instrumentation SQL par requête HTTP
+
+Des événements sur le moteur SQLAlchemy mesurent chaque instruction : nombre
+d'instructions, temps total en base et instruction la plus lente par requête,
+renvoyés dans l'en-tête Server-Timing et agrégés par route (processus
+courant). Les SELECT plus lents que SQL_SLOW_MS sont consignés, une entrée
+JSON par ligne, dans un journal rotatif (SQL_SLOW_LOG) consulté sur
+/debug/sql.
+
+Avec SQL_EXPLAIN, l'instruction la plus lente d'une requête est rejouée avec
+EXPLAIN (ANALYZE, BUFFERS) par un thread de fond, hors du chemin de la
+requête : au plus une fois toutes les SQL_EXPLAIN_INTERVAL secondes par
+processus, le reste est consigné sans plan. File bornée : en cas de
+saturation, les entrées sont abandonnées plutôt que de ralentir les requêtes.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import g, request, has_request_context
+from sqlalchemy import event, text
+
+# Instructions lentes consignées par requête HTTP (les plus lentes)
+MAX_SLOW_ENTRIES = 3
+
+# Entrées en attente du thread de fond (au-delà : abandonnées)
+QUEUE_SIZE = 100
+
+# Durée maximale d'un EXPLAIN ANALYZE (ms)
+EXPLAIN_TIMEOUT_MS = 30000
+
+# Journal rotatif : taille d'un fichier et nombre d'archives
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+
+# Seules les lectures sont rejouées (EXPLAIN ANALYZE exécute l'instruction),
+# dans une transaction en lecture seule : une CTE qui modifie des données
+# (WITH ... INSERT/UPDATE/DELETE) y est refusée au lieu d'être réexécutée
+EXPLAINABLE = ('select', 'with')
+
+# Option d'exécution des connexions non mesurées (EXPLAIN du profileur)
+SKIP_OPTION = 'sql_profiler_skip'
+
+logger = logging.getLogger('app.slow_queries')
+
+_routes = {}
+_routes_lock = threading.Lock()
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_worker = {'thread': None, 'pid': None}
+_worker_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profiler_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('profiler_start')
+    if not starts:
+        return
+    elapsed = (time.perf_counter() - starts.pop()) * 1000
+
+    if not has_request_context() or conn.get_execution_options().get(SKIP_OPTION):
+        return
+    stats = g.get('sql_stats')
+    if stats is None:
+        return
+
+    stats['count'] += 1
+    stats['total_ms'] += elapsed
+    if elapsed > stats['slowest_ms']:
+        stats['slowest_ms'] = elapsed
+        stats['slowest'] = statement
+
+    if (elapsed >= stats['slow_ms'] and not executemany
+            and statement.lstrip().lower().startswith(EXPLAINABLE)):
+        stats['slow'].append((elapsed, statement, parameters))
+
+
+def _start_request(slow_ms):
+    g.sql_stats = {
+        'started': time.perf_counter(),
+        'slow_ms': slow_ms,
+        'count': 0, 'total_ms': 0.0,
+        'slowest_ms': 0.0, 'slowest': None,
+        'slow': [],
+    }
+
+
+def _server_timing(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+
+    app_ms = (time.perf_counter() - stats['started']) * 1000
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={stats["total_ms"]:.1f};desc="{stats["count"]} requetes"',
+        f'db-max;dur={stats["slowest_ms"]:.1f}',
+        f'app;dur={app_ms:.1f}',
+    ])
+    return response
+
+
+def _record_route(stats):
+    endpoint = request.endpoint or request.path
+    with _routes_lock:
+        route = _routes.setdefault(endpoint, {
+            'requests': 0, 'statements': 0, 'max_statements': 0,
+            'db_ms': 0.0, 'max_db_ms': 0.0, 'slowest_ms': 0.0, 'slowest': None,
+        })
+        route['requests'] += 1
+        route['statements'] += stats['count']
+        route['max_statements'] = max(route['max_statements'], stats['count'])
+        route['db_ms'] += stats['total_ms']
+        route['max_db_ms'] = max(route['max_db_ms'], stats['total_ms'])
+        if stats['slowest_ms'] > route['slowest_ms']:
+            route['slowest_ms'] = stats['slowest_ms']
+            route['slowest'] = stats['slowest']
+
+
+def explain(engine, statement, parameters):
+    """
+    Plan EXPLAIN (ANALYZE, BUFFERS) d'une instruction, dans une transaction
+    en lecture seule annulée (une écriture lève une erreur au lieu de s'exécuter)
+    """
+    with engine.connect().execution_options(**{SKIP_OPTION: True}) as connection:
+        try:
+            connection.execute(text("SET TRANSACTION READ ONLY"))
+            connection.execute(text(f"SET LOCAL statement_timeout = {EXPLAIN_TIMEOUT_MS}"))
+            rows = connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters or ()
+            )
+            return '\n'.join(row[0] for row in rows)
+        finally:
+            connection.rollback()
+
+
+def _write_entries(engine, explain_interval):
+    """Thread de fond : consigne les instructions lentes, EXPLAIN limité en débit"""
+    last_explain = None
+    while True:
+        entry = _queue.get()
+        now = time.monotonic()
+        wanted = entry.pop('explain')
+        if wanted and explain_interval is not None and (
+                last_explain is None or now - last_explain >= explain_interval):
+            last_explain = now
+            try:
+                entry['plan'] = explain(engine, entry['statement'], entry['parameters'])
+            except Exception as e:
+                # Table temporaire, instruction non rejouable... : pas de plan
+                entry['plan'] = f"EXPLAIN impossible : {e}"
+        entry['parameters'] = repr(entry['parameters'])
+        try:
+            logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+        except Exception:
+            pass
+
+
+def _enqueue(engine, explain_interval, entry):
+    """Confie une entrée au thread de fond du processus (démarré au besoin)"""
+    pid = os.getpid()
+    if _worker['pid'] != pid:
+        with _worker_lock:
+            if _worker['pid'] != pid:
+                # Après un fork (gunicorn), le thread du parent n'existe pas ici
+                thread = threading.Thread(
+                    target=_write_entries, args=(engine, explain_interval),
+                    name='sql-profiler', daemon=True
+                )
+                thread.start()
+                _worker.update(thread=thread, pid=pid)
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        pass
+
+
+def _finish_request(engine, explain_interval):
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return
+    _record_route(stats)
+
+    slow = sorted(stats['slow'], key=lambda item: item[0], reverse=True)[:MAX_SLOW_ENTRIES]
+    for rank, (elapsed, statement, parameters) in enumerate(slow):
+        _enqueue(engine, explain_interval, {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'endpoint': request.endpoint,
+            'path': request.full_path.rstrip('?'),
+            'duration_ms': round(elapsed, 1),
+            'statement': statement,
+            'parameters': parameters,
+            'plan': None,
+            # Seule la plus lente de la requête est candidate à EXPLAIN
+            'explain': rank == 0,
+        })
+
+
+def init_app(app, engine):
+    """Branche l'instrumentation sur engine et les requêtes de app"""
+    if not app.config['SQL_PROFILING']:
+        return
+
+    if app.config['SQL_SLOW_LOG'] and not logger.handlers:
+        os.makedirs(os.path.dirname(os.path.abspath(app.config['SQL_SLOW_LOG'])), exist_ok=True)
+        handler = RotatingFileHandler(
+            app.config['SQL_SLOW_LOG'], maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUPS, encoding='utf-8', delay=True
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def sql_profiler_start():
+        _start_request(app.config['SQL_SLOW_MS'])
+
+    app.after_request(_server_timing)
+
+    explain_interval = app.config['SQL_EXPLAIN_INTERVAL'] if app.config['SQL_EXPLAIN'] else None
+
+    @app.teardown_request
+    def sql_profiler_finish(exc):
+        _finish_request(engine, explain_interval)
+
+
+def route_stats():
+    """Agrégats par route du processus courant, les plus coûteuses d'abord"""
+    with _routes_lock:
+        routes = [dict(route, endpoint=endpoint) for endpoint, route in _routes.items()]
+    for route in routes:
+        route['avg_statements'] = round(route['statements'] / route['requests'], 1)
+        route['avg_db_ms'] = round(route['db_ms'] / route['requests'], 1)
+    return sorted(routes, key=lambda route: route['db_ms'], reverse=True)
+
+
+def slow_entries(path, limit=50):
+    """Dernières entrées du journal des instructions lentes, les plus récentes d'abord"""
+    entries = []
+    for suffix in [''] + [f'.{i}' for i in range(1, LOG_BACKUPS + 1)]:
+        try:
+            with open(path + suffix, encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            break
+        for line in reversed(lines):
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+            if len(entries) == limit:
+                return entries
+    return entries
@@ -119,6 +119,8 @@ CREATE TABLE etablissement (
     -- Géolocalisation
     coordonnee_lambert_x DECIMAL(15, 2),
     coordonnee_lambert_y DECIMAL(15, 2),
+    latitude DECIMAL(9, 6),                -- WGS84, calculées par import_csv.py
+    longitude DECIMAL(9, 6),
     identifiant_adresse VARCHAR(50),
 
     -- Dates
@@ -134,8 +136,88 @@ CREATE TABLE etablissement (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Variante partitionnée (python scripts/import_csv.py --partition ...) :
+-- l'import crée la table partitionnée en staging puis la bascule.
+--
+-- Hash du SIREN (--partition hash:16) : une requête par SIREN ne lit
+-- qu'une partition ; la clé primaire doit contenir la clé de partitionnement.
+--   CREATE TABLE etablissement (... , PRIMARY KEY (siret, siren))
+--       PARTITION BY HASH (siren);
+--   CREATE TABLE etablissement_p00 PARTITION OF etablissement
+--       FOR VALUES WITH (MODULUS 16, REMAINDER 0);      -- ... jusqu'à p15
+--
+-- Département (--partition departement) : une partition par préfixe de code
+-- postal (filtrer avec code_postal >= '75' AND code_postal < '76' pour
+-- l'élagage), clé primaire (siret) sur chaque partition uniquement.
+--   CREATE TABLE etablissement (...) PARTITION BY RANGE (code_postal);
+--   CREATE TABLE etablissement_d75 PARTITION OF etablissement
+--       FOR VALUES FROM ('75') TO ('76');               -- d00 ... d99
+--   CREATE TABLE etablissement_autres PARTITION OF etablissement DEFAULT;
+--
+-- La clé étrangère vers unite_legale est alors posée sur chaque partition.
+
+-- Recherche plein texte française insensible aux accents
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE TEXT SEARCH CONFIGURATION fr_unaccent (COPY = french);
+ALTER TEXT SEARCH CONFIGURATION fr_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+
+-- Document de recherche : une ligne par SIREN (unité légale + siège),
+-- reconstruit par import_csv.py après chaque import
+CREATE TABLE search_document (
+    siren VARCHAR(9) PRIMARY KEY,
+    nom_complet VARCHAR(255),              -- dénomination ou prénom + nom
+    nom_recherche TEXT,                    -- dénomination, sigle et nom
+    noms_secondaires TEXT,                 -- noms d'usage, prénoms, enseignes
+    denomination VARCHAR(255),
+    sigle VARCHAR(50),
+    nom VARCHAR(100),
+    prenom_1 VARCHAR(100),
+    categorie_juridique VARCHAR(10),
+    activite_principale VARCHAR(10),
+    categorie_entreprise VARCHAR(5),
+    tranche_effectifs VARCHAR(5),
+    etat_administratif CHAR(1),
+    date_creation DATE,
+
+    -- Siège
+    siret_siege VARCHAR(14),
+    adresse VARCHAR(500),
+    code_postal VARCHAR(10),
+    code_commune VARCHAR(10),
+    libelle_commune VARCHAR(100),
+    latitude DECIMAL(9, 6),
+    longitude DECIMAL(9, 6),
+
+    -- Plein texte : noms (poids A) et noms secondaires (poids B)
+    recherche TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('fr_unaccent', COALESCE(nom_recherche, '')), 'A') ||
+        setweight(to_tsvector('fr_unaccent', COALESCE(noms_secondaires, '')), 'B')
+    ) STORED
+);
+
+-- Génération des données publiées (incrémentée par import_csv.py à chaque
+-- publication de search_document) : invalide le cache de recherche de l'API
+CREATE TABLE dataset_generation (
+    id SERIAL PRIMARY KEY,
+    published_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- SIREN modifiés par un import incrémental dont le document de recherche
+-- reste à rafraîchir (vidée à chaque publication de search_document)
+CREATE TABLE search_document_pending (
+    siren VARCHAR(9) PRIMARY KEY
+);
+
+-- ============================================
+-- Extension pour recherche floue (fuzzy search)
+-- ============================================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ============================================
 -- INDEX pour optimiser les recherches
+-- Catalogue : INDEX_CATALOG dans scripts/import_csv.py
+-- (python scripts/import_csv.py --print-index-ddl)
 -- ============================================
 
 -- Index sur unite_legale
@@ -149,7 +231,8 @@ CREATE INDEX idx_ul_tranche_effectifs ON unite_legale(tranche_effectifs);
 
 -- Index sur etablissement
 CREATE INDEX idx_etab_siren ON etablissement(siren);
-CREATE INDEX idx_etab_siege ON etablissement(etablissement_siege);
+-- Partiel : sièges d'une liste de SIREN (une seule requête par page ou export)
+CREATE INDEX idx_etab_siege_siren ON etablissement(siren) WHERE etablissement_siege;
 CREATE INDEX idx_etab_etat ON etablissement(etat_administratif);
 CREATE INDEX idx_etab_activite ON etablissement(activite_principale);
 CREATE INDEX idx_etab_code_postal ON etablissement(code_postal);
@@ -157,14 +240,31 @@ CREATE INDEX idx_etab_commune ON etablissement(libelle_commune);
 CREATE INDEX idx_etab_code_commune ON etablissement(code_commune);
 CREATE INDEX idx_etab_denomination ON etablissement(denomination_usuelle);
 
--- Index composite pour recherches fréquentes
+-- Index composites pour recherches fréquentes
 CREATE INDEX idx_etab_siren_siege ON etablissement(siren, etablissement_siege);
 CREATE INDEX idx_etab_cp_activite ON etablissement(code_postal, activite_principale);
 
--- ============================================
--- Extension pour recherche floue (fuzzy search)
--- ============================================
-CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- Recherche géographique sans PostGIS : clé de cellule de 0,01° x 0,01°
+-- (même expression que GEO_CELL_SQL dans app/utils/geo_search.py)
+CREATE INDEX idx_etab_geo_cell ON etablissement(
+    ((floor(latitude * 100)::bigint + 9000) * 100000 + floor(longitude * 100)::bigint + 18000)
+) WHERE latitude IS NOT NULL;
+
+-- Index sur search_document (filtres de recherche et d'export)
+CREATE INDEX idx_sd_recherche ON search_document USING gin(recherche);
+CREATE INDEX idx_sd_nom_recherche_trgm ON search_document USING gin(nom_recherche gin_trgm_ops);
+CREATE INDEX idx_sd_siren_prefix ON search_document(siren varchar_pattern_ops);
+CREATE INDEX idx_sd_activite ON search_document(activite_principale varchar_pattern_ops);
+CREATE INDEX idx_sd_code_postal ON search_document(code_postal varchar_pattern_ops);
+CREATE INDEX idx_sd_commune_trgm ON search_document USING gin(libelle_commune gin_trgm_ops);
+CREATE INDEX idx_sd_categorie ON search_document(categorie_entreprise);
+-- Tri alphabétique et pagination par curseur de /search/api
+CREATE INDEX idx_sd_tri ON search_document((COALESCE(etat_administratif, 'Z')), nom_complet, siren);
+
+-- Statistiques étendues (colonnes corrélées)
+CREATE STATISTICS stat_etab_localisation (ndistinct, dependencies) ON code_postal, code_commune, libelle_commune FROM etablissement;
+CREATE STATISTICS stat_etab_activite_etat (ndistinct, dependencies, mcv) ON activite_principale, etat_administratif FROM etablissement;
+CREATE STATISTICS stat_ul_activite_etat (ndistinct, dependencies, mcv) ON activite_principale, etat_administratif FROM unite_legale;
 
 -- ============================================
 -- Vue pour faciliter les requêtes
@@ -191,6 +291,26 @@ SELECT
 FROM unite_legale ul
 LEFT JOIN etablissement e ON ul.siren = e.siren AND e.etablissement_siege = true;
 
+-- ============================================
+-- Suivi des imports incrémentaux (import_csv.py --incremental)
+-- ============================================
+CREATE TABLE import_state (
+    table_name VARCHAR(50) PRIMARY KEY,
+    high_water_mark TIMESTAMP,              -- MAX(date_dernier_traitement) appliqué
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE import_history (
+    file_hash VARCHAR(64) NOT NULL,         -- SHA-256 du fichier appliqué
+    table_name VARCHAR(50) NOT NULL,
+    file_name VARCHAR(255),
+    rows_read BIGINT,
+    rows_applied BIGINT,
+    high_water_mark TIMESTAMP,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (file_hash, table_name)
+);
+
 -- ============================================
 -- Table de référence des codes NAF (à remplir)
 -- ============================================
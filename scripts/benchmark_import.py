@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'import SIRENE : débit par stratégie de chargement
+
+Génère des jeux de données mock de plusieurs tailles, lance import_csv.py
+pour chaque stratégie (streaming, chunked, parallel, Parquet...) sur une
+base PostgreSQL dédiée recréée à chaque exécution, et produit un rapport
+JSON + markdown comparable d'une version à l'autre (lignes/s, pic de RSS,
+durées COPY / index / ANALYZE).
+
+Usage:
+    python benchmark_import.py --sizes 100k,1M
+    python benchmark_import.py --sizes 1M --strategies streaming,parallel --compare benchmarks/precedent.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+from generate_mock_data import generate
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+load_dotenv()
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+IMPORT_SCRIPT = os.path.join(SCRIPTS_DIR, 'import_csv.py')
+SCHEMA_FILE = os.path.join(ROOT_DIR, 'docs', 'schema.sql')
+
+DATA_DIR = os.path.join(ROOT_DIR, 'data', 'bench')
+REPORT_DIR = os.path.join(ROOT_DIR, 'benchmarks')
+
+# Base dédiée : jamais la base de l'application
+DEFAULT_DATABASE = 'sirene_bench'
+
+# Stratégie -> (méthode import_csv.py, format des fichiers)
+STRATEGIES = {
+    'streaming': ('streaming', 'csv'),
+    'chunked': ('chunked', 'csv'),
+    'parallel': ('parallel', 'csv'),
+    'streaming-parquet': ('streaming', 'parquet'),
+    'parallel-parquet': ('parallel', 'parquet'),
+}
+DEFAULT_STRATEGIES = ['streaming', 'chunked', 'parallel']
+
+# Étapes reprises du résumé JSON d'import_csv.py
+REPORT_STAGES = ['read', 'transform', 'copy', 'index', 'analyze', 'cluster', 'vacuum', 'search_document']
+
+# Variation de débit signalée comme régression (--compare)
+DEFAULT_THRESHOLD = 0.10
+
+
+def parse_size(value):
+    """'100k' -> 100000, '1M' -> 1000000, '2500' -> 2500"""
+    value = value.strip().lower()
+    factor = 1
+    if value.endswith('k'):
+        factor, value = 1000, value[:-1]
+    elif value.endswith('m'):
+        factor, value = 1000000, value[:-1]
+    return int(float(value) * factor)
+
+
+def format_count(count):
+    """100000 -> '100k', 1000000 -> '1M'"""
+    if count >= 1000000 and count % 1000000 == 0:
+        return f"{count // 1000000}M"
+    if count >= 1000 and count % 1000 == 0:
+        return f"{count // 1000}k"
+    return str(count)
+
+
+def db_config(database):
+    return {
+        'host': os.getenv('POSTGRES_HOST', 'localhost'),
+        'port': os.getenv('POSTGRES_PORT', '5432'),
+        'user': os.getenv('POSTGRES_USER', 'pappers'),
+        'password': os.getenv('POSTGRES_PASSWORD', 'pappers_secure_2024'),
+        'database': database,
+    }
+
+
+def reset_database(database):
+    """Recrée la base de benchmark à partir de docs/schema.sql"""
+    conn = psycopg2.connect(**db_config('postgres'))
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(database)))
+        cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(database)))
+    finally:
+        cursor.close()
+        conn.close()
+
+    conn = psycopg2.connect(**db_config(database))
+    cursor = conn.cursor()
+    try:
+        with open(SCHEMA_FILE, encoding='utf-8') as f:
+            cursor.execute(f.read())
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def prepare_dataset(size, file_format, seed, workers):
+    """
+    Génère (ou réutilise) le jeu de données d'une taille donnée
+
+    Returns:
+        dict: chemins des fichiers et nombres de lignes
+    """
+    directory = os.path.join(DATA_DIR, f"{format_count(size)}_seed{seed}")
+    manifest_path = os.path.join(directory, 'manifest.json')
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    else:
+        print(f"Génération du jeu {format_count(size)} ({directory})...")
+        ul_file, etab_file, nb_ul, nb_etab = generate(size, directory, seed, verbose=False, workers=workers)
+        manifest = {
+            'csv': {'unite_legale': ul_file, 'etablissement': etab_file},
+            'rows': {'unite_legale': nb_ul, 'etablissement': nb_etab},
+        }
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    if file_format == 'parquet' and 'parquet' not in manifest:
+        print(f"Conversion Parquet du jeu {format_count(size)}...")
+        manifest['parquet'] = {}
+        for table, csv_path in manifest['csv'].items():
+            parquet_path = csv_path[:-len('.csv')] + '.parquet'
+            with open(csv_path, encoding='utf-8') as f:
+                header = f.readline().rstrip('\r\n').split(',')
+            # Tout en texte (SIREN à zéros initiaux...) : la conversion de
+            # types est faite par l'import
+            table_data = pa_csv.read_csv(
+                csv_path,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in header},
+                    strings_can_be_null=False
+                )
+            )
+            pq.write_table(table_data, parquet_path, row_group_size=100000)
+            manifest['parquet'][table] = parquet_path
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def run_import(manifest, strategy, database, workers, metrics_path):
+    """
+    Lance import_csv.py dans un processus fils et mesure son pic de RSS
+
+    Returns:
+        dict: mesures de l'exécution
+    """
+    method, file_format = STRATEGIES[strategy]
+    files = manifest[file_format]
+
+    command = [
+        sys.executable, IMPORT_SCRIPT,
+        '-u', files['unite_legale'],
+        '-e', files['etablissement'],
+        '--method', method,
+        '--workers', str(workers),
+        '--metrics-file', metrics_path,
+    ]
+    env = dict(os.environ, POSTGRES_DB=database)
+
+    start = time.perf_counter()
+    with open(metrics_path + '.log', 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env)
+        # wait4 : ressources du seul processus fils (ru_maxrss en Ko sous Linux)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+
+    peak_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    result = {
+        'strategy': strategy,
+        'method': method,
+        'format': file_format,
+        'workers': workers if method == 'parallel' else 1,
+        'exit_code': process.returncode,
+        'elapsed_seconds': round(elapsed, 3),
+        'peak_rss_bytes': peak_rss,
+        'cpu_seconds': round(usage.ru_utime + usage.ru_stime, 3),
+        'log': metrics_path + '.log',
+    }
+
+    if process.returncode != 0 or not os.path.exists(metrics_path):
+        result['error'] = f"import_csv.py a échoué (voir {result['log']})"
+        return result
+
+    with open(metrics_path, encoding='utf-8') as f:
+        metrics = json.load(f)
+
+    rows = sum(metrics.get('tables', {}).values())
+    stages = metrics.get('stages', {})
+    load_seconds = elapsed - sum(
+        stages.get(name, {}).get('seconds', 0) for name in ('index', 'analyze', 'search_document')
+    )
+    result.update({
+        'rows': rows,
+        'rows_per_second': round(rows / elapsed) if elapsed > 0 else 0,
+        'load_rows_per_second': round(rows / load_seconds) if load_seconds > 0 else 0,
+        'stages': {name: stages.get(name, {}).get('seconds', 0) for name in REPORT_STAGES},
+        'rejects': metrics.get('rejects', {}),
+    })
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(path):
+    """Index (taille, stratégie) -> débit d'un rapport précédent"""
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    return {
+        (run['size'], run['strategy']): run
+        for run in report['runs'] if 'error' not in run
+    }
+
+
+def render_markdown(report, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """Rapport markdown : une ligne par (taille, stratégie)"""
+    lines = [
+        f"# Benchmark import SIRENE — {report['started_at']}",
+        "",
+        f"- Révision : `{report['revision'] or 'inconnue'}`",
+        f"- Machine : {report['machine']['platform']}, {report['machine']['cpu_count']} CPU",
+        f"- Workers : {report['workers']}",
+        "",
+        "| Taille | Stratégie | Lignes | Durée (s) | Lignes/s | Chargement lignes/s "
+        "| Pic RSS (Mo) | COPY (s) | Index (s) | ANALYZE (s) | Δ lignes/s |",
+        "|---|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+
+    for run in report['runs']:
+        if 'error' in run:
+            lines.append(f"| {format_count(run['size'])} | {run['strategy']} | ÉCHEC : {run['error']} "
+                         f"| | | | | | | | |")
+            continue
+
+        delta = ''
+        previous = (baseline or {}).get((run['size'], run['strategy']))
+        if previous and previous.get('rows_per_second'):
+            change = run['rows_per_second'] / previous['rows_per_second'] - 1
+            delta = f"{change:+.1%}"
+            if change < -threshold:
+                delta += " ⚠️"
+
+        stages = run['stages']
+        lines.append(
+            f"| {format_count(run['size'])} | {run['strategy']} | {run['rows']:,} "
+            f"| {run['elapsed_seconds']:.1f} | {run['rows_per_second']:,} "
+            f"| {run['load_rows_per_second']:,} | {run['peak_rss_bytes'] / 1048576:.0f} "
+            f"| {stages['copy']:.1f} | {stages['index']:.1f} | {stages['analyze']:.1f} | {delta} |"
+        )
+
+    if baseline:
+        lines += ["", f"⚠️ : débit en baisse de plus de {threshold:.0%} par rapport à la référence."]
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark des stratégies d'import SIRENE",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--sizes', default='100k',
+                        help="Nombres d'entreprises à générer, ex. 100k,1M,10M (défaut: 100k)")
+    parser.add_argument('--strategies', default=','.join(DEFAULT_STRATEGIES),
+                        help=f"Stratégies parmi {', '.join(STRATEGIES)} "
+                             f"(défaut: {','.join(DEFAULT_STRATEGIES)})")
+    parser.add_argument('--workers', '-w', type=int, default=min(8, os.cpu_count() or 4),
+                        help='Connexions du mode parallel')
+    parser.add_argument('--database', default=DEFAULT_DATABASE,
+                        help=f'Base de benchmark, recréée à chaque exécution (défaut: {DEFAULT_DATABASE})')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Graine du générateur (défaut: 42)')
+    parser.add_argument('--output', '-o',
+                        help='Préfixe du rapport (défaut: benchmarks/import_AAAAMMJJ_HHMMSS)')
+    parser.add_argument('--compare',
+                        help='Rapport JSON de référence pour signaler les régressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Baisse de débit signalée (défaut: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    strategies = [s.strip() for s in args.strategies.split(',') if s.strip()]
+
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        print(f"ERREUR : stratégie inconnue : {', '.join(unknown)}")
+        sys.exit(1)
+    if args.database == os.getenv('POSTGRES_DB', 'sirene'):
+        print("ERREUR : la base de benchmark est recréée, elle doit différer de POSTGRES_DB")
+        sys.exit(1)
+    if not PYARROW_AVAILABLE and any(STRATEGIES[s][1] == 'parquet' for s in strategies):
+        print("ATTENTION : pyarrow non installé, stratégies Parquet ignorées")
+        strategies = [s for s in strategies if STRATEGIES[s][1] != 'parquet']
+
+    started_at = datetime.now()
+    prefix = args.output or os.path.join(REPORT_DIR, f"import_{started_at:%Y%m%d_%H%M%S}")
+    os.makedirs(os.path.dirname(prefix) or '.', exist_ok=True)
+
+    report = {
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'database': args.database,
+        'workers': args.workers,
+        'seed': args.seed,
+        'runs': [],
+    }
+
+    print("="*70)
+    print("BENCHMARK IMPORT")
+    print("="*70)
+
+    for size in sizes:
+        for strategy in strategies:
+            manifest = prepare_dataset(size, STRATEGIES[strategy][1], args.seed, args.workers)
+            print(f"\n[{format_count(size)}] {strategy} : recréation de {args.database}...")
+            reset_database(args.database)
+
+            metrics_path = f"{prefix}_{format_count(size)}_{strategy}.metrics.json"
+            result = run_import(manifest, strategy, args.database, args.workers, metrics_path)
+            result['size'] = size
+            report['runs'].append(result)
+
+            if 'error' in result:
+                print(f"  ÉCHEC : {result['error']}")
+            else:
+                print(f"  {result['rows']:,} lignes en {result['elapsed_seconds']:.1f}s "
+                      f"({result['rows_per_second']:,} lignes/s, "
+                      f"pic RSS {result['peak_rss_bytes'] / 1048576:.0f} Mo)")
+
+    baseline = load_baseline(args.compare) if args.compare else None
+
+    with open(f"{prefix}.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(f"{prefix}.md", 'w', encoding='utf-8') as f:
+        f.write(render_markdown(report, baseline, args.threshold))
+
+    print(f"\nRapport : {prefix}.json")
+    print(f"          {prefix}.md")
+
+    failed = [run for run in report['runs'] if 'error' in run]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,125 @@
 #!/usr/bin/env python3
 """
 Génère des données mock pour tester l'application PAPPERS
-Crée des fichiers CSV avec ~1000 entreprises et ~3000 établissements
+Crée des fichiers CSV au format SIRENE (1000 entreprises par défaut,
+jusqu'à plusieurs dizaines de millions avec --entreprises et --workers,
+utilisé par benchmark_import.py)
+
+Les distributions suivent la forme des données réelles : nombre
+d'établissements par SIREN, codes NAF et communes tirés selon des lois de
+Zipf (quelques entreprises à des milliers d'établissements, concentration
+parisienne), coordonnées Lambert 93 autour du centre de chaque commune.
+La génération est découpée en blocs de taille fixe, chacun avec sa propre
+graine : à graine égale, les fichiers sont identiques quel que soit le
+nombre de processus.
 """
 
+import argparse
+import bisect
 import csv
 import random
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 # Dossier de sortie
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'mock')
 
+# Entreprises par bloc (unité de parallélisme et de reproductibilité)
+SHARD_SIZE = 50000
+
+# Exposants des lois de Zipf (poids du rang r : 1 / r^exposant)
+DEFAULT_ZIPF_ETABLISSEMENTS = 2.7    # ~1,6 établissement par SIREN en moyenne
+DEFAULT_ZIPF_NAF = 1.1
+DEFAULT_ZIPF_COMMUNES = 1.0          # Paris ~25 % des établissements
+DEFAULT_MAX_ETABLISSEMENTS = 20000   # NIC sur 5 chiffres : 90 000 au plus
+
+# Part des établissements sans coordonnées (adresse non géocodée)
+TAUX_SANS_COORDONNEES = 0.05
+
 # Données de référence
 PRENOMS = ['Jean', 'Marie', 'Pierre', 'Sophie', 'Michel', 'Anne', 'Philippe', 'Isabelle', 'François', 'Catherine']
 NOMS = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit', 'Durand', 'Leroy', 'Moreau']
-VILLES = [
-    ('75001', 'PARIS 1', '75056'),
-    ('75008', 'PARIS 8', '75056'),
-    ('75011', 'PARIS 11', '75056'),
-    ('69001', 'LYON 1', '69123'),
-    ('69003', 'LYON 3', '69123'),
-    ('13001', 'MARSEILLE 1', '13055'),
-    ('33000', 'BORDEAUX', '33063'),
-    ('31000', 'TOULOUSE', '31555'),
-    ('44000', 'NANTES', '44109'),
-    ('59000', 'LILLE', '59350'),
-    ('67000', 'STRASBOURG', '67482'),
-    ('06000', 'NICE', '06088'),
+
+# Communes par rang de fréquence : (libellé, écart-type en mètres autour du
+# centre, [(code postal, code commune, X Lambert 93, Y Lambert 93), ...]).
+# Paris, Lyon et Marseille sont découpées en arrondissements, tirés
+# uniformément une fois la commune choisie.
+COMMUNES = [
+    ('PARIS', 800, [
+        ('75001', '75101', 651300, 6862600), ('75002', '75102', 651900, 6863300),
+        ('75003', '75103', 653000, 6863100), ('75004', '75104', 652800, 6861800),
+        ('75005', '75105', 652300, 6860600), ('75006', '75106', 650800, 6861000),
+        ('75007', '75107', 648900, 6862000), ('75008', '75108', 648900, 6864100),
+        ('75009', '75109', 651200, 6864700), ('75010', '75110', 653100, 6864700),
+        ('75011', '75111', 654500, 6862900), ('75012', '75112', 656000, 6859800),
+        ('75013', '75113', 653500, 6858200), ('75014', '75114', 650400, 6858300),
+        ('75015', '75115', 647600, 6859600), ('75016', '75116', 645700, 6862500),
+        ('75017', '75117', 648400, 6866000), ('75018', '75118', 651600, 6867100),
+        ('75019', '75119', 655300, 6865500), ('75020', '75120', 656000, 6863100),
+    ]),
+    ('MARSEILLE', 1500, [
+        ('13001', '13201', 893400, 6246900), ('13006', '13206', 892900, 6245700),
+        ('13008', '13208', 892400, 6242300), ('13013', '13213', 897400, 6254200),
+        ('13015', '13215', 892300, 6253300),
+    ]),
+    ('LYON', 1000, [
+        ('69001', '69381', 842500, 6520700), ('69002', '69382', 842000, 6518500),
+        ('69003', '69383', 844600, 6519500), ('69006', '69386', 843900, 6521200),
+        ('69007', '69387', 843000, 6516900),
+    ]),
+    ('TOULOUSE', 3000, [('31000', '31555', 574500, 6279500)]),
+    ('NICE', 2500, [('06000', '06088', 1043900, 6299400)]),
+    ('NANTES', 2500, [('44000', '44109', 355400, 6689500)]),
+    ('MONTPELLIER', 2500, [('34000', '34172', 770700, 6279700)]),
+    ('BORDEAUX', 2500, [('33000', '33063', 417300, 6421900)]),
+    ('STRASBOURG', 2500, [('67000', '67482', 1050300, 6840900)]),
+    ('LILLE', 2000, [('59000', '59350', 704000, 7059100)]),
+    ('RENNES', 2000, [('35000', '35238', 351900, 6789300)]),
+    ('BOULOGNE-BILLANCOURT', 1000, [('92100', '92012', 644800, 6857900)]),
+    ('NEUILLY-SUR-SEINE', 800, [('92200', '92051', 645900, 6865400)]),
+    ('AIX-EN-PROVENCE', 3000, [('13100', '13001', 893300, 6271500)]),
+    ('REIMS', 2000, [('51100', '51454', 775900, 6906600)]),
+    ('TOULON', 2500, [('83000', '83137', 940300, 6224000)]),
+    ('GRENOBLE', 1500, [('38000', '38185', 914000, 6457600)]),
+    ('SAINT-ETIENNE', 2000, [('42000', '42218', 808200, 6482200)]),
+    ('DIJON', 2000, [('21000', '21231', 853800, 6694500)]),
+    ('ANGERS', 2000, [('49000', '49007', 430800, 6717400)]),
+    ('LE HAVRE', 2500, [('76600', '76351', 493500, 6935100)]),
+    ('NIMES', 3000, [('30000', '30189', 810400, 6303300)]),
+    ('CLERMONT-FERRAND', 2000, [('63000', '63113', 706300, 6518700)]),
+    ('LE MANS', 2000, [('72000', '72181', 492000, 6776200)]),
+    ('TOURS', 2000, [('37000', '37261', 525500, 6703900)]),
+    ('AMIENS', 2000, [('80000', '80021', 649000, 6977300)]),
+    ('LIMOGES', 2500, [('87000', '87085', 565200, 6528200)]),
+    ('PERPIGNAN', 2500, [('66000', '66136', 691700, 6176500)]),
+    ('METZ', 2000, [('57000', '57463', 931500, 6895800)]),
+    ('BESANCON', 2000, [('25000', '25056', 928400, 6695500)]),
+    ('ORLEANS', 2000, [('45000', '45234', 619200, 6754600)]),
+    ('ROUEN', 1500, [('76000', '76540', 562300, 6928500)]),
+    ('CAEN', 1500, [('14000', '14118', 454700, 6904800)]),
+    ('NANCY', 1500, [('54000', '54395', 933400, 6848600)]),
+    ('BREST', 2000, [('29200', '29019', 146300, 6838300)]),
+    ('ANNECY', 2000, [('74000', '74010', 940600, 6541500)]),
+    ('LA ROCHELLE', 2000, [('17000', '17300', 380600, 6570400)]),
+    ('PAU', 2000, [('64000', '64445', 427400, 6250000)]),
+    ('BAYONNE', 1500, [('64100', '64102', 340900, 6277200)]),
+    ('AJACCIO', 2000, [('20000', '2A004', 1190800, 6108200)]),
 ]
+
 TYPES_VOIE = ['RUE', 'AVENUE', 'BOULEVARD', 'PLACE', 'IMPASSE', 'ALLEE']
 NOMS_VOIE = ['DE LA REPUBLIQUE', 'VICTOR HUGO', 'JEAN JAURES', 'DE LA LIBERTE', 'DU GENERAL DE GAULLE',
              'PASTEUR', 'GAMBETTA', 'CARNOT', 'FOCH', 'DES FLEURS']
-CODES_NAF = ['62.01Z', '70.22Z', '47.11F', '56.10A', '86.21Z', '43.21A', '68.20A', '96.02A', '85.59A', '46.90Z']
+
+# Codes NAF par rang de fréquence (location immobilière et conseil en tête)
+CODES_NAF = [
+    '68.20B', '70.22Z', '68.20A', '62.01Z', '56.10A', '96.02A', '43.21A', '85.59A',
+    '86.21Z', '47.11F', '46.90Z', '41.20A', '49.32Z', '74.90B', '73.11Z', '90.01Z',
+    '85.51Z', '96.09Z', '43.99C', '82.99Z', '64.20Z', '66.19B', '47.71Z', '56.30Z',
+    '45.20A', '43.22A', '10.71C', '93.13Z', '81.21Z', '86.90E', '88.10B', '94.99Z',
+    '01.11Z', '55.10Z', '47.73Z', '69.20Z', '69.10Z', '71.12B', '86.23Z', '49.41A',
+]
 CATEGORIES_JURIDIQUES = ['1000', '5499', '5710', '5720', '5498']
 CATEGORIES_ENTREPRISE = ['PME', 'ETI', 'GE', None, None, None]  # Plus de chances d'être None (petites entreprises)
 TRANCHES_EFFECTIFS = ['00', '01', '02', '03', '11', '12', '21', '22', '31', '32']
@@ -47,28 +134,47 @@ DENOMINATIONS = [
 ]
 
 
-def random_date(start_year=1990, end_year=2023):
+class Zipf:
+    """Tirage d'un élément d'une liste selon son rang (poids 1 / rang^exposant)"""
+
+    def __init__(self, items, exponent):
+        self.items = items
+        self.cum_weights = []
+        total = 0.0
+        for rank in range(1, len(items) + 1):
+            total += rank ** -exponent
+            self.cum_weights.append(total)
+        self.total = total
+
+    def draw(self, rng):
+        return self.items[bisect.bisect(self.cum_weights, rng.random() * self.total)]
+
+    def mean(self):
+        """Moyenne des éléments (listes numériques)"""
+        previous = 0.0
+        mean = 0.0
+        for item, cum in zip(self.items, self.cum_weights):
+            mean += item * (cum - previous)
+            previous = cum
+        return mean / self.total
+
+
+def random_date(rng, start_year=1990, end_year=2023):
     """Génère une date aléatoire"""
     start = datetime(start_year, 1, 1)
     end = datetime(end_year, 12, 31)
-    delta = end - start
-    random_days = random.randint(0, delta.days)
-    return (start + timedelta(days=random_days)).strftime('%Y-%m-%d')
-
-
-def generate_siren():
-    """Génère un SIREN valide (9 chiffres)"""
-    return ''.join([str(random.randint(0, 9)) for _ in range(9)])
+    return (start + timedelta(days=rng.randint(0, (end - start).days))).strftime('%Y-%m-%d')
 
 
-def generate_nic():
-    """Génère un NIC (5 chiffres)"""
-    return str(random.randint(10000, 99999))
+def random_traitement(rng):
+    """Date de dernier traitement (fixée par la graine, pas par l'horloge)"""
+    moment = datetime(2023, 1, 1) + timedelta(seconds=rng.randint(0, 365 * 86400))
+    return moment.strftime('%Y-%m-%dT%H:%M:%S')
 
 
-def generate_unite_legale(siren, is_person=False):
+def generate_unite_legale(rng, distributions, siren, is_person=False):
     """Génère une unité légale (entreprise)"""
-    date_creation = random_date(1990, 2020)
+    date_creation = random_date(rng, 1990, 2020)
 
     data = {
         'siren': siren,
@@ -84,47 +190,65 @@ def generate_unite_legale(siren, is_person=False):
         'prenomUsuelUniteLegale': '',
         'pseudonymeUniteLegale': '',
         'identifiantAssociationUniteLegale': '',
-        'trancheEffectifsUniteLegale': random.choice(TRANCHES_EFFECTIFS),
+        'trancheEffectifsUniteLegale': rng.choice(TRANCHES_EFFECTIFS),
         'anneeEffectifsUniteLegale': '2022',
-        'dateDernierTraitementUniteLegale': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+        'dateDernierTraitementUniteLegale': random_traitement(rng),
         'nombrePeriodesUniteLegale': '1',
-        'categorieEntreprise': random.choice(CATEGORIES_ENTREPRISE) or '',
+        'categorieEntreprise': rng.choice(CATEGORIES_ENTREPRISE) or '',
         'anneeCategorieEntreprise': '2022',
         'dateDebut': date_creation,
-        'etatAdministratifUniteLegale': random.choice(['A', 'A', 'A', 'A', 'C']),  # 80% actives
+        'etatAdministratifUniteLegale': rng.choice(['A', 'A', 'A', 'A', 'C']),  # 80% actives
         'nomUniteLegale': '',
         'nomUsageUniteLegale': '',
         'denominationUniteLegale': '',
         'denominationUsuelle1UniteLegale': '',
         'denominationUsuelle2UniteLegale': '',
         'denominationUsuelle3UniteLegale': '',
-        'categorieJuridiqueUniteLegale': random.choice(CATEGORIES_JURIDIQUES),
-        'activitePrincipaleUniteLegale': random.choice(CODES_NAF),
+        'categorieJuridiqueUniteLegale': rng.choice(CATEGORIES_JURIDIQUES),
+        'activitePrincipaleUniteLegale': distributions['naf'].draw(rng),
         'nomenclatureActivitePrincipaleUniteLegale': 'NAFRev2',
         'nicSiegeUniteLegale': '',  # Sera rempli après
-        'economieSocialeSolidaireUniteLegale': random.choice(['O', 'N', '', '']),
-        'societeMissionUniteLegale': random.choice(['O', 'N', '', '']),
-        'caractereEmployeurUniteLegale': random.choice(['O', 'N']),
+        'economieSocialeSolidaireUniteLegale': rng.choice(['O', 'N', '', '']),
+        'societeMissionUniteLegale': rng.choice(['O', 'N', '', '']),
+        'caractereEmployeurUniteLegale': rng.choice(['O', 'N']),
     }
 
     if is_person:
-        data['sexeUniteLegale'] = random.choice(['M', 'F'])
-        data['nomUniteLegale'] = random.choice(NOMS)
-        data['prenom1UniteLegale'] = random.choice(PRENOMS)
+        data['sexeUniteLegale'] = rng.choice(['M', 'F'])
+        data['nomUniteLegale'] = rng.choice(NOMS)
+        data['prenom1UniteLegale'] = rng.choice(PRENOMS)
         data['prenomUsuelUniteLegale'] = data['prenom1UniteLegale']
     else:
-        base_name = random.choice(DENOMINATIONS)
-        suffix = random.choice(['', ' SAS', ' SARL', ' SA', ' EURL', ' SCI'])
+        base_name = rng.choice(DENOMINATIONS)
+        suffix = rng.choice(['', ' SAS', ' SARL', ' SA', ' EURL', ' SCI'])
         data['denominationUniteLegale'] = f"{base_name}{suffix}"
-        data['sigleUniteLegale'] = ''.join([w[0] for w in base_name.split()[:3]]) if random.random() > 0.7 else ''
+        data['sigleUniteLegale'] = ''.join([w[0] for w in base_name.split()[:3]]) if rng.random() > 0.7 else ''
 
     return data
 
 
-def generate_etablissement(siren, nic, is_siege=False):
+def generate_etablissement(rng, distributions, ul, nic, is_siege=False):
     """Génère un établissement"""
-    ville = random.choice(VILLES)
-    date_creation = random_date(1990, 2023)
+    siren = ul['siren']
+    libelle, sigma, adresses = distributions['communes'].draw(rng)
+    code_postal, code_commune, x, y = rng.choice(adresses)
+    date_creation = random_date(rng, 1990, 2023)
+
+    if rng.random() < TAUX_SANS_COORDONNEES:
+        lambert_x = lambert_y = ''
+    else:
+        lambert_x = f"{rng.gauss(x, sigma):.1f}"
+        lambert_y = f"{rng.gauss(y, sigma):.1f}"
+
+    # Les établissements secondaires exercent le plus souvent l'activité de l'entreprise
+    if is_siege or rng.random() < 0.9:
+        activite = ul['activitePrincipaleUniteLegale']
+    else:
+        activite = distributions['naf'].draw(rng)
+
+    # Arrondissements : PARIS 11, LYON 3...
+    if len(adresses) > 1:
+        libelle = f"{libelle} {int(code_postal[-2:])}"
 
     data = {
         'siren': siren,
@@ -132,31 +256,31 @@ def generate_etablissement(siren, nic, is_siege=False):
         'siret': f"{siren}{nic}",
         'statutDiffusionEtablissement': 'O',
         'dateCreationEtablissement': date_creation,
-        'trancheEffectifsEtablissement': random.choice(TRANCHES_EFFECTIFS),
+        'trancheEffectifsEtablissement': rng.choice(TRANCHES_EFFECTIFS),
         'anneeEffectifsEtablissement': '2022',
         'activitePrincipaleRegistreMetiersEtablissement': '',
-        'dateDernierTraitementEtablissement': datetime.now().strftime('%Y-%m-%dT%H:%M:%S'),
+        'dateDernierTraitementEtablissement': random_traitement(rng),
         'etablissementSiege': 'true' if is_siege else 'false',
         'nombrePeriodesEtablissement': '1',
         'complementAdresseEtablissement': '',
-        'numeroVoieEtablissement': str(random.randint(1, 150)),
+        'numeroVoieEtablissement': str(rng.randint(1, 150)),
         'indiceRepetitionEtablissement': '',
         'dernierNumeroVoieEtablissement': '',
         'indiceRepetitionDernierNumeroVoieEtablissement': '',
-        'typeVoieEtablissement': random.choice(TYPES_VOIE),
-        'libelleVoieEtablissement': random.choice(NOMS_VOIE),
-        'codePostalEtablissement': ville[0],
-        'libelleCommuneEtablissement': ville[1],
+        'typeVoieEtablissement': rng.choice(TYPES_VOIE),
+        'libelleVoieEtablissement': rng.choice(NOMS_VOIE),
+        'codePostalEtablissement': code_postal,
+        'libelleCommuneEtablissement': libelle,
         'libelleCommuneEtrangerEtablissement': '',
         'distributionSpecialeEtablissement': '',
-        'codeCommuneEtablissement': ville[2],
+        'codeCommuneEtablissement': code_commune,
         'codeCedexEtablissement': '',
         'libelleCedexEtablissement': '',
         'codePaysEtrangerEtablissement': '',
         'libellePaysEtrangerEtablissement': '',
         'identifiantAdresseEtablissement': '',
-        'coordonneeLambertAbscisseEtablissement': '',
-        'coordonneeLambertOrdonneeEtablissement': '',
+        'coordonneeLambertAbscisseEtablissement': lambert_x,
+        'coordonneeLambertOrdonneeEtablissement': lambert_y,
         'complementAdresse2Etablissement': '',
         'numeroVoie2Etablissement': '',
         'indiceRepetition2Etablissement': '',
@@ -172,86 +296,196 @@ def generate_etablissement(siren, nic, is_siege=False):
         'codePaysEtranger2Etablissement': '',
         'libellePaysEtranger2Etablissement': '',
         'dateDebut': date_creation,
-        'etatAdministratifEtablissement': 'A' if is_siege or random.random() > 0.2 else 'F',
-        'enseigne1Etablissement': random.choice(['', '', '', f"Enseigne {random.randint(1, 100)}"]),
+        'etatAdministratifEtablissement': 'A' if is_siege or rng.random() > 0.2 else 'F',
+        'enseigne1Etablissement': rng.choice(['', '', '', f"Enseigne {rng.randint(1, 100)}"]),
         'enseigne2Etablissement': '',
         'enseigne3Etablissement': '',
         'denominationUsuelleEtablissement': '',
-        'activitePrincipaleEtablissement': random.choice(CODES_NAF),
+        'activitePrincipaleEtablissement': activite,
         'nomenclatureActivitePrincipaleEtablissement': 'NAFRev2',
-        'caractereEmployeurEtablissement': random.choice(['O', 'N']),
+        'caractereEmployeurEtablissement': rng.choice(['O', 'N']),
     }
 
     return data
 
 
-def main():
-    # Créer le dossier de sortie
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    print("="*60)
-    print("GÉNÉRATION DES DONNÉES MOCK")
-    print("="*60)
-
-    # Générer les entreprises
-    nb_entreprises = 1000
-    unites_legales = []
-    etablissements = []
-
-    print(f"\nGénération de {nb_entreprises} entreprises...")
-
-    for i in range(nb_entreprises):
-        siren = generate_siren()
-        is_person = random.random() < 0.3  # 30% personnes physiques
-
-        ul = generate_unite_legale(siren, is_person)
-
-        # Générer le siège
-        nic_siege = generate_nic()
-        ul['nicSiegeUniteLegale'] = nic_siege
-        siege = generate_etablissement(siren, nic_siege, is_siege=True)
-        etablissements.append(siege)
+def build_distributions(options):
+    """Lois de Zipf (construites une fois par processus)"""
+    max_etab = min(options['max_etablissements'], 90000)
+    return {
+        'etablissements': Zipf(list(range(1, max_etab + 1)), options['zipf_etablissements']),
+        'naf': Zipf(CODES_NAF, options['zipf_naf']),
+        'communes': Zipf(COMMUNES, options['zipf_communes']),
+    }
 
-        # Générer des établissements secondaires (0 à 5)
-        nb_etab = random.choices([0, 1, 2, 3, 4, 5], weights=[40, 30, 15, 8, 5, 2])[0]
-        for _ in range(nb_etab):
-            nic = generate_nic()
-            etab = generate_etablissement(siren, nic, is_siege=False)
-            etablissements.append(etab)
 
-        unites_legales.append(ul)
+def generate_shard(shard, start, count, seed, siren_offset, output_dir, options):
+    """
+    Génère un bloc d'entreprises dans ses propres fichiers partiels
+
+    Le bloc a sa propre graine (graine globale + numéro de bloc) : son
+    contenu ne dépend pas du processus qui l'exécute.
+
+    Returns:
+        tuple: (fichier UL partiel, fichier établissements partiel,
+                nombre d'entreprises, nombre d'établissements)
+    """
+    rng = random.Random(f"{seed}:{shard}")
+    distributions = build_distributions(options)
+
+    ul_part = os.path.join(output_dir, f'.StockUniteLegale_mock.{shard:05d}.part')
+    etab_part = os.path.join(output_dir, f'.StockEtablissement_mock.{shard:05d}.part')
+    nb_etablissements = 0
+
+    with open(ul_part, 'w', newline='', encoding='utf-8') as f_ul, \
+            open(etab_part, 'w', newline='', encoding='utf-8') as f_etab:
+        ul_writer = csv.writer(f_ul)
+        etab_writer = csv.writer(f_etab)
+
+        for i in range(start, start + count):
+            # SIREN uniques sans les garder en mémoire : 3^18 est premier avec
+            # 10^9, i -> i * 3^18 mod 10^9 est une permutation
+            siren = f"{(siren_offset + i * 387420489) % 10 ** 9:09d}"
+            is_person = rng.random() < 0.3  # 30% personnes physiques
+
+            ul = generate_unite_legale(rng, distributions, siren, is_person)
+
+            # Siège puis établissements secondaires, NIC distincts
+            nb_etab = distributions['etablissements'].draw(rng)
+            nics = [str(nic) for nic in rng.sample(range(10000, 100000), nb_etab)]
+            ul['nicSiegeUniteLegale'] = nics[0]
+
+            ul_writer.writerow(ul.values())
+            for j, nic in enumerate(nics):
+                etab_writer.writerow(
+                    generate_etablissement(rng, distributions, ul, nic, is_siege=(j == 0)).values()
+                )
+            nb_etablissements += nb_etab
+
+    return ul_part, etab_part, count, nb_etablissements
+
+
+def generate(nb_entreprises=1000, output_dir=OUTPUT_DIR, seed=None, verbose=True, workers=1,
+             zipf_etablissements=DEFAULT_ZIPF_ETABLISSEMENTS, zipf_naf=DEFAULT_ZIPF_NAF,
+             zipf_communes=DEFAULT_ZIPF_COMMUNES, max_etablissements=DEFAULT_MAX_ETABLISSEMENTS):
+    """
+    Génère les fichiers CSV mock en écrivant les lignes au fil de l'eau
+
+    Les blocs de SHARD_SIZE entreprises sont générés en parallèle
+    (workers processus) puis concaténés dans l'ordre : la mémoire reste
+    constante quel que soit le nombre d'entreprises.
+
+    Returns:
+        tuple: (fichier unités légales, fichier établissements,
+                nombre d'entreprises, nombre d'établissements)
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+        if verbose:
+            print(f"Graine : {seed} (--seed {seed} pour reproduire)")
+
+    options = {
+        'zipf_etablissements': zipf_etablissements,
+        'zipf_naf': zipf_naf,
+        'zipf_communes': zipf_communes,
+        'max_etablissements': max_etablissements,
+    }
 
-        if (i + 1) % 200 == 0:
-            print(f"  {i + 1}/{nb_entreprises} entreprises générées...")
+    os.makedirs(output_dir, exist_ok=True)
+    ul_file = os.path.join(output_dir, 'StockUniteLegale_mock.csv')
+    etab_file = os.path.join(output_dir, 'StockEtablissement_mock.csv')
+
+    if verbose:
+        mean = build_distributions(options)['etablissements'].mean()
+        print(f"\nGénération de {nb_entreprises:,} entreprises "
+              f"(~{nb_entreprises * mean:,.0f} établissements, {workers} processus)...")
+
+    siren_offset = random.Random(seed).randrange(10 ** 9)
+    shards = [
+        (shard, start, min(SHARD_SIZE, nb_entreprises - start))
+        for shard, start in enumerate(range(0, nb_entreprises, SHARD_SIZE))
+    ]
+
+    # En-têtes à partir d'une ligne factice (le contenu n'est pas écrit)
+    rng = random.Random(0)
+    distributions = build_distributions(options)
+    sample_ul = generate_unite_legale(rng, distributions, '000000000')
+    sample_etab = generate_etablissement(rng, distributions, sample_ul, '00000')
+
+    nb_ul = 0
+    nb_etablissements = 0
+
+    with open(ul_file, 'w', newline='', encoding='utf-8') as f_ul, \
+            open(etab_file, 'w', newline='', encoding='utf-8') as f_etab, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        csv.writer(f_ul).writerow(sample_ul.keys())
+        csv.writer(f_etab).writerow(sample_etab.keys())
+
+        results = executor.map(
+            generate_shard,
+            [shard for shard, _, _ in shards],
+            [start for _, start, _ in shards],
+            [count for _, _, count in shards],
+            [seed] * len(shards),
+            [siren_offset] * len(shards),
+            [output_dir] * len(shards),
+            [options] * len(shards),
+        )
+
+        # map rend les blocs dans l'ordre : concaténation au fil de l'eau
+        for ul_part, etab_part, count, nb_etab in results:
+            for part, target in ((ul_part, f_ul), (etab_part, f_etab)):
+                with open(part, encoding='utf-8', newline='') as f_part:
+                    shutil.copyfileobj(f_part, target, 1024 * 1024)
+                os.remove(part)
+
+            nb_ul += count
+            nb_etablissements += nb_etab
+            if verbose:
+                print(f"  {nb_ul:,}/{nb_entreprises:,} entreprises générées "
+                      f"({nb_etablissements:,} établissements)...")
+
+    return ul_file, etab_file, nb_ul, nb_etablissements
 
-    print(f"\nTotal: {len(unites_legales)} entreprises, {len(etablissements)} établissements")
 
-    # Écrire le fichier des unités légales
-    ul_file = os.path.join(OUTPUT_DIR, 'StockUniteLegale_mock.csv')
-    print(f"\nÉcriture de {ul_file}...")
+def main():
+    parser = argparse.ArgumentParser(description='Génère des fichiers CSV SIRENE mock')
+    parser.add_argument('--entreprises', '-n', type=int, default=1000,
+                        help="Nombre d'entreprises (défaut: 1000)")
+    parser.add_argument('--output', '-o', default=OUTPUT_DIR,
+                        help='Dossier de sortie (défaut: data/mock)')
+    parser.add_argument('--seed', type=int,
+                        help='Graine aléatoire (fichiers reproductibles)')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Nombre de processus (défaut: nombre de CPU)')
+    parser.add_argument('--zipf-etablissements', type=float, default=DEFAULT_ZIPF_ETABLISSEMENTS,
+                        help=f"Exposant du nombre d'établissements par SIREN (défaut: {DEFAULT_ZIPF_ETABLISSEMENTS})")
+    parser.add_argument('--zipf-naf', type=float, default=DEFAULT_ZIPF_NAF,
+                        help=f'Exposant des codes NAF (défaut: {DEFAULT_ZIPF_NAF})')
+    parser.add_argument('--zipf-communes', type=float, default=DEFAULT_ZIPF_COMMUNES,
+                        help=f'Exposant des communes (défaut: {DEFAULT_ZIPF_COMMUNES})')
+    parser.add_argument('--max-etablissements', type=int, default=DEFAULT_MAX_ETABLISSEMENTS,
+                        help=f"Établissements max par SIREN (défaut: {DEFAULT_MAX_ETABLISSEMENTS})")
+    args = parser.parse_args()
 
-    with open(ul_file, 'w', newline='', encoding='utf-8') as f:
-        if unites_legales:
-            writer = csv.DictWriter(f, fieldnames=unites_legales[0].keys())
-            writer.writeheader()
-            writer.writerows(unites_legales)
+    print("="*60)
+    print("GÉNÉRATION DES DONNÉES MOCK")
+    print("="*60)
 
-    # Écrire le fichier des établissements
-    etab_file = os.path.join(OUTPUT_DIR, 'StockEtablissement_mock.csv')
-    print(f"Écriture de {etab_file}...")
+    ul_file, etab_file, nb_ul, nb_etab = generate(
+        args.entreprises, args.output, args.seed, workers=args.workers,
+        zipf_etablissements=args.zipf_etablissements, zipf_naf=args.zipf_naf,
+        zipf_communes=args.zipf_communes, max_etablissements=args.max_etablissements
+    )
 
-    with open(etab_file, 'w', newline='', encoding='utf-8') as f:
-        if etablissements:
-            writer = csv.DictWriter(f, fieldnames=etablissements[0].keys())
-            writer.writeheader()
-            writer.writerows(etablissements)
+    print(f"\nTotal: {nb_ul:,} entreprises, {nb_etab:,} établissements")
 
     print("\n" + "="*60)
     print("GÉNÉRATION TERMINÉE !")
     print("="*60)
-    print(f"\nFichiers créés dans : {OUTPUT_DIR}")
-    print(f"  - StockUniteLegale_mock.csv ({len(unites_legales)} lignes)")
-    print(f"  - StockEtablissement_mock.csv ({len(etablissements)} lignes)")
+    print(f"\nFichiers créés dans : {args.output}")
+    print(f"  - {os.path.basename(ul_file)} ({nb_ul:,} lignes)")
+    print(f"  - {os.path.basename(etab_file)} ({nb_etab:,} lignes)")
 
 
 if __name__ == '__main__':
@@ -12,13 +12,39 @@ Usage:
 import os
 import sys
 import argparse
+import csv
 import time
-import mmap
+import json
+import itertools
 import gc
+import io
+import zipfile
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+import hashlib
+import struct
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import psycopg2
 from psycopg2 import sql
 from dotenv import load_dotenv
 
+try:
+    from pyproj import Transformer
+    PYPROJ_AVAILABLE = True
+except ImportError:
+    Transformer = None
+    PYPROJ_AVAILABLE = False
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pq = None
+    PYARROW_AVAILABLE = False
+
 load_dotenv()
 
 # Configuration
@@ -33,6 +59,46 @@ DB_CONFIG = {
 # Taille des chunks pour lecture (64 Mo)
 CHUNK_SIZE = 64 * 1024 * 1024
 
+# Taille des blocs envoyés à COPY par les workers parallèles (8 Mo)
+COPY_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Nombre de workers par défaut pour l'import parallèle
+DEFAULT_WORKERS = min(8, os.cpu_count() or 4)
+
+# Suffixes des générations de tables (bascule blue/green)
+STAGING_SUFFIX = '_staging'
+PREVIOUS_SUFFIX = '_previous'
+
+# Clés primaires (recréées sur les tables de staging avant bascule)
+PRIMARY_KEYS = {
+    'unite_legale': 'siren',
+    'etablissement': 'siret',
+}
+
+# Vue dépendante des deux tables (cf. docs/schema.sql), recréée après bascule
+VIEW_ENTREPRISE_COMPLETE = """
+CREATE VIEW v_entreprise_complete AS
+SELECT
+    ul.siren,
+    ul.denomination,
+    ul.sigle,
+    ul.categorie_juridique,
+    ul.activite_principale AS activite_principale_ul,
+    ul.categorie_entreprise,
+    ul.tranche_effectifs AS tranche_effectifs_ul,
+    ul.etat_administratif AS etat_ul,
+    ul.date_creation AS date_creation_ul,
+    e.siret AS siret_siege,
+    e.denomination_usuelle AS denomination_siege,
+    e.numero_voie || ' ' || COALESCE(e.type_voie, '') || ' ' || COALESCE(e.libelle_voie, '') AS adresse_siege,
+    e.code_postal AS cp_siege,
+    e.libelle_commune AS ville_siege,
+    e.activite_principale AS activite_siege,
+    e.etat_administratif AS etat_siege
+FROM unite_legale ul
+LEFT JOIN etablissement e ON ul.siren = e.siren AND e.etablissement_siege = true
+"""
+
 # Mapping des colonnes CSV vers colonnes DB
 UNITE_LEGALE_MAPPING = {
     'siren': 'siren',
@@ -129,10 +195,74 @@ ETABLISSEMENT_MAPPING = {
 
 
 def get_file_size(filepath):
-    """Retourne la taille du fichier en bytes"""
+    """Retourne la taille du fichier en bytes (compressée pour un zip)"""
     return os.path.getsize(filepath)
 
 
+def is_zip_file(filepath):
+    """Indique si le fichier source est une archive zip INSEE"""
+    return filepath.lower().endswith('.zip')
+
+
+def is_supported_input(filename):
+    """Extensions acceptées en entrée de l'import"""
+    return filename.lower().endswith(('.csv', '.zip', '.parquet'))
+
+
+def input_rank(filepath):
+    """Préférence entre plusieurs formats d'un même fichier (--all)"""
+    if filepath.lower().endswith('.parquet'):
+        return 2
+    return 0 if is_zip_file(filepath) else 1
+
+
+@contextmanager
+def open_binary_source(filepath):
+    """
+    Ouvre un CSV, ou le CSV contenu dans une archive zip, en flux binaire
+
+    Le flux accepte seek() : pour un zip, Python décompresse jusqu'à l'offset
+    demandé (offset dans le CSV décompressé).
+
+    Yields:
+        tuple: (flux binaire, position) où position() retourne les octets lus
+        dans le fichier sur disque (compressés pour un zip), None pour un CSV
+    """
+    if not is_zip_file(filepath):
+        with open(filepath, 'rb') as f:
+            yield f, None
+        return
+
+    with open(filepath, 'rb') as raw:
+        with zipfile.ZipFile(raw) as archive:
+            members = [m for m in archive.namelist() if m.lower().endswith('.csv')]
+            if not members:
+                raise ValueError(f"Aucun fichier CSV dans l'archive : {filepath}")
+            with archive.open(members[0]) as member:
+                yield member, raw.tell
+
+
+@contextmanager
+def open_csv_source(filepath):
+    """
+    Ouvre un CSV, ou le CSV contenu dans une archive zip, en flux texte
+
+    Une archive est décompressée à la volée, sans extraction sur disque.
+
+    Yields:
+        tuple: (flux texte, position) où position() retourne les octets lus
+        dans le fichier sur disque (compressés pour un zip) : la progression
+        se compare à la taille du fichier, pas au nombre de caractères
+    """
+    if not is_zip_file(filepath):
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            yield f, f.buffer.tell
+        return
+
+    with open_binary_source(filepath) as (member, position):
+        yield io.TextIOWrapper(member, encoding='utf-8', newline=''), position
+
+
 def format_size(bytes_size):
     """Formate la taille en unité lisible"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -167,6 +297,112 @@ def print_progress(current, total, start_time, prefix=""):
     sys.stdout.flush()
 
 
+# Étapes suivies par ImportMetrics, dans l'ordre du pipeline
+METRIC_STAGES = ('read', 'transform', 'copy', 'index', 'analyze')
+
+
+class ImportMetrics:
+    """
+    Mesures par étape de l'import (lecture, transformation, COPY, index,
+    ANALYZE), écrites en fin d'import dans un résumé JSON
+
+    Les durées des étapes read/transform/copy sont cumulées sur tous les
+    flux : en import parallèle, elles dépassent la durée murale. La durée
+    copy exclut le temps passé à attendre le producteur.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = datetime.now()
+        self.start = time.time()
+        self.stages = {
+            name: {'seconds': 0.0, 'rows': 0, 'bytes': 0} for name in METRIC_STAGES
+        }
+        self.tables = {}
+        self.indexes = {}
+        self.files = {}
+        self.context = {}
+
+    def add(self, stage, seconds, rows=0, nbytes=0):
+        with self.lock:
+            entry = self.stages.setdefault(stage, {'seconds': 0.0, 'rows': 0, 'bytes': 0})
+            entry['seconds'] += seconds
+            entry['rows'] += rows
+            entry['bytes'] += nbytes
+
+    @contextmanager
+    def stage(self, name):
+        """Chronomètre un bloc et l'ajoute à l'étape `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def record_table(self, table_name, rows):
+        with self.lock:
+            self.tables[table_name] = self.tables.get(table_name, 0) + rows
+
+    def record_index(self, index_name, seconds):
+        with self.lock:
+            self.indexes[index_name] = round(seconds, 3)
+
+    def record_file(self, filepath):
+        """Fichier source : sa taille sur disque compte comme octets lus"""
+        size = get_file_size(filepath)
+        self.files[filepath] = size
+        self.add('read', 0, nbytes=size)
+
+    def summary(self):
+        elapsed = time.time() - self.start
+        stages = {}
+        for name, entry in self.stages.items():
+            stage = dict(entry, seconds=round(entry['seconds'], 3))
+            if entry['rows'] and entry['seconds'] > 0:
+                stage['rows_per_second'] = round(entry['rows'] / entry['seconds'])
+            if entry['bytes'] and entry['seconds'] > 0:
+                stage['bytes_per_second'] = round(entry['bytes'] / entry['seconds'])
+            stages[name] = stage
+
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_seconds': round(elapsed, 3),
+            **self.context,
+            'files': self.files,
+            'tables': self.tables,
+            'stages': stages,
+            'indexes': self.indexes,
+        }
+
+    def write(self, path):
+        """Écrit le résumé JSON et l'affiche"""
+        summary = self.summary()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        print(f"\n{'='*70}")
+        print("MÉTRIQUES PAR ÉTAPE")
+        print(f"{'='*70}")
+        for name, stage in summary['stages'].items():
+            if stage['seconds'] or stage['rows']:
+                print(f"{name:<10} : {format_time(stage['seconds']):>10} | {stage['rows']:>12,} lignes | {format_size(stage['bytes'])}")
+        print(f"Résumé JSON : {path}")
+        print(f"{'='*70}\n")
+        return summary
+
+
+METRICS = ImportMetrics()
+
+
+def default_metrics_path():
+    """Chemin par défaut du résumé JSON : metrics/import_AAAAMMJJ_HHMMSS.json"""
+    return os.path.join('metrics', f"import_{METRICS.started_at:%Y%m%d_%H%M%S}.json")
+
+
 def get_connection():
     """Crée une connexion à la base de données"""
     conn = psycopg2.connect(**DB_CONFIG)
@@ -192,30 +428,996 @@ def restore_database(cursor, table_name):
     cursor.execute(f"ALTER TABLE {table_name} ENABLE TRIGGER ALL")
 
 
-def count_lines_fast(filepath):
-    """Compte les lignes rapidement avec mmap (économe en mémoire)"""
-    print("Comptage des lignes...")
-    count = 0
-    with open(filepath, 'rb') as f:
-        # Utiliser mmap pour lecture efficace
+def build_copy_sql(table_name, db_columns, binary=False):
+    """
+    Construit la commande COPY FROM STDIN pour les colonnes données
+
+    Le flux est produit par CsvProjector au format texte de COPY
+    (tabulations, NULL = \\N), moins coûteux à analyser côté serveur que CSV,
+    ou par ParquetProjector au format binaire.
+    """
+    if binary:
+        options = sql.SQL("FORMAT binary")
+    else:
+        options = sql.SQL("FORMAT text, ENCODING 'UTF8'")
+
+    return sql.SQL("""
+        COPY {table} ({columns})
+        FROM STDIN
+        WITH ({options})
+    """).format(
+        table=sql.Identifier(table_name),
+        columns=sql.SQL(', ').join([sql.Identifier(c) for c in db_columns]),
+        options=options
+    )
+
+
+# ============================================
+# PROJECTION CSV -> COPY
+# ============================================
+
+# Colonnes nécessitant une normalisation avant COPY
+BOOLEAN_COLUMNS = {'etablissement_siege'}
+NUMERIC_COLUMNS = {
+    'annee_effectifs', 'nombre_periodes', 'annee_categorie_entreprise',
+    'coordonnee_lambert_x', 'coordonnee_lambert_y',
+}
+DATE_COLUMNS = {'date_creation', 'date_debut', 'date_dernier_traitement'}
+
+# Valeur INSEE des champs non diffusibles
+NON_DIFFUSIBLE = '[ND]'
+
+# Échappement du format texte de COPY
+COPY_TEXT_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+# Nombre de lignes par bloc envoyé dans le tube vers COPY
+PROJECTOR_BATCH_ROWS = 10000
+
+# Nombre maximal de blocs en attente dans le tube
+PIPE_MAX_CHUNKS = 8
+
+
+def normalize_boolean(value):
+    """'true'/'false' INSEE -> 't'/'f', autre -> NULL"""
+    value = value.strip().lower()
+    if value in ('true', 't', '1', 'o', 'oui'):
+        return 't'
+    if value in ('false', 'f', '0', 'n', 'non'):
+        return 'f'
+    return ''
+
+
+def normalize_typed(value):
+    """Dates et nombres : espaces retirés, [ND] -> NULL"""
+    value = value.strip()
+    return '' if value == NON_DIFFUSIBLE else value
+
+
+def get_normalizer(db_column):
+    """Retourne la fonction de normalisation d'une colonne (ou None)"""
+    if db_column in BOOLEAN_COLUMNS:
+        return normalize_boolean
+    if db_column in NUMERIC_COLUMNS or db_column in DATE_COLUMNS:
+        return normalize_typed
+    return None
+
+
+# ============================================
+# COORDONNÉES GPS (Lambert 93 -> WGS84)
+# ============================================
+
+# Colonnes sources et colonnes calculées sur etablissement
+GPS_SOURCE_COLUMNS = ('coordonnee_lambert_x', 'coordonnee_lambert_y')
+GPS_COLUMNS = ('latitude', 'longitude')
+
+# Plage Lambert 93 de la France (mêmes bornes que app/utils/geo.py)
+LAMBERT93_X_RANGE = (100000, 1300000)
+LAMBERT93_Y_RANGE = (6000000, 7200000)
+
+# Un Transformer pyproj par thread : ils ne sont pas thread-safe
+_gps_local = threading.local()
+_pyproj_warning_shown = False
+
+
+def get_transformer():
+    """Transformer Lambert 93 -> WGS84 du thread courant"""
+    transformer = getattr(_gps_local, 'transformer', None)
+    if transformer is None:
+        transformer = Transformer.from_crs("EPSG:2154", "EPSG:4326", always_xy=True)
+        _gps_local.transformer = transformer
+    return transformer
+
+
+def lambert93_to_gps_batch(xs, ys):
+    """
+    Convertit des coordonnées Lambert 93 en GPS en un seul appel pyproj
+
+    Args:
+        xs, ys: listes de coordonnées (texte ou nombres, None accepté)
+
+    Returns:
+        tuple: (latitudes, longitudes), None si absente ou hors France
+    """
+    latitudes = [None] * len(xs)
+    longitudes = [None] * len(xs)
+
+    positions, valid_x, valid_y = [], [], []
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        try:
+            x = float(x)
+            y = float(y)
+        except (TypeError, ValueError):
+            continue
+        if (LAMBERT93_X_RANGE[0] <= x <= LAMBERT93_X_RANGE[1]
+                and LAMBERT93_Y_RANGE[0] <= y <= LAMBERT93_Y_RANGE[1]):
+            positions.append(i)
+            valid_x.append(x)
+            valid_y.append(y)
+
+    if positions:
+        lons, lats = get_transformer().transform(valid_x, valid_y)
+        for i, lat, lon in zip(positions, lats, lons):
+            latitudes[i] = round(lat, 6)
+            longitudes[i] = round(lon, 6)
+
+    return latitudes, longitudes
+
+
+def gps_enabled(column_types, db_columns):
+    """Les colonnes GPS sont calculées si la table cible les possède"""
+    if not column_types or not all(c in column_types for c in GPS_COLUMNS):
+        return False
+    if not all(c in db_columns for c in GPS_SOURCE_COLUMNS):
+        return False
+    if not PYPROJ_AVAILABLE:
+        global _pyproj_warning_shown
+        if not _pyproj_warning_shown:
+            print("ATTENTION : pyproj non installé, latitude/longitude laissées vides")
+            _pyproj_warning_shown = True
+        return False
+    return True
+
+
+def upgrade_schema():
+    """Ajoute à une base existante les colonnes GPS d'etablissement"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # ALTER TABLE verrouille la table : seulement si une colonne manque
+        if not all(c in fetch_column_types(cursor, 'etablissement') for c in GPS_COLUMNS):
+            print("Ajout des colonnes latitude/longitude à etablissement...")
+            cursor.execute("""
+                ALTER TABLE etablissement
+                    ADD COLUMN IF NOT EXISTS latitude DECIMAL(9, 6),
+                    ADD COLUMN IF NOT EXISTS longitude DECIMAL(9, 6)
+            """)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def backfill_gps(batch_rows=100000):
+    """
+    Calcule latitude/longitude des établissements déjà importés sans GPS
+
+    Les coordonnées sont lues par lots via un curseur serveur, converties en
+    une fois par lot, chargées par COPY dans une table temporaire puis
+    appliquées par un seul UPDATE.
+    """
+    if not PYPROJ_AVAILABLE:
+        print("ERREUR : pyproj est requis pour calculer les coordonnées GPS")
+        return 0
+
+    print(f"\n{'='*70}")
+    print("CALCUL DES COORDONNÉES GPS")
+    print(f"{'='*70}\n")
+
+    start_time = time.time()
+    conn = get_connection()
+    cursor = conn.cursor()
+    reader = conn.cursor(name='gps_backfill')
+    reader.itersize = batch_rows
+
+    try:
+        cursor.execute("""
+            CREATE TEMP TABLE tmp_gps (
+                siret VARCHAR(14), latitude DECIMAL(9, 6), longitude DECIMAL(9, 6)
+            ) ON COMMIT DROP
+        """)
+        reader.execute("""
+            SELECT siret, coordonnee_lambert_x, coordonnee_lambert_y
+            FROM etablissement
+            WHERE latitude IS NULL AND coordonnee_lambert_x IS NOT NULL
+        """)
+
+        total = 0
+        while True:
+            rows = reader.fetchmany(batch_rows)
+            if not rows:
+                break
+            lats, lons = lambert93_to_gps_batch([r[1] for r in rows], [r[2] for r in rows])
+            data = ''.join(
+                f"{siret}\t{lat}\t{lon}\n"
+                for (siret, _, _), lat, lon in zip(rows, lats, lons) if lat is not None
+            )
+            cursor.copy_expert("COPY tmp_gps FROM STDIN", io.StringIO(data))
+            total += len(rows)
+            print(f"\r  {total:,} établissements convertis...", end='')
+
+        print("\nMise à jour d'etablissement...")
+        cursor.execute("""
+            UPDATE etablissement e
+            SET latitude = g.latitude, longitude = g.longitude
+            FROM tmp_gps g
+            WHERE e.siret = g.siret
+        """)
+        updated = cursor.rowcount
+        reader.close()
+        conn.commit()
+
+        print(f"{updated:,} établissements géolocalisés en {format_time(time.time() - start_time)}")
+        return updated
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# ============================================
+# VALIDATION ET QUARANTAINE DES LIGNES
+# ============================================
+
+REJECT_DIR = 'rejects'
+
+INT_RANGES = {
+    'int2': (-2 ** 15, 2 ** 15 - 1),
+    'int4': (-2 ** 31, 2 ** 31 - 1),
+    'int8': (-2 ** 63, 2 ** 63 - 1),
+}
+
+
+def base_table_name(table_name):
+    """Table finale d'une table de travail (staging ou temporaire)"""
+    if table_name.endswith(STAGING_SUFFIX):
+        table_name = table_name[:-len(STAGING_SUFFIX)]
+    if table_name.startswith('tmp_'):
+        table_name = table_name[len('tmp_'):]
+    return table_name
+
+
+def build_column_check(column_type):
+    """
+    Retourne la fonction de contrôle d'une colonne selon son type PostgreSQL
+
+    Le contrôle reçoit la valeur normalisée non vide et retourne le motif du
+    rejet, ou None si la valeur sera acceptée par COPY.
+    """
+    typname, length, precision, scale = column_type
+
+    if typname in ('varchar', 'bpchar', 'text'):
+        def check(value):
+            if '\x00' in value:
+                return "caractère NUL"
+            if length and len(value) > length:
+                return f"longueur {len(value)} > {length}"
+        return check
+
+    if typname in INT_RANGES:
+        low, high = INT_RANGES[typname]
+
+        def check(value):
+            try:
+                number = int(value)
+            except ValueError:
+                return f"entier invalide : {value[:30]!r}"
+            if not low <= number <= high:
+                return f"entier hors limites : {value[:30]}"
+        return check
+
+    if typname == 'numeric':
+        max_digits = precision - scale if precision else None
+
+        def check(value):
+            try:
+                number = Decimal(value)
+            except InvalidOperation:
+                return f"nombre invalide : {value[:30]!r}"
+            if not number.is_finite():
+                return f"nombre invalide : {value[:30]!r}"
+            if max_digits is not None and number != 0 and number.adjusted() >= max_digits:
+                return f"nombre hors limites NUMERIC({precision},{scale}) : {value[:30]}"
+        return check
+
+    if typname == 'date':
+        def check(value):
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                return f"date invalide : {value[:30]!r}"
+        return check
+
+    if typname == 'timestamp':
+        def check(value):
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                return f"horodatage invalide : {value[:30]!r}"
+        return check
+
+    return None
+
+
+class RejectWriter:
+    """
+    Fichier de quarantaine d'une table : lignes rejetées (valeurs d'origine)
+    suivies de la colonne et du motif du rejet
+
+    Partagé entre les workers d'un import parallèle, créé au premier rejet.
+    """
+
+    def __init__(self, table_name, directory=REJECT_DIR):
+        self.table_name = table_name
+        self.path = os.path.join(
+            directory, f"{table_name}_{METRICS.started_at:%Y%m%d_%H%M%S}.csv"
+        )
+        self.lock = threading.Lock()
+        self.file = None
+        self.writer = None
+        self.counts = {}
+
+    def reject(self, header, row, column, reason):
+        with self.lock:
+            if self.writer is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self.file = open(self.path, 'w', encoding='utf-8', newline='')
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(list(header) + ['colonne_rejet', 'motif_rejet'])
+            self.writer.writerow(list(row) + [column, reason])
+            self.counts[column] = self.counts.get(column, 0) + 1
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+                self.writer = None
+
+
+class RejectRegistry:
+    """Fichiers de quarantaine de l'import en cours, un par table"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.writers = {}
+
+    def for_table(self, table_name):
+        table_name = base_table_name(table_name)
+        with self.lock:
+            if table_name not in self.writers:
+                self.writers[table_name] = RejectWriter(table_name)
+            return self.writers[table_name]
+
+    def counts(self):
+        return {
+            name: dict(writer.counts, total=writer.total)
+            for name, writer in self.writers.items() if writer.total
+        }
+
+    def print_summary(self):
+        """Ferme les fichiers et affiche les rejets par colonne"""
+        for writer in self.writers.values():
+            writer.close()
+        rejected = [w for w in self.writers.values() if w.total]
+        if not rejected:
+            return
+
+        print(f"\n{'='*70}")
+        print("LIGNES REJETÉES")
+        print(f"{'='*70}")
+        for writer in rejected:
+            print(f"{writer.table_name} : {writer.total:,} lignes -> {writer.path}")
+            for column, count in sorted(writer.counts.items(), key=lambda c: -c[1]):
+                print(f"  {column:<30} : {count:,}")
+        print(f"{'='*70}\n")
+
+
+REJECTS = RejectRegistry()
+
+
+def read_csv_header(filepath):
+    """Lit la ligne d'en-tête d'un CSV (ou d'un CSV zippé)"""
+    with open_csv_source(filepath) as (f, _):
+        return next(csv.reader(f))
+
+
+class CsvProjector:
+    """
+    Projette un flux CSV INSEE sur les colonnes du mapping
+
+    L'en-tête réel du fichier détermine la position de chaque colonne : les
+    colonnes non mappées ne sont pas envoyées à PostgreSQL, et les colonnes
+    du mapping absentes du fichier sont ignorées (listées dans `missing`).
+    Les lignes sont produites au format texte de COPY.
+
+    Avec column_types et rejects, chaque valeur est contrôlée contre le type
+    et la largeur de la colonne cible : une ligne invalide part en
+    quarantaine au lieu de faire échouer tout le COPY.
+    """
+
+    def __init__(self, lines, mapping, header=None, column_types=None, rejects=None):
+        self.reader = csv.reader(lines)
+        if header is None:
+            header = next(self.reader)
+
+        positions = {name: i for i, name in enumerate(header)}
+        self.db_columns = []
+        self.columns = []
+        self.missing = []
+        for csv_col, db_col in mapping.items():
+            if csv_col in positions:
+                check = None
+                if rejects is not None and column_types and db_col in column_types:
+                    check = build_column_check(column_types[db_col])
+                self.db_columns.append(db_col)
+                self.columns.append((positions[csv_col], get_normalizer(db_col), check, db_col))
+            else:
+                self.missing.append(csv_col)
+
+        # Latitude/longitude calculées par lot depuis les colonnes Lambert 93
+        self.gps_sources = None
+        if gps_enabled(column_types, self.db_columns):
+            self.gps_sources = tuple(
+                self.columns[self.db_columns.index(c)][0] for c in GPS_SOURCE_COLUMNS
+            )
+            self.db_columns.extend(GPS_COLUMNS)
+
+        self.header = header
+        self.rejects = rejects
+        self.width = len(header)
+        self.rows = 0
+        self.rejected = 0
+
+    def format_row(self, row):
+        """Formate une ligne CSV au format texte de COPY (None si rejetée)"""
+        values = []
+        for idx, normalize, check, db_col in self.columns:
+            value = row[idx] if idx < len(row) else ''
+            if normalize:
+                value = normalize(value)
+            if not value:
+                values.append('\\N')
+                continue
+            if check:
+                reason = check(value)
+                if reason:
+                    self.rejects.reject(self.header, row, db_col, reason)
+                    self.rejected += 1
+                    return None
+            values.append(value.translate(COPY_TEXT_ESCAPES))
+        return '\t'.join(values)
+
+    def append_gps(self, rows, lines):
+        """Ajoute latitude/longitude aux lignes formatées d'un lot"""
+        ix, iy = self.gps_sources
+        lats, lons = lambert93_to_gps_batch(
+            [row[ix] if ix < len(row) else None for row in rows],
+            [row[iy] if iy < len(row) else None for row in rows]
+        )
+        return [
+            None if line is None else
+            '\t'.join((line, '\\N' if lat is None else str(lat), '\\N' if lon is None else str(lon)))
+            for line, lat, lon in zip(lines, lats, lons)
+        ]
+
+    def iter_chunks(self, batch_rows=PROJECTOR_BATCH_ROWS):
+        """
+        Génère des blocs de lignes COPY (texte)
+
+        Les lignes sont lues par lots pour chronométrer séparément la
+        lecture/analyse CSV (read) et la projection (transform).
+        """
+        while True:
+            start = time.perf_counter()
+            batch = list(itertools.islice(self.reader, batch_rows))
+            if not batch:
+                break
+            rows = [row for row in batch if row]
+            read_done = time.perf_counter()
+            METRICS.add('read', read_done - start, len(rows))
+            if not rows:
+                continue
+
+            lines = list(map(self.format_row, rows))
+            if self.gps_sources:
+                lines = self.append_gps(rows, lines)
+            lines = [line for line in lines if line is not None]
+            METRICS.add('transform', time.perf_counter() - read_done, len(rows))
+            if not lines:
+                continue
+            self.rows += len(lines)
+            yield '\n'.join(lines) + '\n'
+
+
+class BoundedPipe:
+    """
+    Tube borné entre un producteur (projecteur) et COPY
+
+    Le producteur tourne dans un thread et remplit une file d'au plus
+    `max_chunks` blocs : la mémoire reste constante quelle que soit la
+    taille du fichier. L'objet expose read() pour copy_expert.
+    """
+
+    def __init__(self, chunks, max_chunks=PIPE_MAX_CHUNKS):
+        self.queue = queue.Queue(maxsize=max_chunks)
+        self.buffer = b''
+        self.bytes_sent = 0
+        self.wait_time = 0.0
+        self.eof = False
+        self.error = None
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._produce, args=(chunks,), daemon=True)
+        self.thread.start()
+
+    def _put(self, item):
+        while not self.closed.is_set():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, chunks):
         try:
-            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-            while mm.readline():
-                count += 1
-            mm.close()
-        except:
-            # Fallback si mmap échoue
-            f.seek(0)
-            for _ in f:
-                count += 1
-    return count - 1  # Moins l'en-tête
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if not self._put(chunk):
+                    return
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+
+    def read(self, size=-1):
+        while not self.buffer and not self.eof:
+            start = time.perf_counter()
+            data = self.queue.get()
+            self.wait_time += time.perf_counter() - start
+            if data is None:
+                self.eof = True
+                if self.error:
+                    raise self.error
+            else:
+                self.buffer = data
+
+        if size is None or size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        self.bytes_sent += len(data)
+        return data
+
+    def close(self):
+        """Arrête le producteur (ex. si COPY échoue)"""
+        self.closed.set()
+        self.thread.join(timeout=5)
+
+
+def run_copy(cursor, copy_sql, chunks):
+    """
+    Exécute COPY FROM STDIN sur un flux de blocs via BoundedPipe
+
+    La durée enregistrée pour l'étape copy exclut l'attente du producteur.
+    """
+    pipe = BoundedPipe(chunks)
+    start = time.perf_counter()
+    try:
+        cursor.copy_expert(copy_sql, pipe, size=COPY_BLOCK_SIZE)
+    finally:
+        pipe.close()
+        METRICS.add('copy', time.perf_counter() - start - pipe.wait_time,
+                    cursor.rowcount if cursor.rowcount > 0 else 0, pipe.bytes_sent)
+
+
+def copy_projected(cursor, lines, table_name, mapping, header=None):
+    """
+    COPY d'un flux CSV via CsvProjector et BoundedPipe
+
+    Returns:
+        CsvProjector: colonnes réellement chargées et nombre de lignes
+    """
+    projector = CsvProjector(
+        lines, mapping, header,
+        column_types=fetch_column_types(cursor, table_name),
+        rejects=REJECTS.for_table(table_name)
+    )
+    if projector.missing and header is None:
+        print(f"Colonnes absentes du fichier (ignorées) : {', '.join(projector.missing)}")
+
+    run_copy(cursor, build_copy_sql(table_name, projector.db_columns), projector.iter_chunks())
+    return projector
+
+
+# ============================================
+# IMPORT PARQUET (COPY binaire)
+# ============================================
+
+# Origines des types date/timestamp du format binaire de COPY
+PG_EPOCH_DATE = date(2000, 1, 1)
+PG_EPOCH = datetime(2000, 1, 1)
+
+COPY_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+COPY_BINARY_TRAILER = struct.pack('>h', -1)
+COPY_BINARY_NULL = struct.pack('>i', -1)
+
+# Lignes par lot lu dans le fichier Parquet
+PARQUET_BATCH_ROWS = 65536
+
+
+def is_parquet_file(filepath):
+    """Indique si le fichier source est au format Parquet"""
+    return filepath.lower().endswith('.parquet')
+
+
+def fetch_column_types(cursor, table_name):
+    """
+    Types PostgreSQL des colonnes d'une table
+
+    Returns:
+        dict: {colonne: (typname, longueur max, précision, échelle)},
+        longueur pour varchar/char, précision et échelle pour numeric
+    """
+    cursor.execute("""
+        SELECT a.attname, t.typname,
+               CASE WHEN t.typname IN ('varchar', 'bpchar') AND a.atttypmod > 0
+                    THEN a.atttypmod - 4 END,
+               CASE WHEN t.typname = 'numeric' AND a.atttypmod > 0
+                    THEN ((a.atttypmod - 4) >> 16) & 65535 END,
+               CASE WHEN t.typname = 'numeric' AND a.atttypmod > 0
+                    THEN (a.atttypmod - 4) & 65535 END
+        FROM pg_attribute a
+        JOIN pg_type t ON t.oid = a.atttypid
+        WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+    """, (table_name,))
+    return {name: tuple(column_type) for name, *column_type in cursor.fetchall()}
+
+
+def _typed_value(value):
+    """Valeur texte vide ou non diffusible -> None"""
+    if isinstance(value, str):
+        value = value.strip()
+        if not value or value == NON_DIFFUSIBLE:
+            return None
+    return value
+
+
+def encode_text(value):
+    return str(value).encode('utf-8')
+
+
+def encode_bool(value):
+    if isinstance(value, str):
+        value = normalize_boolean(value)
+        if not value:
+            return None
+        return b'\x01' if value == 't' else b'\x00'
+    return b'\x01' if value else b'\x00'
+
+
+def encode_int4(value):
+    return struct.pack('>i', int(value))
+
+
+def encode_int8(value):
+    return struct.pack('>q', int(value))
+
+
+def encode_float8(value):
+    return struct.pack('>d', float(value))
+
+
+def encode_numeric(value):
+    """Encode une valeur au format binaire NUMERIC (chiffres en base 10000)"""
+    value = value if isinstance(value, Decimal) else Decimal(str(value))
+    if not value.is_finite():
+        return None
+
+    sign, digits, exponent = value.as_tuple()
+    dscale = max(-exponent, 0)
+    digit_str = ''.join(map(str, digits))
+    if exponent > 0:
+        digit_str += '0' * exponent
+        exponent = 0
+    if -exponent > len(digit_str):
+        digit_str = '0' * (-exponent - len(digit_str)) + digit_str
+
+    split = len(digit_str) + exponent
+    int_part = digit_str[:split].lstrip('0')
+    frac_part = digit_str[split:]
+    int_part = '0' * (-len(int_part) % 4) + int_part
+    frac_part = frac_part + '0' * (-len(frac_part) % 4)
+
+    groups = [int(int_part[i:i + 4]) for i in range(0, len(int_part), 4)]
+    groups += [int(frac_part[i:i + 4]) for i in range(0, len(frac_part), 4)]
+    weight = len(int_part) // 4 - 1
+
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight = 0
+
+    return struct.pack(
+        f'>hhHH{len(groups)}H',
+        len(groups), weight, 0x4000 if sign else 0, dscale, *groups
+    )
+
+
+def encode_date(value):
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    elif isinstance(value, datetime):
+        value = value.date()
+    return struct.pack('>i', (value - PG_EPOCH_DATE).days)
+
+
+def encode_timestamp(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - PG_EPOCH
+    return struct.pack('>q', (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+
+
+BINARY_ENCODERS = {
+    'varchar': encode_text,
+    'bpchar': encode_text,
+    'text': encode_text,
+    'bool': encode_bool,
+    'int4': encode_int4,
+    'int8': encode_int8,
+    'float8': encode_float8,
+    'numeric': encode_numeric,
+    'date': encode_date,
+    'timestamp': encode_timestamp,
+}
+
+
+class ParquetProjector:
+    """
+    Projette les lots d'un fichier Parquet sur les colonnes du mapping
+
+    Les valeurs typées de pyarrow sont encodées directement au format
+    binaire de COPY, sans passer par du texte CSV. Une valeur trop longue ou
+    non convertible met la ligne en quarantaine (rejects).
+    """
+
+    def __init__(self, parquet_file, mapping, column_types, row_groups=None, rejects=None):
+        schema_names = set(parquet_file.schema_arrow.names)
+        self.parquet_file = parquet_file
+        self.row_groups = row_groups
+        self.source_columns = []
+        self.db_columns = []
+        self.encoders = []
+        self.lengths = []
+        self.missing = []
+        for source_col, db_col in mapping.items():
+            if source_col in schema_names and db_col in column_types:
+                self.source_columns.append(source_col)
+                self.db_columns.append(db_col)
+                self.encoders.append(BINARY_ENCODERS.get(column_types[db_col][0], encode_text))
+                self.lengths.append(column_types[db_col][1])
+            else:
+                self.missing.append(source_col)
+
+        # Latitude/longitude calculées par lot depuis les colonnes Lambert 93
+        self.gps_sources = None
+        if gps_enabled(column_types, self.db_columns):
+            self.gps_sources = tuple(self.db_columns.index(c) for c in GPS_SOURCE_COLUMNS)
+            for column in GPS_COLUMNS:
+                self.db_columns.append(column)
+                self.encoders.append(encode_numeric)
+                self.lengths.append(None)
+
+        self.row_header = struct.pack('>h', len(self.db_columns))
+        self.rejects = rejects
+        self.rows = 0
+        self.rejected = 0
+
+    def reject(self, values, column, reason):
+        if self.rejects is None:
+            raise ValueError(f"{column} : {reason}")
+        self.rejects.reject(self.source_columns, values[:len(self.source_columns)], column, reason)
+        self.rejected += 1
+
+    def encode_row(self, values):
+        """Encode une ligne au format binaire de COPY (None si rejetée)"""
+        parts = [self.row_header]
+        for column, encode, length, value in zip(self.db_columns, self.encoders, self.lengths, values):
+            value = _typed_value(value)
+            if value is not None and length and len(str(value)) > length:
+                self.reject(values, column, f"longueur {len(str(value))} > {length}")
+                return None
+            try:
+                data = encode(value) if value is not None else None
+            except (ValueError, TypeError, ArithmeticError, struct.error):
+                self.reject(values, column, f"valeur invalide : {str(value)[:30]!r}")
+                return None
+            if data is None:
+                parts.append(COPY_BINARY_NULL)
+            else:
+                parts.append(struct.pack('>i', len(data)))
+                parts.append(data)
+        return b''.join(parts)
+
+    def iter_chunks(self, batch_rows=PARQUET_BATCH_ROWS, on_batch=None):
+        """Génère des blocs COPY binaires, un par lot Parquet"""
+        yield COPY_BINARY_HEADER
+        batches = self.parquet_file.iter_batches(
+            batch_size=batch_rows, columns=self.source_columns, row_groups=self.row_groups
+        )
+        while True:
+            start = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                break
+            columns = [batch.column(name).to_pylist() for name in self.source_columns]
+            read_done = time.perf_counter()
+            METRICS.add('read', read_done - start, batch.num_rows)
+
+            if self.gps_sources:
+                ix, iy = self.gps_sources
+                columns.extend(lambert93_to_gps_batch(columns[ix], columns[iy]))
+            encoded = [row for row in map(self.encode_row, zip(*columns)) if row is not None]
+            METRICS.add('transform', time.perf_counter() - read_done, batch.num_rows)
+            yield b''.join(encoded)
+            self.rows += len(encoded)
+            if on_batch:
+                on_batch(batch.num_rows)
+        yield COPY_BINARY_TRAILER
+
+
+def open_parquet_file(filepath):
+    """Ouvre un fichier Parquet (pyarrow requis)"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow n'est pas installé : pip install pyarrow")
+    return pq.ParquetFile(filepath)
+
+
+def split_parquet_row_groups(filepath, parts):
+    """Répartit les row groups d'un fichier Parquet en `parts` plages"""
+    num_groups = open_parquet_file(filepath).num_row_groups
+    step = max(-(-num_groups // max(parts, 1)), 1)
+    return [(i, min(i + step, num_groups)) for i in range(0, num_groups, step)]
+
+
+def copy_parquet(cursor, filepath, table_name, mapping, row_groups=None, on_rows=None):
+    """
+    COPY binaire d'un fichier Parquet (ou de certains row groups)
+
+    Returns:
+        ParquetProjector: colonnes réellement chargées et nombre de lignes
+    """
+    parquet_file = open_parquet_file(filepath)
+    projector = ParquetProjector(
+        parquet_file, mapping, fetch_column_types(cursor, table_name), row_groups,
+        rejects=REJECTS.for_table(table_name)
+    )
+    if projector.missing and row_groups is None:
+        print(f"Colonnes absentes du fichier (ignorées) : {', '.join(projector.missing)}")
+
+    run_copy(
+        cursor, build_copy_sql(table_name, projector.db_columns, binary=True),
+        projector.iter_chunks(on_batch=on_rows)
+    )
+    return projector
+
+
+def copy_source(cursor, filepath, table_name, mapping, start_time):
+    """
+    COPY d'un fichier source (CSV, zip ou Parquet) avec suivi de progression
+
+    Returns:
+        CsvProjector ou ParquetProjector
+    """
+    file_size = get_file_size(filepath)
+
+    if is_parquet_file(filepath):
+        total_rows = open_parquet_file(filepath).metadata.num_rows
+        done = [0]
+
+        def on_rows(count):
+            done[0] += count
+            current = file_size * done[0] // total_rows if total_rows else file_size
+            print_progress(current, file_size, start_time, "Import: ")
+
+        return copy_parquet(cursor, filepath, table_name, mapping, on_rows=on_rows)
+
+    with open_csv_source(filepath) as (f, position):
+        progress_file = ProgressFile(f, file_size, start_time, position=position)
+        return copy_projected(cursor, progress_file, table_name, mapping)
 
 
-def import_csv_streaming(filepath, table_name, mapping):
+class ProgressFile:
+    """Wrapper de fichier qui affiche la progression de la lecture"""
+
+    def __init__(self, file_obj, total_size, start_time, prefix="Import: ", position=None):
+        self.file = file_obj
+        self.total = total_size
+        self.current = 0
+        self.start_time = start_time
+        self.prefix = prefix
+        self.last_update = 0
+        # Octets lus sur disque (zip : octets compressés)
+        self.position = position
+
+    def _advance(self, data):
+        if self.position:
+            self.current = self.position()
+        else:
+            # Octets et non caractères (accents : plusieurs octets en UTF-8)
+            self.current += len(data.encode('utf-8')) if isinstance(data, str) else len(data)
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self._advance(data)
+
+        # Mise à jour progress tous les 1%
+        if self.current - self.last_update > self.total * 0.01:
+            print_progress(self.current, self.total, self.start_time, self.prefix)
+            self.last_update = self.current
+
+        return data
+
+    def readline(self):
+        line = self.file.readline()
+        self._advance(line)
+        return line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self._advance(line)
+
+        if self.current - self.last_update > self.total * 0.01:
+            print_progress(self.current, self.total, self.start_time, self.prefix)
+            self.last_update = self.current
+
+        return line
+
+
+def import_csv_streaming(filepath, table_name, mapping, swap=False, partition=None):
     """
     Import CSV avec streaming - ne charge jamais le fichier entier en mémoire
     Utilise PostgreSQL COPY qui est la méthode la plus efficace
+
+    Avec swap=True, l'import se fait dans la table de staging : la table
+    active reste consultable jusqu'à publish_staging_tables(). partition
+    fixe la disposition de la table de staging (cf. create_staging_table).
     """
+    target_table = staging_name(table_name) if swap else table_name
     file_size = get_file_size(filepath)
 
     print(f"\n{'='*70}")
@@ -223,7 +1425,7 @@ def import_csv_streaming(filepath, table_name, mapping):
     print(f"{'='*70}")
     print(f"Fichier     : {filepath}")
     print(f"Taille      : {format_size(file_size)}")
-    print(f"Table cible : {table_name}")
+    print(f"Table cible : {target_table}")
     print(f"{'='*70}\n")
 
     start_time = time.time()
@@ -233,60 +1435,18 @@ def import_csv_streaming(filepath, table_name, mapping):
 
     try:
         # Préparation
-        prepare_database(cursor, table_name)
+        if swap:
+            create_staging_table(cursor, table_name, partition)
+        else:
+            prepare_database(cursor, table_name)
         conn.commit()
 
-        # Colonnes DB dans l'ordre du mapping
-        db_columns = list(mapping.values())
-
-        # Commande COPY optimisée
-        copy_sql = sql.SQL("""
-            COPY {table} ({columns})
-            FROM STDIN
-            WITH (
-                FORMAT CSV,
-                HEADER TRUE,
-                DELIMITER ',',
-                NULL '',
-                ENCODING 'UTF8'
-            )
-        """).format(
-            table=sql.Identifier(table_name),
-            columns=sql.SQL(', ').join([sql.Identifier(c) for c in db_columns])
-        )
-
         print("Import en cours (streaming)...")
         print("Cela peut prendre plusieurs minutes pour les gros fichiers.\n")
 
-        # Classe wrapper pour suivre la progression
-        class ProgressFile:
-            def __init__(self, file_obj, total_size, start_time):
-                self.file = file_obj
-                self.total = total_size
-                self.current = 0
-                self.start_time = start_time
-                self.last_update = 0
-
-            def read(self, size=-1):
-                data = self.file.read(size)
-                self.current += len(data)
-
-                # Mise à jour progress tous les 1%
-                if self.current - self.last_update > self.total * 0.01:
-                    print_progress(self.current, self.total, self.start_time, "Import: ")
-                    self.last_update = self.current
-
-                return data
-
-            def readline(self):
-                line = self.file.readline()
-                self.current += len(line)
-                return line
-
-        # Ouvrir et importer avec suivi de progression
-        with open(filepath, 'r', encoding='utf-8') as f:
-            progress_file = ProgressFile(f, file_size, start_time)
-            cursor.copy_expert(copy_sql, progress_file)
+        # Ouvrir et importer avec suivi de progression : l'en-tête réel
+        # (ou le schéma Parquet) détermine les colonnes envoyées à COPY
+        copy_source(cursor, filepath, target_table, mapping, start_time)
 
         print()  # Nouvelle ligne après progress bar
 
@@ -295,12 +1455,14 @@ def import_csv_streaming(filepath, table_name, mapping):
         conn.commit()
 
         # Compter les résultats
-        cursor.execute(f'SELECT COUNT(*) FROM {table_name}')
+        cursor.execute(f'SELECT COUNT(*) FROM {target_table}')
         count = cursor.fetchone()[0]
+        METRICS.record_table(table_name, count)
 
         # Restaurer contraintes
-        restore_database(cursor, table_name)
-        conn.commit()
+        if not swap:
+            restore_database(cursor, table_name)
+            conn.commit()
 
         # Stats finales
         elapsed = time.time() - start_time
@@ -326,12 +1488,20 @@ def import_csv_streaming(filepath, table_name, mapping):
         gc.collect()  # Libérer la mémoire
 
 
-def import_csv_chunked(filepath, table_name, mapping, chunk_lines=50000):
+def import_csv_chunked(filepath, table_name, mapping, chunk_lines=50000, swap=False, resume=False,
+                       partition=None):
     """
-    Import CSV par chunks - fallback si COPY échoue
-    Traite le fichier par lots pour limiter la mémoire
+    Import CSV par chunks - fallback si COPY streaming échoue
+
+    Chaque lot est chargé par COPY puis validé, et un point de reprise
+    (offset, lignes, signature du fichier) est écrit après chaque commit :
+    avec resume=True, l'import repart du dernier lot validé au lieu de vider
+    la table. partition : cf. import_csv_streaming.
     """
-    import csv
+    target_table = staging_name(table_name) if swap else table_name
+
+    if is_parquet_file(filepath):
+        raise ValueError("La méthode chunked ne lit que des CSV : utiliser streaming ou parallel pour un Parquet")
 
     file_size = get_file_size(filepath)
 
@@ -340,88 +1510,97 @@ def import_csv_chunked(filepath, table_name, mapping, chunk_lines=50000):
     print(f"{'='*70}")
     print(f"Fichier      : {filepath}")
     print(f"Taille       : {format_size(file_size)}")
-    print(f"Table cible  : {table_name}")
+    print(f"Table cible  : {target_table}")
     print(f"Taille chunk : {chunk_lines:,} lignes")
     print(f"{'='*70}\n")
 
     start_time = time.time()
-    total_rows = 0
 
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        # Préparation
-        prepare_database(cursor, table_name)
+        fingerprint = file_fingerprint(filepath)
+
+        checkpoint = None
+        if resume:
+            checkpoint = find_resume_point(cursor, filepath, fingerprint, target_table)
+
+        if checkpoint and checkpoint.get('completed'):
+            print(f"Table {target_table} déjà chargée ({checkpoint['rows']:,} lignes), ignorée.\n")
+            return checkpoint['rows']
+
+        # Préparation : la table n'est vidée que pour un nouvel import
+        if checkpoint:
+            print(f"Reprise à {format_size(checkpoint['offset'])} "
+                  f"({checkpoint['rows']:,} lignes déjà importées)")
+            if not swap:
+                cursor.execute(f"ALTER TABLE {table_name} DISABLE TRIGGER ALL")
+        elif swap:
+            create_staging_table(cursor, table_name, partition)
+        else:
+            prepare_database(cursor, table_name)
         conn.commit()
 
-        db_columns = list(mapping.values())
-        csv_columns = list(mapping.keys())
-
-        # Préparer l'INSERT avec ON CONFLICT
-        placeholders = ', '.join(['%s'] * len(db_columns))
-        insert_sql = f"""
-            INSERT INTO {table_name} ({', '.join(db_columns)})
-            VALUES ({placeholders})
-            ON CONFLICT DO NOTHING
-        """
+        base_rows = total_rows = checkpoint['rows'] if checkpoint else 0
+        state = {
+            'file': os.path.abspath(filepath),
+            'fingerprint': fingerprint,
+            'table': table_name,
+            'target_table': target_table,
+        }
 
         print("Import par chunks en cours...\n")
 
-        # Lecture streaming avec csv.reader (plus léger que DictReader)
-        with open(filepath, 'r', encoding='utf-8', buffering=CHUNK_SIZE) as f:
-            reader = csv.reader(f)
-
-            # Lire l'en-tête
-            header = next(reader)
-
-            # Créer le mapping index -> colonne
-            col_indices = {}
-            for csv_col in csv_columns:
-                try:
-                    col_indices[csv_col] = header.index(csv_col)
-                except ValueError:
-                    col_indices[csv_col] = None
-
-            batch = []
-            bytes_read = len(','.join(header))
-
-            for row in reader:
-                # Extraire les valeurs dans le bon ordre
-                values = []
-                for csv_col in csv_columns:
-                    idx = col_indices.get(csv_col)
-                    if idx is not None and idx < len(row):
-                        val = row[idx]
-                        values.append(val if val else None)
-                    else:
-                        values.append(None)
-
-                batch.append(tuple(values))
-                total_rows += 1
-                bytes_read += sum(len(c) for c in row) + len(row)
-
-                # Commit par chunk
-                if len(batch) >= chunk_lines:
-                    cursor.executemany(insert_sql, batch)
-                    conn.commit()
-
-                    print_progress(bytes_read, file_size, start_time,
-                                   f"Import ({total_rows:,} lignes): ")
-
-                    batch = []
-                    gc.collect()  # Libérer la mémoire
-
-            # Dernier batch
-            if batch:
-                cursor.executemany(insert_sql, batch)
+        with open_binary_source(filepath) as (binary, position):
+            header_line = binary.readline()
+            header = next(csv.reader([header_line.decode('utf-8')]))
+
+            offset = checkpoint['offset'] if checkpoint else len(header_line)
+            binary.seek(offset)
+            lines = OffsetLines(binary, offset)
+
+            projector = CsvProjector(
+                lines, mapping, header,
+                column_types=fetch_column_types(cursor, target_table),
+                rejects=REJECTS.for_table(table_name)
+            )
+            if projector.missing:
+                print(f"Colonnes absentes du fichier (ignorées) : {', '.join(projector.missing)}")
+            copy_sql = build_copy_sql(target_table, projector.db_columns)
+
+            for chunk in projector.iter_chunks(batch_rows=chunk_lines):
+                batch_rows = base_rows + projector.rows
+
+                # Point de reprise provisoire : le lot peut être validé
+                # sans que le point définitif ait pu être écrit
+                write_checkpoint(table_name, dict(
+                    state, offset=offset, rows=total_rows,
+                    pending={'offset': lines.offset, 'rows': batch_rows}
+                ))
+
+                data = chunk.encode('utf-8')
+                copy_start = time.perf_counter()
+                cursor.copy_expert(copy_sql, io.BytesIO(data), size=COPY_BLOCK_SIZE)
                 conn.commit()
+                METRICS.add('copy', time.perf_counter() - copy_start, batch_rows - total_rows, len(data))
+
+                total_rows, offset = batch_rows, lines.offset
+                write_checkpoint(table_name, dict(state, offset=offset, rows=total_rows))
+
+                print_progress(position() if position else lines.offset, file_size, start_time,
+                               f"Import ({total_rows:,} lignes): ")
 
         print()
 
         # Restaurer
-        restore_database(cursor, table_name)
-        conn.commit()
+        if not swap:
+            restore_database(cursor, table_name)
+            conn.commit()
+
+        # Le point de reprise est conservé jusqu'à la fin de l'import complet
+        write_checkpoint(table_name, dict(state, offset=offset, rows=total_rows, completed=True))
+        METRICS.record_table(table_name, total_rows)
 
         # Stats
         elapsed = time.time() - start_time
@@ -440,6 +1619,8 @@ def import_csv_chunked(filepath, table_name, mapping, chunk_lines=50000):
     except Exception as e:
         conn.rollback()
         print(f"\n\nERREUR : {e}")
+        if os.path.exists(checkpoint_path(table_name)):
+            print("Relancer avec --resume pour reprendre au dernier lot validé.")
         raise
     finally:
         cursor.close()
@@ -447,71 +1628,1568 @@ def import_csv_chunked(filepath, table_name, mapping, chunk_lines=50000):
         gc.collect()
 
 
-def create_indexes(verbose=True):
-    """Crée les index après l'import"""
-    if verbose:
-        print("\n" + "="*70)
-        print("CRÉATION DES INDEX")
-        print("="*70 + "\n")
+# ============================================
+# POINTS DE REPRISE (import chunked --resume)
+# ============================================
 
-    conn = get_connection()
-    conn.autocommit = True  # Requis pour CREATE INDEX CONCURRENTLY
-    cursor = conn.cursor()
+CHECKPOINT_DIR = 'checkpoints'
 
-    indexes = [
-        # Unite legale
-        ('idx_ul_denomination', 'unite_legale', 'denomination'),
-        ('idx_ul_activite', 'unite_legale', 'activite_principale'),
-        ('idx_ul_categorie_juridique', 'unite_legale', 'categorie_juridique'),
-        ('idx_ul_categorie_entreprise', 'unite_legale', 'categorie_entreprise'),
-        ('idx_ul_etat', 'unite_legale', 'etat_administratif'),
-        ('idx_ul_tranche_effectifs', 'unite_legale', 'tranche_effectifs'),
-        # Etablissement
-        ('idx_etab_siren', 'etablissement', 'siren'),
-        ('idx_etab_siege', 'etablissement', 'etablissement_siege'),
-        ('idx_etab_etat', 'etablissement', 'etat_administratif'),
-        ('idx_etab_activite', 'etablissement', 'activite_principale'),
-        ('idx_etab_code_postal', 'etablissement', 'code_postal'),
-        ('idx_etab_commune', 'etablissement', 'libelle_commune'),
-        ('idx_etab_code_commune', 'etablissement', 'code_commune'),
-    ]
+# Octets lus en tête et en fin de fichier pour sa signature
+FINGERPRINT_SAMPLE = 1024 * 1024
 
-    try:
-        for i, (idx_name, table, column) in enumerate(indexes, 1):
-            if verbose:
-                print(f"  [{i}/{len(indexes)}] Création de {idx_name}...")
-            cursor.execute(f'DROP INDEX IF EXISTS {idx_name}')
-            cursor.execute(f'CREATE INDEX CONCURRENTLY {idx_name} ON {table}({column})')
-            conn.commit()
 
-        # Index composites
-        if verbose:
-            print(f"  Création des index composites...")
+class OffsetLines:
+    """
+    Lignes décodées d'un flux binaire, avec l'offset en octets de la fin de
+    la dernière ligne lue
+
+    csv.reader ne consomme que les lignes nécessaires à chaque
+    enregistrement : après un lot, l'offset est donc sur une frontière
+    d'enregistrement, même avec des champs multi-lignes.
+    """
+
+    def __init__(self, binary, offset=0):
+        self.binary = binary
+        self.offset = offset
+
+    def __iter__(self):
+        for line in self.binary:
+            self.offset += len(line)
+            yield line.decode('utf-8')
+
+
+def file_fingerprint(filepath):
+    """
+    Signature d'un fichier pour ses points de reprise : taille, date de
+    modification et SHA-256 du premier et du dernier Mo
+
+    Lit au plus 2 Mo quel que soit le fichier (compute_file_hash en lirait
+    plusieurs Go à chaque import, reprise ou non).
+    """
+    stat = os.stat(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_SAMPLE))
+        if stat.st_size > FINGERPRINT_SAMPLE:
+            f.seek(max(FINGERPRINT_SAMPLE, stat.st_size - FINGERPRINT_SAMPLE))
+            digest.update(f.read())
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{digest.hexdigest()}"
+
+
+def checkpoint_path(table_name):
+    return os.path.join(CHECKPOINT_DIR, f"{table_name}.json")
+
+
+def write_checkpoint(table_name, state):
+    """Écrit le point de reprise de façon atomique (fichier temporaire + rename)"""
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    path = checkpoint_path(table_name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(state, updated_at=datetime.now().isoformat(timespec='seconds')), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(table_name):
+    path = checkpoint_path(table_name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def clear_checkpoints(table_names):
+    """Supprime les points de reprise une fois l'import complet terminé"""
+    for table_name in table_names:
+        path = checkpoint_path(table_name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def find_resume_point(cursor, filepath, fingerprint, target_table):
+    """
+    Valide le point de reprise d'une table contre le fichier et la base
+
+    Le nombre de lignes de la table cible départage le point définitif et
+    le point provisoire (lot validé avant l'écriture du point).
+
+    Returns:
+        dict ou None: {'offset', 'rows', ['completed']}, None si aucun point
+    """
+    table_name = target_table[:-len(STAGING_SUFFIX)] if target_table.endswith(STAGING_SUFFIX) else target_table
+    checkpoint = read_checkpoint(table_name)
+    if checkpoint is None:
+        print("Aucun point de reprise : import depuis le début.")
+        return None
+
+    if checkpoint.get('fingerprint') != fingerprint:
+        raise RuntimeError(
+            f"Le point de reprise de {table_name} concerne un autre fichier "
+            f"({checkpoint['file']}) : supprimer {checkpoint_path(table_name)}"
+        )
+    if checkpoint['target_table'] != target_table or not table_exists(cursor, target_table):
+        raise RuntimeError(
+            f"Le point de reprise vise {checkpoint['target_table']}, absente ou différente "
+            f"de {target_table} : relancer sans --resume"
+        )
+
+    cursor.execute(f"SELECT COUNT(*) FROM {target_table}")
+    count = cursor.fetchone()[0]
+    if count == checkpoint['rows']:
+        return checkpoint
+    pending = checkpoint.get('pending')
+    if pending and count == pending['rows']:
+        return dict(checkpoint, **pending)
+
+    # Ex. table UNLOGGED vidée par un redémarrage brutal du serveur
+    raise RuntimeError(
+        f"{target_table} contient {count:,} lignes, le point de reprise en attend "
+        f"{checkpoint['rows']:,} : relancer sans --resume"
+    )
+
+
+# ============================================
+# IMPORT PARALLÈLE (staging UNLOGGED)
+# ============================================
+
+def split_csv_ranges(filepath, parts):
+    """
+    Découpe un CSV en plages d'octets alignées sur les fins de ligne
+
+    L'en-tête est exclu : chaque plage commence au début d'une ligne de
+    données. Suppose qu'aucun champ ne contient de saut de ligne (cas des
+    fichiers stock INSEE).
+
+    Returns:
+        list: [(debut, fin), ...] en octets
+    """
+    file_size = get_file_size(filepath)
+
+    with open(filepath, 'rb') as f:
+        f.readline()  # En-tête
+        data_start = f.tell()
+        step = max((file_size - data_start) // max(parts, 1), 1)
+
+        bounds = [data_start]
+        for i in range(1, parts):
+            f.seek(data_start + i * step)
+            f.readline()  # Aller au début de la ligne suivante
+            pos = f.tell()
+            if pos >= file_size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+        bounds.append(file_size)
+
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def iter_range_lines(file_obj, start, end, on_read=None):
+    """Itère sur les lignes (décodées) d'une plage d'octets du fichier"""
+    file_obj.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        line = file_obj.readline()
+        if not line:
+            break
+        remaining -= len(line)
+        if on_read:
+            on_read(len(line))
+        yield line.decode('utf-8')
+
+
+def iter_source_lines(file_obj, position, on_read):
+    """Itère sur les lignes d'un flux en signalant les octets lus sur disque"""
+    last = 0
+    for line in file_obj:
+        current = position()
+        if current != last:
+            on_read(current - last)
+            last = current
+        yield line
+
+
+class SharedProgress:
+    """Compteur de progression partagé entre les workers"""
+
+    def __init__(self, total, start_time, prefix=""):
+        self.total = total
+        self.current = 0
+        self.start_time = start_time
+        self.prefix = prefix
+        self.last_update = 0
+        self.lock = threading.Lock()
+
+    def add(self, nbytes):
+        with self.lock:
+            self.current += nbytes
+            if self.current - self.last_update > self.total * 0.01:
+                print_progress(self.current, self.total, self.start_time, self.prefix)
+                self.last_update = self.current
+
+
+def staging_name(table_name):
+    """Nom de la table de staging associée"""
+    return f"{table_name}{STAGING_SUFFIX}"
+
+
+def table_exists(cursor, table_name):
+    """Vérifie l'existence d'une table dans le schéma courant"""
+    cursor.execute("SELECT to_regclass(%s)", (table_name,))
+    return cursor.fetchone()[0] is not None
+
+
+def create_staging_table(cursor, table_name, layout=None):
+    """
+    Crée une table de staging UNLOGGED vide (sans index ni contraintes)
+
+    layout : disposition d'etablissement ('hash:N', 'departement', 'none') ;
+    par défaut celle de la table active. Une table partitionnée ne peut pas
+    être UNLOGGED : seules ses partitions le sont.
+    """
+    staging = staging_name(table_name)
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+
+    if table_name != PARTITIONED_TABLE:
+        layout = 'none'
+    elif layout is None:
+        layout = partition_layout(cursor, table_name)
 
-        cursor.execute('DROP INDEX IF EXISTS idx_etab_siren_siege')
-        cursor.execute('CREATE INDEX idx_etab_siren_siege ON etablissement(siren, etablissement_siege)')
+    if layout == 'none':
+        cursor.execute(
+            f"CREATE UNLOGGED TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS)"
+        )
+        return
+
+    print(f"  {staging} partitionnée ({layout})...")
+    cursor.execute(
+        f"CREATE TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS) "
+        f"PARTITION BY {PARTITION_KEYS[layout.split(':')[0]]}"
+    )
+    for tag, bound in partition_bounds(layout):
+        cursor.execute(
+            f"CREATE UNLOGGED TABLE {table_name}_{tag}{STAGING_SUFFIX} "
+            f"PARTITION OF {staging} {bound}"
+        )
+
+
+# ============================================
+# PARTITIONNEMENT D'ETABLISSEMENT (--partition)
+# ============================================
+
+# Seule etablissement (30M+ lignes) est partitionnable
+PARTITIONED_TABLE = 'etablissement'
+DEFAULT_HASH_PARTITIONS = 16
+
+# Clé de partitionnement par disposition
+PARTITION_KEYS = {
+    'hash': 'HASH (siren)',
+    'departement': 'RANGE (code_postal)',
+}
+
+
+def parse_partitioning(value):
+    """
+    Valeur de --partition : 'hash[:N]', 'departement' ou 'none'
+
+    hash : N partitions sur le hash du SIREN (une requête par SIREN ne lit
+    qu'une partition). departement : une partition par préfixe de code
+    postal, plus une partition par défaut (code postal absent).
+    """
+    value = value.strip().lower()
+    if value in ('none', 'departement'):
+        return value
+    kind, _, count = value.partition(':')
+    if kind == 'hash':
+        try:
+            modulus = int(count) if count else DEFAULT_HASH_PARTITIONS
+        except ValueError:
+            modulus = 0
+        if 2 <= modulus <= 1024:
+            return f"hash:{modulus}"
+    raise argparse.ArgumentTypeError(
+        f"partitionnement invalide : {value} (hash, hash:N, departement ou none)"
+    )
+
+
+def partition_bounds(layout):
+    """
+    Partitions d'une disposition
+
+    Returns:
+        list: [(suffixe de la partition, clause FOR VALUES)]
+    """
+    if layout.startswith('hash:'):
+        modulus = int(layout.split(':')[1])
+        width = len(str(modulus - 1))
+        return [
+            (f"p{i:0{width}d}", f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {i})")
+            for i in range(modulus)
+        ]
+
+    bounds = [('d00', "FOR VALUES FROM (MINVALUE) TO ('01')")]
+    bounds += [
+        (f"d{i:02d}", f"FOR VALUES FROM ('{i:02d}') TO ('{i + 1:02d}')")
+        for i in range(1, 99)
+    ]
+    bounds.append(('d99', "FOR VALUES FROM ('99') TO (MAXVALUE)"))
+    # Code postal NULL (adresse à l'étranger) : hors de toute plage
+    bounds.append(('autres', 'DEFAULT'))
+    return bounds
+
+
+def partition_primary_key(table_name, layout):
+    """
+    Colonnes de clé primaire (table mère, chaque partition)
+
+    Une contrainte unique sur une table partitionnée doit contenir la clé de
+    partitionnement : (siret, siren) en hash. En departement, le code
+    postal peut être NULL : siret n'est unique que par partition.
+    """
+    if layout == 'none':
+        return PRIMARY_KEYS[table_name], None
+    if layout.startswith('hash:'):
+        return 'siret, siren', 'siret, siren'
+    return None, 'siret'
+
+
+def list_partitions(cursor, table_name, suffix=''):
+    """Suffixes des partitions d'une génération (ex. ['p00', 'p01', ...])"""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+    """, (f"{table_name}{suffix}",))
+    prefix = f"{table_name}_"
+    return [name[len(prefix):len(name) - len(suffix)] for (name,) in cursor.fetchall()]
+
+
+def partition_layout(cursor, table_name, suffix=''):
+    """Disposition d'une génération de table : 'hash:N', 'departement' ou 'none'"""
+    cursor.execute("SELECT pg_get_partkeydef(to_regclass(%s))", (f"{table_name}{suffix}",))
+    keydef = cursor.fetchone()[0]
+    if not keydef:
+        return 'none'
+    if keydef.upper().startswith('HASH'):
+        return f"hash:{len(list_partitions(cursor, table_name, suffix))}"
+    return 'departement'
+
+
+def copy_range_worker(filepath, table_name, mapping, header, start, end, progress):
+    """Importe une plage d'octets du CSV via COPY sur une connexion dédiée"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        # Table UNLOGGED : le commit synchrone n'apporte rien ici
+        cursor.execute("SET synchronous_commit TO OFF")
+
+        if is_parquet_file(filepath):
+            # Parquet : plage de row groups, progression estimée en octets
+            parquet_file = open_parquet_file(filepath)
+            bytes_per_row = get_file_size(filepath) / max(parquet_file.metadata.num_rows, 1)
+            projector = copy_parquet(
+                cursor, filepath, table_name, mapping, row_groups=list(range(start, end)),
+                on_rows=lambda count: progress.add(int(count * bytes_per_row))
+            )
+        elif start is None:
+            # Archive zip : non découpable, chargée en un seul flux
+            with open_csv_source(filepath) as (f, position):
+                lines = iter_source_lines(f, position, progress.add)
+                projector = copy_projected(cursor, lines, table_name, mapping)
+        else:
+            with open(filepath, 'rb') as f:
+                lines = iter_range_lines(f, start, end, progress.add)
+                projector = copy_projected(cursor, lines, table_name, mapping, header)
+
+        rows = projector.rows
         conn.commit()
+        return rows
 
-        if verbose:
-            print("\nIndex créés avec succès !")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def rename_generation(cursor, table_name, from_suffix, to_suffix):
+    """
+    Renomme une génération de table, ses index et ses statistiques étendues
+
+    Ex. (unite_legale, '', '_previous') renomme unite_legale en
+    unite_legale_previous et idx_ul_etat en idx_ul_etat_previous. Les
+    partitions (etablissement_p00...) sont renommées avec leur table mère.
+    """
+    source = f"{table_name}{from_suffix}"
+    for tag in list_partitions(cursor, table_name, from_suffix):
+        rename_generation(cursor, f"{table_name}_{tag}", from_suffix, to_suffix)
+
+    cursor.execute(
+        "SELECT 'INDEX', indexname FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s "
+        "UNION ALL "
+        "SELECT 'STATISTICS', stxname FROM pg_statistic_ext "
+        "WHERE stxrelid = to_regclass(%s)",
+        (source, source)
+    )
+    for kind, name in cursor.fetchall():
+        base = name
+        if from_suffix and base.endswith(from_suffix):
+            base = base[:-len(from_suffix)]
+        cursor.execute(sql.SQL("ALTER {} {} RENAME TO {}").format(
+            sql.SQL(kind), sql.Identifier(name), sql.Identifier(base + to_suffix)
+        ))
+
+    cursor.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(
+        sql.Identifier(source), sql.Identifier(f"{table_name}{to_suffix}")
+    ))
+
+
+def relink_live_tables(cursor):
+    """
+    Recrée la clé étrangère et la vue sur la génération active
+
+    Une clé étrangère NOT VALID n'est pas permise sur une table
+    partitionnée : elle est alors posée sur chaque partition.
+    """
+    targets = [f"etablissement_{tag}" for tag in list_partitions(cursor, 'etablissement')]
+    for target in targets or ['etablissement']:
+        cursor.execute(f"ALTER TABLE {target} DROP CONSTRAINT IF EXISTS etablissement_siren_fkey")
+        cursor.execute(f"""
+            ALTER TABLE {target}
+            ADD CONSTRAINT etablissement_siren_fkey
+            FOREIGN KEY (siren) REFERENCES unite_legale(siren) NOT VALID
+        """)
+    cursor.execute(VIEW_ENTREPRISE_COMPLETE)
+
+
+def finalize_partition_worker(table, pk_columns):
+    """SET LOGGED puis clé primaire d'une table (ou partition) de staging"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(f"ALTER TABLE {table}{STAGING_SUFFIX} SET LOGGED")
+        if pk_columns and not table_exists(cursor, f"{table}_pkey{STAGING_SUFFIX}"):
+            cursor.execute(
+                f"ALTER TABLE {table}{STAGING_SUFFIX} ADD CONSTRAINT {table}_pkey{STAGING_SUFFIX} "
+                f"PRIMARY KEY ({pk_columns})"
+            )
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def finalize_staging_tables(table_names, workers=DEFAULT_WORKERS):
+    """
+    Passe les tables de staging en LOGGED et crée leur clé primaire
+
+    À appeler avant la construction des index : SET LOGGED réécrit la
+    table et tous ses index. Les partitions sont traitées en parallèle sur
+    `workers` connexions ; la clé primaire de la table mère rattache
+    ensuite celles des partitions sans les reconstruire.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        for table_name in [t for t in PRIMARY_KEYS if t in table_names]:
+            staging = staging_name(table_name)
+            layout = partition_layout(cursor, table_name, STAGING_SUFFIX)
+            parent_pk, partition_pk = partition_primary_key(table_name, layout)
+
+            if layout == 'none':
+                print(f"  Passage en LOGGED et clé primaire de {staging}...")
+                finalize_partition_worker(table_name, parent_pk)
+                continue
+
+            partitions = [f"{table_name}_{tag}" for tag in list_partitions(cursor, table_name, STAGING_SUFFIX)]
+            print(f"  Passage en LOGGED et clé primaire de {len(partitions)} partitions "
+                  f"de {staging} ({workers} connexions)...")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(finalize_partition_worker, p, partition_pk)
+                               for p in partitions]:
+                    future.result()
+
+            if parent_pk and not table_exists(cursor, f"{table_name}_pkey{STAGING_SUFFIX}"):
+                cursor.execute(
+                    f"ALTER TABLE {staging} ADD CONSTRAINT {table_name}_pkey{STAGING_SUFFIX} "
+                    f"PRIMARY KEY ({parent_pk})"
+                )
+            conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def publish_staging_tables(table_names):
+    """
+    Bascule les tables de staging à la place des tables actives (blue/green)
+
+    La bascule ne fait que des RENAME dans une transaction courte : la
+    génération active devient *_previous (conservée pour --rollback) et
+    l'ancienne génération *_previous est supprimée. La clé étrangère
+    etablissement -> unite_legale est recréée NOT VALID, comme l'import
+    direct qui désactive les triggers.
+    """
+    # unite_legale d'abord (référencée par etablissement)
+    ordered = [t for t in PRIMARY_KEYS if t in table_names]
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        print("  Bascule des tables...")
+        bascule_start = time.time()
+        # Ne pas bloquer indéfiniment derrière une requête longue
+        cursor.execute("SET LOCAL lock_timeout = '30s'")
+        cursor.execute("DROP VIEW IF EXISTS v_entreprise_complete")
+        for table_name in ordered:
+            cursor.execute(f"DROP TABLE IF EXISTS {table_name}{PREVIOUS_SUFFIX} CASCADE")
+        for table_name in ordered:
+            if table_exists(cursor, table_name):
+                rename_generation(cursor, table_name, '', PREVIOUS_SUFFIX)
+            rename_generation(cursor, table_name, STAGING_SUFFIX, '')
+        relink_live_tables(cursor)
+        conn.commit()
+        print(f"  Bascule effectuée en {time.time() - bascule_start:.2f}s")
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def rollback_generation():
+    """Restaure la génération *_previous à la place des tables actives"""
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        tables = [
+            t for t in PRIMARY_KEYS
+            if table_exists(cursor, f"{t}{PREVIOUS_SUFFIX}")
+        ]
+        if not tables:
+            print("Aucune génération précédente à restaurer.")
+            return []
+
+        print(f"Restauration de la génération précédente : {', '.join(tables)}...")
+        cursor.execute("DROP VIEW IF EXISTS v_entreprise_complete")
+        for table_name in tables:
+            rename_generation(cursor, table_name, '', '_rollback')
+            rename_generation(cursor, table_name, PREVIOUS_SUFFIX, '')
+            rename_generation(cursor, table_name, '_rollback', PREVIOUS_SUFFIX)
+        relink_live_tables(cursor)
+        conn.commit()
+        print("Génération précédente restaurée !")
+        return tables
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def import_csv_parallel(sources, workers=DEFAULT_WORKERS, partition=None):
+    """
+    Import parallèle : chaque fichier est découpé en plages alignées sur les
+    lignes, chaque plage est chargée par COPY sur sa propre connexion dans
+    une table de staging UNLOGGED. Les fichiers unite_legale et etablissement
+    sont chargés simultanément ; la bascule est faite par
+    publish_staging_tables().
+
+    Args:
+        sources: liste de tuples (filepath, table_name, mapping)
+        workers: nombre de connexions COPY simultanées
+        partition: disposition de etablissement_staging ; COPY sur la
+            table mère route chaque ligne vers sa partition, les plages
+            alimentent donc toutes les partitions en parallèle
+    """
+    total_size = sum(get_file_size(fp) for fp, _, _ in sources)
+
+    print(f"\n{'='*70}")
+    print(f"IMPORT CSV PARALLÈLE")
+    print(f"{'='*70}")
+    for filepath, table_name, _ in sources:
+        print(f"Fichier     : {filepath} -> {table_name}")
+    print(f"Taille      : {format_size(total_size)}")
+    print(f"Workers     : {workers}")
+    print(f"{'='*70}\n")
+
+    start_time = time.time()
+
+    # Tables de staging
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        print("Création des tables de staging (UNLOGGED)...")
+        for _, table_name, _ in sources:
+            create_staging_table(cursor, table_name, partition)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    # Plages par fichier, entrelacées pour charger les tables en même temps
+    ranges_per_source = []
+    for filepath, table_name, mapping in sources:
+        if is_parquet_file(filepath):
+            # Parquet : découpage par row groups, colonnes lues dans le schéma
+            ranges_per_source.append([
+                (filepath, staging_name(table_name), mapping, None, start, end)
+                for start, end in split_parquet_row_groups(filepath, workers)
+            ])
+            continue
+
+        header = read_csv_header(filepath)
+        missing = [c for c in mapping if c not in header]
+        if missing:
+            print(f"Colonnes absentes de {os.path.basename(filepath)} (ignorées) : {', '.join(missing)}")
+        if is_zip_file(filepath):
+            # Un flux compressé ne se découpe pas : une seule plage
+            ranges = [(None, None)]
+        else:
+            ranges = split_csv_ranges(filepath, workers)
+        ranges_per_source.append([
+            (filepath, staging_name(table_name), mapping, header, start, end)
+            for start, end in ranges
+        ])
+
+    tasks = []
+    for i in range(max(len(r) for r in ranges_per_source)):
+        for ranges in ranges_per_source:
+            if i < len(ranges):
+                tasks.append(ranges[i])
+
+    print(f"Import en cours ({len(tasks)} plages)...\n")
+    progress = SharedProgress(total_size, start_time, "Import: ")
+    counts = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(copy_range_worker, *task, progress): task[1]
+            for task in tasks
+        }
+        try:
+            for future in as_completed(futures):
+                staging = futures[future]
+                counts[staging] = counts.get(staging, 0) + future.result()
+        except Exception as e:
+            for f in futures:
+                f.cancel()
+            print(f"\n\nERREUR : {e}")
+            raise
+
+    print()
+
+    elapsed = time.time() - start_time
+    total_rows = sum(counts.values())
+    rate = total_rows / elapsed if elapsed > 0 else 0
+
+    print(f"\n{'='*70}")
+    print(f"IMPORT TERMINÉ AVEC SUCCÈS")
+    print(f"{'='*70}")
+    for _, table_name, _ in sources:
+        METRICS.record_table(table_name, counts.get(staging_name(table_name), 0))
+        print(f"{table_name:<16} : {counts.get(staging_name(table_name), 0):,} lignes")
+    print(f"Durée totale     : {format_time(elapsed)}")
+    print(f"Vitesse          : {rate:,.0f} lignes/seconde")
+    print(f"{'='*70}\n")
+
+    return total_rows
+
+
+# ============================================
+# DOCUMENT DE RECHERCHE (search_document)
+# ============================================
+
+# Configuration plein texte française insensible aux accents (unaccent puis
+# racinisation). to_tsvector(config, texte) étant IMMUTABLE, le tsvector de
+# search_document peut être une colonne générée (même DDL que docs/schema.sql)
+SEARCH_TS_CONFIG = 'fr_unaccent'
+
+SEARCH_TS_CONFIG_DDL = f"""
+CREATE EXTENSION IF NOT EXISTS unaccent;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_TS_CONFIG}') THEN
+        CREATE TEXT SEARCH CONFIGURATION {SEARCH_TS_CONFIG} (COPY = french);
+        ALTER TEXT SEARCH CONFIGURATION {SEARCH_TS_CONFIG}
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+    END IF;
+END
+$$;
+"""
+
+# Une ligne par SIREN : unité légale + siège, pour des recherches sur une
+# seule table (même définition que docs/schema.sql)
+# Poids plein texte : A = dénomination, sigle, nom ; B = noms d'usage,
+# prénoms, pseudonyme, enseignes et dénominations usuelles des établissements
+SEARCH_DOCUMENT_DDL = """
+CREATE TABLE {table} (
+    siren VARCHAR(9) NOT NULL,
+    nom_complet VARCHAR(255),
+    nom_recherche TEXT,
+    noms_secondaires TEXT,
+    denomination VARCHAR(255),
+    sigle VARCHAR(50),
+    nom VARCHAR(100),
+    prenom_1 VARCHAR(100),
+    categorie_juridique VARCHAR(10),
+    activite_principale VARCHAR(10),
+    categorie_entreprise VARCHAR(5),
+    tranche_effectifs VARCHAR(5),
+    etat_administratif CHAR(1),
+    date_creation DATE,
+    siret_siege VARCHAR(14),
+    adresse VARCHAR(500),
+    code_postal VARCHAR(10),
+    code_commune VARCHAR(10),
+    libelle_commune VARCHAR(100),
+    latitude DECIMAL(9, 6),
+    longitude DECIMAL(9, 6),
+    recherche TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('{config}', COALESCE(nom_recherche, '')), 'A') ||
+        setweight(to_tsvector('{config}', COALESCE(noms_secondaires, '')), 'B')
+    ) STORED
+)
+"""
+
+# Enseignes et dénominations usuelles : tous les établissements de l'entreprise
+# (tronquées pour les réseaux de plusieurs milliers d'établissements)
+# Siège : l'établissement dont le SIRET est SIREN + nic_siege (clé primaire)
+SEARCH_DOCUMENT_SELECT = """
+SELECT
+    ul.siren,
+    LEFT(COALESCE(
+        ul.denomination,
+        NULLIF(CONCAT_WS(' ', COALESCE(ul.prenom_usuel, ul.prenom_1), ul.nom), ''),
+        'Non renseigné'
+    ), 255),
+    CONCAT_WS(' ', ul.denomination, ul.sigle, ul.nom),
+    NULLIF(CONCAT_WS(' ',
+        ul.denomination_usuelle_1, ul.denomination_usuelle_2, ul.denomination_usuelle_3,
+        ul.nom_usage, ul.pseudonyme, ul.prenom_usuel,
+        ul.prenom_1, ul.prenom_2, ul.prenom_3, ul.prenom_4,
+        LEFT(en.enseignes, 2000)
+    ), ''),
+    ul.denomination,
+    ul.sigle,
+    ul.nom,
+    ul.prenom_1,
+    ul.categorie_juridique,
+    ul.activite_principale,
+    ul.categorie_entreprise,
+    ul.tranche_effectifs,
+    ul.etat_administratif,
+    ul.date_creation,
+    e.siret,
+    NULLIF(CONCAT_WS(', ',
+        NULLIF(CONCAT_WS(' ', e.numero_voie, e.indice_repetition, e.type_voie, e.libelle_voie), ''),
+        e.complement_adresse,
+        NULLIF(CONCAT_WS(' ', e.code_postal, e.libelle_commune), '')
+    ), ''),
+    e.code_postal,
+    e.code_commune,
+    e.libelle_commune,
+    e.latitude,
+    e.longitude
+FROM unite_legale ul
+LEFT JOIN etablissement e ON e.siret = ul.siren || ul.nic_siege
+LEFT JOIN (
+    SELECT siren, string_agg(DISTINCT CONCAT_WS(' ',
+        denomination_usuelle, enseigne_1, enseigne_2, enseigne_3), ' ') AS enseignes
+    FROM etablissement
+    WHERE COALESCE(denomination_usuelle, enseigne_1, enseigne_2, enseigne_3) IS NOT NULL
+    {en_filter}
+    GROUP BY siren
+) en ON en.siren = ul.siren
+{filter}
+"""
+
+# Colonnes renseignées par SEARCH_DOCUMENT_SELECT (recherche est générée)
+SEARCH_DOCUMENT_COLUMNS = (
+    'siren', 'nom_complet', 'nom_recherche', 'noms_secondaires', 'denomination',
+    'sigle', 'nom', 'prenom_1', 'categorie_juridique', 'activite_principale',
+    'categorie_entreprise', 'tranche_effectifs', 'etat_administratif',
+    'date_creation', 'siret_siege', 'adresse', 'code_postal', 'code_commune',
+    'libelle_commune', 'latitude', 'longitude',
+)
+
+# SIREN modifiés par --incremental dont le document reste à rafraîchir :
+# alimentée dans la transaction de la fusion, vidée par la publication
+# (refresh_search_document, ou build_search_document qui recouvre tout)
+SEARCH_DOCUMENT_PENDING_DDL = """
+CREATE TABLE IF NOT EXISTS search_document_pending (
+    siren VARCHAR(9) PRIMARY KEY
+)
+"""
+
+# Au-delà, le delta est appliqué par reconstruction complète (plus rapide
+# qu'un UPSERT ligne à ligne sur une grande partie de la table)
+SEARCH_DOCUMENT_DELTA_MAX = 1000000
+
+
+# Génération des données publiées : incrémentée à chaque publication de
+# search_document (import, --incremental, --rollback, --search-only) dans la
+# même transaction que la bascule. Invalide le cache de recherche de l'API.
+DATASET_GENERATION_DDL = """
+CREATE TABLE IF NOT EXISTS dataset_generation (
+    id SERIAL PRIMARY KEY,
+    published_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def build_search_document(index_options=None):
+    """
+    Construit search_document à partir des tables actives
+
+    La table est construite à côté (search_document_staging), indexée et
+    analysée, puis substituée à la table active par RENAME.
+    """
+    print("\n" + "="*70)
+    print("CONSTRUCTION DE search_document")
+    print("="*70 + "\n")
+
+    start = time.perf_counter()
+    staging = staging_name('search_document')
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        cursor.execute(SEARCH_TS_CONFIG_DDL)
+        cursor.execute(SEARCH_DOCUMENT_DDL.format(table=staging, config=SEARCH_TS_CONFIG))
+        print("Remplissage depuis unite_legale et etablissement...")
+        cursor.execute(
+            f"INSERT INTO {staging} "
+            f"{SEARCH_DOCUMENT_SELECT.format(en_filter='', filter='')}"
+        )
+        rows = cursor.rowcount
+        cursor.execute(
+            f"ALTER TABLE {staging} ADD CONSTRAINT search_document_pkey{STAGING_SUFFIX} "
+            f"PRIMARY KEY (siren)"
+        )
+        conn.commit()
+        print(f"{rows:,} documents")
+    except Exception:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        raise
+
+    try:
+        create_indexes(tables=['search_document'], suffix=STAGING_SUFFIX, **(index_options or {}))
+        analyze_tables(tables=['search_document'], suffix=STAGING_SUFFIX)
+
+        cursor.execute("SET LOCAL lock_timeout = '30s'")
+        if table_exists(cursor, 'search_document'):
+            cursor.execute(f"DROP TABLE IF EXISTS search_document{PREVIOUS_SUFFIX}")
+            rename_generation(cursor, 'search_document', '', PREVIOUS_SUFFIX)
+            cursor.execute(f"DROP TABLE search_document{PREVIOUS_SUFFIX}")
+        rename_generation(cursor, 'search_document', STAGING_SUFFIX, '')
+        # La table publiée reflète toutes les modifications en attente
+        cursor.execute(SEARCH_DOCUMENT_PENDING_DDL)
+        cursor.execute("DELETE FROM search_document_pending")
+        generation = publish_generation(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    METRICS.add('search_document', time.perf_counter() - start, rows)
+    print(f"\nsearch_document publiée en {format_time(time.perf_counter() - start)} "
+          f"(génération {generation})")
+    build_app_snapshots(generation)
+    return rows
+
+
+def publish_generation(cursor):
+    """Incrémente dataset_generation (dans la transaction de publication)"""
+    cursor.execute(DATASET_GENERATION_DDL)
+    cursor.execute("INSERT INTO dataset_generation DEFAULT VALUES RETURNING id")
+    return cursor.fetchone()[0]
+
+
+def mark_dataset_changed():
+    """
+    Publie une nouvelle génération après le chargement des tables actives,
+    avec ou sans --no-index
+
+    Le cache de réponses est invalidé, et les snapshots de l'application
+    (antérieurs à cette génération) sont signalés périmés : l'autocomplétion
+    n'est plus mise en cache, /search/facets répond 503 jusqu'à la
+    reconstruction de search_document (fin de l'import, ou --search-only
+    après un import --no-index).
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        generation = publish_generation(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"\nDonnées publiées (génération {generation})")
+    return generation
 
+
+# Snapshots lus par l'application (mêmes variables et valeurs par défaut que
+# create_app) : reconstruits après chaque publication de search_document
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTOCOMPLETE_INDEX = os.getenv('AUTOCOMPLETE_INDEX', os.path.join(ROOT_DIR, 'data', 'autocomplete.idx'))
+FACETS_SNAPSHOT = os.getenv('FACETS_SNAPSHOT', os.path.join(ROOT_DIR, 'data', 'facets'))
+
+
+def iter_query_rows(query, itersize=50000):
+    """Lignes d'une requête, lues par curseur serveur"""
+    conn = get_connection()
+    cursor = conn.cursor(name='snapshot_rows')
+    cursor.itersize = itersize
+    try:
+        cursor.execute(query)
+        yield from cursor
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def build_app_snapshots(generation):
+    """
+    Snapshots de l'application pour la génération publiée : index
+    d'autocomplétion et facettes
+
+    Tant qu'ils ne sont pas reconstruits, l'autocomplétion sert l'index
+    précédent sans le mettre en cache et /search/facets répond 503. Un échec
+    n'annule pas la publication : relancer flask --app run autocomplete-index
+    ou facets-snapshot.
+    """
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    try:
+        from app.utils import autocomplete, facets
+    except ImportError as e:
+        print(f"Snapshots de l'application non construits ({e}) : lancer "
+              f"flask --app run autocomplete-index et facets-snapshot")
+        return
+
+    start = time.perf_counter()
+    try:
+        data = autocomplete.build_snapshot(iter_query_rows(autocomplete.SOURCE_SQL), generation)
+        autocomplete.write_snapshot(AUTOCOMPLETE_INDEX, data)
+    except Exception as e:
+        print(f"ERREUR index d'autocomplétion : {e} (relancer flask --app run autocomplete-index)")
+    else:
+        METRICS.add('autocomplete_index', time.perf_counter() - start, nbytes=len(data))
+        print(f"Index d'autocomplétion : {format_size(len(data))} en "
+              f"{format_time(time.perf_counter() - start)} ({AUTOCOMPLETE_INDEX})")
+
+    if not facets.NUMPY_AVAILABLE:
+        print("Snapshot des facettes non construit : numpy non installé")
+        return
+
+    start = time.perf_counter()
+    try:
+        rows = facets.build_snapshot(
+            iter_query_rows(facets.SOURCE_SQL), FACETS_SNAPSHOT, generation
+        )
+    except Exception as e:
+        print(f"ERREUR snapshot des facettes : {e} (relancer flask --app run facets-snapshot)")
+        return
+    METRICS.add('facets_snapshot', time.perf_counter() - start, rows)
+    print(f"Snapshot des facettes : {rows:,} entreprises en "
+          f"{format_time(time.perf_counter() - start)} ({FACETS_SNAPSHOT})")
+
+
+def refresh_search_document(index_options=None):
+    """
+    Applique à search_document les SIREN en attente (search_document_pending)
+
+    Après --incremental : seuls les documents des SIREN modifiés sont
+    recalculés (UPSERT, et DELETE de ceux dont l'unité légale a disparu), en
+    une transaction qui vide la liste d'attente et incrémente une seule fois
+    dataset_generation. Index et statistiques de la table sont conservés.
+    Sans search_document, ou si le delta dépasse SEARCH_DOCUMENT_DELTA_MAX,
+    la table est reconstruite par build_search_document().
+
+    Returns:
+        int: nombre de documents rafraîchis
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SEARCH_DOCUMENT_PENDING_DDL)
+        conn.commit()
+        cursor.execute("SELECT count(*) FROM search_document_pending")
+        pending = cursor.fetchone()[0]
+        if not pending:
+            print("search_document à jour (aucun SIREN modifié).")
+            return 0
+        full_build = not table_exists(cursor, 'search_document') or pending > SEARCH_DOCUMENT_DELTA_MAX
+    finally:
+        cursor.close()
+        conn.close()
+
+    if full_build:
+        return build_search_document(index_options)
+
+    print("\n" + "="*70)
+    print("MISE À JOUR DE search_document")
+    print("="*70 + "\n")
+    print(f"{pending:,} SIREN modifiés")
+
+    start = time.perf_counter()
+    columns = sql.SQL(', ').join([sql.Identifier(c) for c in SEARCH_DOCUMENT_COLUMNS])
+    upsert = sql.SQL("""
+        INSERT INTO search_document ({columns})
+        {select}
+        ON CONFLICT (siren) DO UPDATE SET {updates}
+    """).format(
+        columns=columns,
+        select=sql.SQL(SEARCH_DOCUMENT_SELECT.format(
+            en_filter="AND siren IN (SELECT siren FROM refresh_siren)",
+            filter="WHERE ul.siren IN (SELECT siren FROM refresh_siren)",
+        )),
+        updates=sql.SQL(', ').join([
+            sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(c))
+            for c in SEARCH_DOCUMENT_COLUMNS if c != 'siren'
+        ])
+    )
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SET LOCAL lock_timeout = '30s'")
+        # Liste d'attente prélevée dans la transaction : un SIREN ajouté
+        # pendant la mise à jour reste en attente pour la suivante
+        cursor.execute(
+            "CREATE TEMP TABLE refresh_siren (siren VARCHAR(9) PRIMARY KEY) ON COMMIT DROP"
+        )
+        cursor.execute("""
+            WITH taken AS (DELETE FROM search_document_pending RETURNING siren)
+            INSERT INTO refresh_siren SELECT siren FROM taken
+        """)
+        cursor.execute("ANALYZE refresh_siren")
+        cursor.execute(upsert)
+        rows = cursor.rowcount
+        cursor.execute("""
+            DELETE FROM search_document sd
+            USING refresh_siren r
+            WHERE sd.siren = r.siren
+              AND NOT EXISTS (SELECT 1 FROM unite_legale ul WHERE ul.siren = r.siren)
+        """)
+        deleted = cursor.rowcount
+        generation = publish_generation(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    METRICS.add('search_document', time.perf_counter() - start, rows)
+    print(f"{rows:,} documents mis à jour, {deleted:,} supprimés en "
+          f"{format_time(time.perf_counter() - start)} (génération {generation})")
+    build_app_snapshots(generation)
+    return rows + deleted
+
+
+# ============================================
+# IMPORT INCRÉMENTAL (date_dernier_traitement)
+# ============================================
+
+IMPORT_STATE_DDL = """
+CREATE TABLE IF NOT EXISTS import_state (
+    table_name VARCHAR(50) PRIMARY KEY,
+    high_water_mark TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS import_history (
+    file_hash VARCHAR(64) NOT NULL,
+    table_name VARCHAR(50) NOT NULL,
+    file_name VARCHAR(255),
+    rows_read BIGINT,
+    rows_applied BIGINT,
+    high_water_mark TIMESTAMP,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (file_hash, table_name)
+);
+"""
+
+
+def compute_file_hash(filepath):
+    """Calcule l'empreinte SHA-256 du fichier par blocs"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_upsert_sql(table_name, source_table, db_columns, key=None):
+    """
+    Construit l'UPSERT depuis la table temporaire
+
+    Seules les lignes au moins aussi récentes que le high-water mark sont
+    lues : les horodatages INSEE sont à la seconde, une ligne d'un fichier
+    suivant peut porter exactement la même valeur. Rejouer cette borne est
+    sans effet sur les lignes déjà à jour : une ligne existante n'est
+    remplacée que si son date_dernier_traitement est plus ancien que celui
+    du fichier. key : colonnes de la clé unique ciblée par ON CONFLICT (par
+    défaut la clé primaire).
+    """
+    pk = PRIMARY_KEYS[table_name]
+    key = key or [pk]
+    updates = [c for c in db_columns if c not in key]
+
+    return sql.SQL("""
+        INSERT INTO {table} ({columns})
+        SELECT DISTINCT ON ({pk}) {columns}
+        FROM {source}
+        WHERE %(hwm)s IS NULL
+           OR date_dernier_traitement IS NULL
+           OR date_dernier_traitement >= %(hwm)s
+        ORDER BY {pk}, date_dernier_traitement DESC NULLS LAST
+        ON CONFLICT ({key}) DO UPDATE SET {updates}
+        WHERE {table}.date_dernier_traitement IS NULL
+           OR EXCLUDED.date_dernier_traitement > {table}.date_dernier_traitement
+    """).format(
+        table=sql.Identifier(table_name),
+        source=sql.Identifier(source_table),
+        pk=sql.Identifier(pk),
+        key=sql.SQL(', ').join([sql.Identifier(c) for c in key]),
+        columns=sql.SQL(', ').join([sql.Identifier(c) for c in db_columns]),
+        updates=sql.SQL(', ').join([
+            sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(c))
+            for c in updates
+        ])
+    )
+
+
+def import_csv_incremental(filepath, table_name, mapping):
+    """
+    Import incrémental d'un fichier stock ou d'un fichier de mise à jour
+
+    Le fichier est chargé dans une table temporaire puis fusionné (UPSERT)
+    dans la table active : seules les lignes dont date_dernier_traitement est
+    plus récent que la valeur stockée sont écrites. Un fichier dont
+    l'empreinte a déjà été appliquée est ignoré. Les SIREN des lignes écrites
+    sont ajoutés à search_document_pending dans la même transaction.
+    """
+    file_size = get_file_size(filepath)
+
+    print(f"\n{'='*70}")
+    print(f"IMPORT CSV INCRÉMENTAL")
+    print(f"{'='*70}")
+    print(f"Fichier     : {filepath}")
+    print(f"Taille      : {format_size(file_size)}")
+    print(f"Table cible : {table_name}")
+    print(f"{'='*70}\n")
+
+    start_time = time.time()
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(IMPORT_STATE_DDL)
+        conn.commit()
+
+        print("Calcul de l'empreinte du fichier...")
+        file_hash = compute_file_hash(filepath)
+
+        cursor.execute(
+            "SELECT applied_at FROM import_history WHERE file_hash = %s AND table_name = %s",
+            (file_hash, table_name)
+        )
+        already = cursor.fetchone()
+        if already:
+            print(f"Fichier déjà appliqué le {already[0]:%d/%m/%Y %H:%M}, ignoré.\n")
+            return 0
+
+        cursor.execute(
+            "SELECT high_water_mark FROM import_state WHERE table_name = %s",
+            (table_name,)
+        )
+        row = cursor.fetchone()
+        hwm = row[0] if row else None
+        print(f"High-water mark : {hwm or 'aucun'}")
+
+        # Clé unique de la table active (siret, siren sur une table
+        # partitionnée par hash) ; sans clé globale, pas d'UPSERT possible
+        layout = partition_layout(cursor, table_name)
+        key, _ = partition_primary_key(table_name, layout)
+        if key is None:
+            raise ValueError(f"{table_name} est partitionnée par {layout} : sans clé unique "
+                             f"globale, l'import incrémental n'est pas possible")
+        key = [c.strip() for c in key.split(',')]
+
+        temp_table = f"tmp_{table_name}"
+        cursor.execute(
+            f"CREATE TEMP TABLE {temp_table} (LIKE {table_name} INCLUDING DEFAULTS) "
+            f"ON COMMIT DROP"
+        )
+
+        print("Chargement dans la table temporaire...\n")
+        projector = copy_source(cursor, filepath, temp_table, mapping, start_time)
+        print()
+        db_columns = projector.db_columns
+
+        cursor.execute(f"SELECT COUNT(*), MAX(date_dernier_traitement) FROM {temp_table}")
+        rows_read, file_hwm = cursor.fetchone()
+
+        print("Fusion des lignes modifiées...")
+        # Comme l'import complet : pas de vérification FK ligne à ligne
+        cursor.execute(f"ALTER TABLE {table_name} DISABLE TRIGGER ALL")
+        cursor.execute(SEARCH_DOCUMENT_PENDING_DDL)
+        with METRICS.stage('merge'):
+            # SIREN des lignes réellement écrites : documents à rafraîchir
+            cursor.execute(sql.SQL("""
+                WITH applied AS ({upsert} RETURNING siren),
+                pending AS (
+                    INSERT INTO search_document_pending (siren)
+                    SELECT DISTINCT siren FROM applied
+                    ON CONFLICT DO NOTHING
+                )
+                SELECT count(*) FROM applied
+            """).format(upsert=build_upsert_sql(table_name, temp_table, db_columns, key)),
+                {'hwm': hwm})
+        rows_applied = cursor.fetchone()[0]
+        cursor.execute(f"ALTER TABLE {table_name} ENABLE TRIGGER ALL")
+        METRICS.record_table(table_name, rows_applied)
+
+        new_hwm = max([d for d in (hwm, file_hwm) if d is not None], default=None)
+        cursor.execute("""
+            INSERT INTO import_state (table_name, high_water_mark, updated_at)
+            VALUES (%s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (table_name) DO UPDATE
+            SET high_water_mark = EXCLUDED.high_water_mark,
+                updated_at = EXCLUDED.updated_at
+        """, (table_name, new_hwm))
+        cursor.execute("""
+            INSERT INTO import_history
+                (file_hash, table_name, file_name, rows_read, rows_applied, high_water_mark)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (file_hash, table_name, os.path.basename(filepath), rows_read, rows_applied, new_hwm))
+
+        print("Validation des données...")
+        conn.commit()
+
+        elapsed = time.time() - start_time
+
+        print(f"\n{'='*70}")
+        print(f"IMPORT INCRÉMENTAL TERMINÉ")
+        print(f"{'='*70}")
+        print(f"Lignes lues       : {rows_read:,}")
+        print(f"Lignes appliquées : {rows_applied:,}")
+        print(f"High-water mark   : {new_hwm or 'aucun'}")
+        print(f"Durée totale      : {format_time(elapsed)}")
+        print(f"{'='*70}\n")
+
+        return rows_applied
+
+    except Exception as e:
+        conn.rollback()
+        print(f"\n\nERREUR : {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+        gc.collect()
+
+
+# Catalogue déclaratif des index secondaires, aligné sur docs/schema.sql
+# (python import_csv.py --print-index-ddl régénère la section du schéma).
+# (nom, table, définition après "ON table", extension requise)
+# L'ordre compte : sur une même table, les index sont lancés dans cet ordre.
+INDEX_CATALOG = [
+    # Unite legale
+    ('idx_ul_denomination', 'unite_legale', '(denomination)', None),
+    ('idx_ul_denomination_trgm', 'unite_legale', 'USING gin (denomination gin_trgm_ops)', 'pg_trgm'),
+    ('idx_ul_activite', 'unite_legale', '(activite_principale)', None),
+    ('idx_ul_categorie_juridique', 'unite_legale', '(categorie_juridique)', None),
+    ('idx_ul_categorie_entreprise', 'unite_legale', '(categorie_entreprise)', None),
+    ('idx_ul_etat', 'unite_legale', '(etat_administratif)', None),
+    ('idx_ul_tranche_effectifs', 'unite_legale', '(tranche_effectifs)', None),
+    # Etablissement
+    ('idx_etab_siren', 'etablissement', '(siren)', None),
+    # Partiel : sièges d'une liste de SIREN (app/utils/etablissements.py)
+    ('idx_etab_siege_siren', 'etablissement', '(siren) WHERE etablissement_siege', None),
+    ('idx_etab_etat', 'etablissement', '(etat_administratif)', None),
+    ('idx_etab_activite', 'etablissement', '(activite_principale)', None),
+    ('idx_etab_code_postal', 'etablissement', '(code_postal)', None),
+    ('idx_etab_commune', 'etablissement', '(libelle_commune)', None),
+    ('idx_etab_code_commune', 'etablissement', '(code_commune)', None),
+    ('idx_etab_denomination', 'etablissement', '(denomination_usuelle)', None),
+    # Index composites pour recherches fréquentes
+    ('idx_etab_siren_siege', 'etablissement', '(siren, etablissement_siege)', None),
+    ('idx_etab_cp_activite', 'etablissement', '(code_postal, activite_principale)', None),
+    # Cellules de 0,01° (recherche par rayon, app/utils/geo_search.py)
+    ('idx_etab_geo_cell', 'etablissement',
+     '(((floor(latitude * 100)::bigint + 9000) * 100000 + floor(longitude * 100)::bigint + 18000))'
+     ' WHERE latitude IS NOT NULL', None),
+    # Search document (filtres de search_api et des exports)
+    ('idx_sd_recherche', 'search_document', 'USING gin (recherche)', None),
+    ('idx_sd_nom_recherche_trgm', 'search_document', 'USING gin (nom_recherche gin_trgm_ops)', 'pg_trgm'),
+    ('idx_sd_siren_prefix', 'search_document', '(siren varchar_pattern_ops)', None),
+    ('idx_sd_activite', 'search_document', '(activite_principale varchar_pattern_ops)', None),
+    ('idx_sd_code_postal', 'search_document', '(code_postal varchar_pattern_ops)', None),
+    ('idx_sd_commune_trgm', 'search_document', 'USING gin (libelle_commune gin_trgm_ops)', 'pg_trgm'),
+    ('idx_sd_categorie', 'search_document', '(categorie_entreprise)', None),
+    # Tri par défaut : mêmes expressions que sort_keys (app/utils/search.py)
+    ('idx_sd_tri', 'search_document', "(COALESCE(etat_administratif, 'Z'), nom_complet, siren)", None),
+]
+
+# maintenance_work_mem de l'ensemble des connexions de construction d'index
+# (Mo), réparti entre elles sauf --index-memory (valeur par connexion)
+INDEX_MEMORY_BUDGET_MB = 2048
+MIN_INDEX_MEMORY_MB = 64
+
+
+def index_memory(workers):
+    """maintenance_work_mem par connexion : budget total réparti entre workers"""
+    return f"{max(MIN_INDEX_MEMORY_MB, INDEX_MEMORY_BUDGET_MB // max(1, workers))}MB"
+
+# Statistiques étendues sur les colonnes corrélées, alignées sur
+# docs/schema.sql : sans elles, l'optimiseur multiplie les sélectivités de
+# code_postal et libelle_commune comme si elles étaient indépendantes.
+# (nom, table, types de statistiques, colonnes)
+STATISTICS_CATALOG = [
+    ('stat_etab_localisation', 'etablissement', 'ndistinct, dependencies',
+     'code_postal, code_commune, libelle_commune'),
+    ('stat_etab_activite_etat', 'etablissement', 'ndistinct, dependencies, mcv',
+     'activite_principale, etat_administratif'),
+    ('stat_ul_activite_etat', 'unite_legale', 'ndistinct, dependencies, mcv',
+     'activite_principale, etat_administratif'),
+]
+
+# Ordre physique après chargement (--optimize) : index suivi par CLUSTER
+CLUSTER_INDEXES = {
+    'etablissement': 'idx_etab_siren_siege',
+}
+
+
+def index_ddl(idx_name, table, definition, suffix='', concurrently=False):
+    """CREATE INDEX d'une entrée du catalogue (suffix : génération ciblée)"""
+    return (f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}"
+            f"{idx_name}{suffix} ON {table}{suffix} {definition}")
+
+
+def statistics_ddl(stat_name, table, kinds, columns, suffix=''):
+    """CREATE STATISTICS d'une entrée du catalogue"""
+    return (f"CREATE STATISTICS {stat_name}{suffix} ({kinds}) "
+            f"ON {columns} FROM {table}{suffix}")
+
+
+def print_index_ddl():
+    """Affiche le DDL du catalogue, tel qu'attendu dans docs/schema.sql"""
+    for extension in sorted({ext for *_, ext in INDEX_CATALOG if ext}):
+        print(f"CREATE EXTENSION IF NOT EXISTS {extension};")
+    table = None
+    for idx_name, idx_table, definition, _ in INDEX_CATALOG:
+        if idx_table != table:
+            table = idx_table
+            print(f"\n-- Index sur {table}")
+        print(index_ddl(idx_name, idx_table, definition) + ';')
+
+    print("\n-- Statistiques étendues (colonnes corrélées)")
+    for stat_name, stat_table, kinds, columns in STATISTICS_CATALOG:
+        print(statistics_ddl(stat_name, stat_table, kinds, columns) + ';')
+
+
+def build_index_worker(entries, suffix, concurrently, memory):
+    """
+    Construit une suite d'index sur une connexion dédiée
+
+    Returns:
+        list: [(nom, durée en secondes)]
+    """
+    conn = get_connection()
+    conn.autocommit = True  # Requis pour CREATE INDEX CONCURRENTLY
+    cursor = conn.cursor()
+
+    timings = []
+    try:
+        cursor.execute("SET maintenance_work_mem = %s", (memory,))
+        for idx_name, table, definition, _ in entries:
+            start = time.perf_counter()
+            cursor.execute(f'DROP INDEX IF EXISTS {idx_name}{suffix}')
+            cursor.execute(index_ddl(idx_name, table, definition, suffix, concurrently))
+            elapsed = time.perf_counter() - start
+            METRICS.record_index(f"{idx_name}{suffix}", elapsed)
+            timings.append((idx_name, elapsed))
+        return timings
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def create_indexes(verbose=True, tables=None, suffix='', workers=DEFAULT_WORKERS,
+                   memory=None, names=None):
+    """
+    Crée les index du catalogue INDEX_CATALOG après l'import
+
+    tables : tables dont les index sont construits (par défaut unite_legale
+    et etablissement), names : sous-ensemble du catalogue à construire.
+    Les index sont construits en parallèle sur `workers` connexions, chacune
+    avec maintenance_work_mem = memory (par défaut INDEX_MEMORY_BUDGET_MB
+    réparti entre les connexions ouvertes). Avec suffix (ex. '_staging'), les
+    index sont construits sur les tables de staging, sans CONCURRENTLY
+    puisqu'aucune requête ne les lit encore : plusieurs index d'une même
+    table peuvent alors être construits simultanément. Sur les tables
+    actives, CREATE INDEX CONCURRENTLY ne peut pas s'exécuter deux fois en
+    même temps sur une table : ses index sont construits à la suite.
+
+    Sur une table partitionnée, chaque index est construit partition par
+    partition (en parallèle, CONCURRENTLY sur les tables actives) puis créé
+    sur la table mère, qui rattache les index existants sans rien
+    reconstruire.
+    """
+    if verbose:
+        print("\n" + "="*70)
+        print("CRÉATION DES INDEX")
+        print("="*70 + "\n")
+
+    tables = tables or list(PRIMARY_KEYS)
+    catalog = [
+        idx for idx in INDEX_CATALOG
+        if idx[1] in tables and (names is None or idx[0] in names)
+    ]
+    if not catalog:
+        return
+    concurrently = not suffix
+
+    # Dépendances : extensions requises avant tout index qui les utilise
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for extension in sorted({ext for *_, ext in catalog if ext}):
+            cursor.execute(f'CREATE EXTENSION IF NOT EXISTS {extension}')
+
+        # Index de table partitionnée : un index par partition, l'index de
+        # la table mère (supprimé d'abord avec ceux des partitions) à la fin
+        partitions = {t: list_partitions(cursor, t, suffix) for t in tables}
+        indexes = []
+        parent_indexes = []
+        for idx_name, table, definition, extension in catalog:
+            if not partitions.get(table):
+                indexes.append((idx_name, table, definition, extension))
+                continue
+            cursor.execute(f'DROP INDEX IF EXISTS {idx_name}{suffix}')
+            parent_indexes.append((idx_name, table, definition, extension))
+            indexes += [
+                (f"{idx_name}_{tag}", f"{table}_{tag}", definition, extension)
+                for tag in partitions[table]
+            ]
+        conn.commit()
     finally:
         cursor.close()
         conn.close()
 
+    # Suites ordonnées : une par table en CONCURRENTLY, une par index sinon.
+    # Une partition reçoit toujours ses index à la suite : les partitions
+    # sont nombreuses et ses pages restent en cache d'un index à l'autre.
+    partition_tables = {
+        f"{table}_{tag}" for table, tags in partitions.items() for tag in tags
+    }
+    chains = {}
+    for entry in indexes:
+        key = entry[1] if concurrently or entry[1] in partition_tables else entry[0]
+        chains.setdefault(key, []).append(entry)
+    tasks = list(chains.values())
+
+    workers = max(1, min(workers, len(tasks)))
+    memory = memory or index_memory(workers)
+    if verbose:
+        print(f"  {len(indexes)} index, {workers} connexion(s), "
+              f"maintenance_work_mem = {memory}\n")
+
+    index_start = time.perf_counter()
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(build_index_worker, chain, suffix, concurrently, memory)
+            for chain in tasks
+        ]
+        try:
+            for future in as_completed(futures):
+                for idx_name, elapsed in future.result():
+                    done += 1
+                    if verbose:
+                        print(f"  [{done}/{len(indexes)}] {idx_name}{suffix} : {format_time(elapsed)}")
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
+
+    if parent_indexes:
+        # Rattachement : CREATE INDEX sur la table mère réutilise l'index
+        # identique de chaque partition (pas de CONCURRENTLY possible)
+        conn = get_connection()
+        conn.autocommit = True
+        cursor = conn.cursor()
+        try:
+            for idx_name, table, definition, _ in parent_indexes:
+                cursor.execute(index_ddl(idx_name, table, definition, suffix))
+            if verbose:
+                print(f"  {len(parent_indexes)} index rattachés aux tables partitionnées")
+        finally:
+            cursor.close()
+            conn.close()
+
+    METRICS.add('index', time.perf_counter() - index_start)
+    if verbose:
+        print(f"\nIndex créés avec succès en {format_time(time.perf_counter() - index_start)} !")
 
-def analyze_tables(verbose=True):
+
+def create_statistics(cursor, tables, suffix=''):
+    """(Re)crée les statistiques étendues du catalogue, calculées par ANALYZE"""
+    for stat_name, table, kinds, columns in STATISTICS_CATALOG:
+        if table in tables:
+            cursor.execute(f'DROP STATISTICS IF EXISTS {stat_name}{suffix}')
+            cursor.execute(statistics_ddl(stat_name, table, kinds, columns, suffix))
+
+
+def analyze_tables(verbose=True, tables=None, suffix=''):
     """Met à jour les statistiques des tables pour l'optimiseur"""
     if verbose:
         print("\nMise à jour des statistiques (ANALYZE)...")
 
+    tables = tables or ['unite_legale', 'etablissement']
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        cursor.execute('ANALYZE unite_legale')
-        cursor.execute('ANALYZE etablissement')
-        conn.commit()
+        with METRICS.stage('analyze'):
+            create_statistics(cursor, tables, suffix)
+            for table in tables:
+                cursor.execute(f'ANALYZE {table}{suffix}')
+            conn.commit()
         if verbose:
             print("Statistiques mises à jour !")
     finally:
@@ -519,6 +3197,117 @@ def analyze_tables(verbose=True):
         conn.close()
 
 
+def maintenance_worker(statement, memory=None):
+    """Exécute une commande de maintenance (CLUSTER, VACUUM) hors transaction"""
+    conn = get_connection()
+    conn.autocommit = True  # VACUUM ne s'exécute pas dans une transaction
+    cursor = conn.cursor()
+    try:
+        if memory:
+            cursor.execute("SET maintenance_work_mem = %s", (memory,))
+        start = time.perf_counter()
+        cursor.execute(statement)
+        return time.perf_counter() - start
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run_maintenance(statements, workers, memory=None):
+    """Exécute des commandes de maintenance en parallèle sur `workers` connexions"""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(statements)))) as executor:
+        futures = [executor.submit(maintenance_worker, stmt, memory) for stmt in statements]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
+
+
+def cluster_tables(tables, suffix='', workers=DEFAULT_WORKERS, memory=None):
+    """
+    Trie physiquement les tables selon CLUSTER_INDEXES (--optimize)
+
+    etablissement est réécrite dans l'ordre (siren, etablissement_siege) :
+    les établissements d'un SIREN lus par la fiche entreprise tiennent sur
+    quelques pages contiguës au lieu d'une page chacun. CLUSTER reconstruit
+    tous les index de la table : à lancer avant create_indexes (et avant
+    SET LOGGED sur une table de staging), seul l'index de tri est construit
+    en plus. Les partitions sont triées en parallèle.
+    """
+    for table, idx_name in CLUSTER_INDEXES.items():
+        if table not in tables:
+            continue
+
+        print(f"\nTri physique de {table}{suffix} ({idx_name})...")
+        create_indexes(verbose=False, tables=[table], suffix=suffix, workers=workers,
+                       memory=memory, names=[idx_name])
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            tags = list_partitions(cursor, table, suffix)
+        finally:
+            cursor.close()
+            conn.close()
+
+        targets = [(f"{table}_{tag}", f"{idx_name}_{tag}") for tag in tags] or [(table, idx_name)]
+        start = time.perf_counter()
+        run_maintenance([
+            f"CLUSTER {target}{suffix} USING {index}{suffix}" for target, index in targets
+        ], workers, memory or index_memory(min(workers, len(targets))))
+        elapsed = time.perf_counter() - start
+        METRICS.add('cluster', elapsed)
+        print(f"  CLUSTER : {format_time(elapsed)}")
+
+
+def vacuum_tables(tables=None, suffix='', workers=DEFAULT_WORKERS):
+    """
+    VACUUM (FREEZE, ANALYZE) après chargement (--optimize), à la place d'ANALYZE
+
+    Les lignes chargées sont gelées et la visibility map remplie dès
+    maintenant : le premier autovacuum n'a plus à réécrire toute la table
+    pour le gel, et les index-only scans sont possibles dès la publication.
+    Les partitions sont gelées en parallèle, puis l'ANALYZE de la table mère
+    calcule ses statistiques et celles de chaque partition.
+    """
+    tables = tables or ['unite_legale', 'etablissement']
+    print("\nVACUUM (FREEZE, ANALYZE)...")
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        create_statistics(cursor, tables, suffix)
+        conn.commit()
+        partitions = {table: list_partitions(cursor, table, suffix) for table in tables}
+    finally:
+        cursor.close()
+        conn.close()
+
+    statements = []
+    for table in tables:
+        if partitions[table]:
+            statements += [f"VACUUM (FREEZE) {table}_{tag}{suffix}" for tag in partitions[table]]
+        else:
+            statements.append(f"VACUUM (FREEZE, ANALYZE) {table}{suffix}")
+
+    start = time.perf_counter()
+    run_maintenance(statements, workers)
+    elapsed = time.perf_counter() - start
+    METRICS.add('vacuum', elapsed)
+    print(f"  VACUUM : {format_time(elapsed)}")
+
+    parents = [table for table in tables if partitions[table]]
+    if parents:
+        start = time.perf_counter()
+        run_maintenance([f"ANALYZE {table}{suffix}" for table in parents], workers)
+        elapsed = time.perf_counter() - start
+        METRICS.add('analyze', elapsed)
+        print(f"  ANALYZE : {format_time(elapsed)}")
+
+
 def check_database_connection():
     """Vérifie la connexion à la base de données"""
     try:
@@ -552,43 +3341,152 @@ Exemples:
   # Importer tout depuis un dossier
   python import_csv.py --all /chemin/vers/dossier/
 
+  # Importer directement l'archive INSEE (décompression à la volée)
+  python import_csv.py -e /chemin/vers/StockEtablissement_utf8.zip
+
+  # Importer le fichier Parquet publié par l'INSEE (COPY binaire)
+  python import_csv.py -e /chemin/vers/StockEtablissement_utf8.parquet
+
   # Utiliser la méthode par chunks (si problème mémoire)
   python import_csv.py -u fichier.csv --method chunked
+
+  # Import parallèle (8 connexions COPY, tables chargées simultanément)
+  python import_csv.py --all /chemin/vers/dossier/ --method parallel --workers 8
+
+  # Import sans coupure : tables de staging, index, ANALYZE puis bascule
+  python import_csv.py --all /chemin/vers/dossier/ --swap
+
+  # Appliquer uniquement les lignes modifiées (stock ou fichier quotidien)
+  python import_csv.py -e StockEtablissement_utf8.csv --incremental
+
+  # Revenir à la génération précédente après une bascule
+  python import_csv.py --rollback
+
+  # Tri physique d'etablissement par SIREN et gel des lignes après chargement
+  python import_csv.py --all /chemin/vers/dossier/ --swap --optimize
+
+  # Etablissement partitionné par hash du SIREN (16 partitions)
+  python import_csv.py --all /chemin/vers/dossier/ --method parallel --partition hash:16
         """
     )
 
     parser.add_argument('--unite-legale', '-u',
-                        help='Chemin vers StockUniteLegale.csv')
+                        help='Chemin vers StockUniteLegale.csv (ou .zip, .parquet)')
     parser.add_argument('--etablissement', '-e',
-                        help='Chemin vers StockEtablissement.csv')
+                        help='Chemin vers StockEtablissement.csv (ou .zip, .parquet)')
     parser.add_argument('--all', '-a',
-                        help='Dossier contenant les deux fichiers CSV')
+                        help='Dossier contenant les deux fichiers CSV (ou .zip, .parquet)')
     parser.add_argument('--method', '-m',
-                        choices=['streaming', 'chunked'],
+                        choices=['streaming', 'chunked', 'parallel'],
                         default='streaming',
-                        help='Méthode d\'import (streaming=rapide COPY, chunked=par lots)')
+                        help='Méthode d\'import (streaming=rapide COPY, chunked=par lots, '
+                             'parallel=COPY multi-connexions)')
     parser.add_argument('--chunk-size', '-c',
                         type=int, default=50000,
                         help='Nombre de lignes par chunk (défaut: 50000)')
+    parser.add_argument('--workers', '-w',
+                        type=int, default=DEFAULT_WORKERS,
+                        help=f'Connexions COPY simultanées en mode parallel et connexions de '
+                             f'création d\'index (défaut: {DEFAULT_WORKERS})')
     parser.add_argument('--no-index',
                         action='store_true',
-                        help='Ne pas créer les index après import')
+                        help='Ne pas créer les index ni search_document après import '
+                             '(nouvelle génération publiée : snapshots périmés jusqu\'à --search-only)')
     parser.add_argument('--index-only',
                         action='store_true',
                         help='Créer uniquement les index (sans import)')
+    parser.add_argument('--swap',
+                        action='store_true',
+                        help='Import dans des tables de staging puis bascule atomique '
+                             '(toujours actif en mode parallel)')
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help='Fusionner uniquement les lignes plus récentes '
+                             '(date_dernier_traitement) sans vider les tables')
+    parser.add_argument('--rollback',
+                        action='store_true',
+                        help='Restaurer la génération précédente (*_previous) et quitter')
+    parser.add_argument('--search-only',
+                        action='store_true',
+                        help='Reconstruire uniquement la table search_document et quitter')
+    parser.add_argument('--backfill-gps',
+                        action='store_true',
+                        help='Calculer latitude/longitude des établissements déjà importés et quitter')
+    parser.add_argument('--partition',
+                        type=parse_partitioning,
+                        help='Disposition d\'etablissement : hash[:N] (hash du SIREN, '
+                             f'{DEFAULT_HASH_PARTITIONS} partitions par défaut), departement '
+                             '(préfixe du code postal) ou none (table unique) ; '
+                             'active --swap (défaut: disposition actuelle)')
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Méthode chunked : reprendre au dernier lot validé '
+                             '(points de reprise dans checkpoints/)')
+    parser.add_argument('--index-memory',
+                        help=f'maintenance_work_mem de chaque connexion de création '
+                             f'd\'index (défaut: {INDEX_MEMORY_BUDGET_MB} Mo au total, '
+                             f'répartis entre les connexions, au moins '
+                             f'{MIN_INDEX_MEMORY_MB} Mo chacune)')
+    parser.add_argument('--optimize',
+                        action='store_true',
+                        help='Après chargement : tri physique d\'etablissement par '
+                             '(siren, etablissement_siege) avec CLUSTER, puis '
+                             'VACUUM (FREEZE, ANALYZE) au lieu d\'ANALYZE')
+    parser.add_argument('--print-index-ddl',
+                        action='store_true',
+                        help='Afficher le DDL du catalogue d\'index (docs/schema.sql) et quitter')
+    parser.add_argument('--metrics-file',
+                        help='Résumé JSON des métriques par étape '
+                             '(défaut: metrics/import_AAAAMMJJ_HHMMSS.json)')
 
     args = parser.parse_args()
 
+    if args.print_index_ddl:
+        print_index_ddl()
+        sys.exit(0)
+
+    index_options = {'workers': max(1, args.workers), 'memory': args.index_memory}
+
+    if args.resume and (args.method != 'chunked' or args.incremental):
+        print("ERREUR : --resume n'est disponible qu'avec --method chunked")
+        sys.exit(1)
+
+    if args.partition and args.incremental:
+        print("ERREUR : --partition s'applique à un import complet (pas à --incremental)")
+        sys.exit(1)
+
     # Vérifier la connexion
     print("Vérification de la connexion à PostgreSQL...")
     if not check_database_connection():
         sys.exit(1)
     print("Connexion OK !\n")
 
+    # Colonnes ajoutées depuis la création du schéma (latitude/longitude)
+    upgrade_schema()
+
+    if args.backfill_gps:
+        backfill_gps()
+        sys.exit(0)
+
+    # Retour à la génération précédente
+    if args.rollback:
+        if rollback_generation():
+            build_search_document(index_options)
+        sys.exit(0)
+
     # Mode index uniquement
     if args.index_only:
-        create_indexes()
-        analyze_tables()
+        if args.optimize:
+            cluster_tables(list(PRIMARY_KEYS), **index_options)
+        create_indexes(**index_options)
+        if args.optimize:
+            vacuum_tables(workers=index_options['workers'])
+        else:
+            analyze_tables()
+        sys.exit(0)
+
+    if args.search_only:
+        build_search_document(index_options)
         sys.exit(0)
 
     # Chercher les fichiers si --all
@@ -600,39 +3498,142 @@ Exemples:
 
         for f in os.listdir(folder):
             fl = f.lower()
-            if 'unitelegale' in fl and fl.endswith('.csv'):
-                args.unite_legale = os.path.join(folder, f)
-                print(f"Trouvé : {args.unite_legale}")
-            elif 'etablissement' in fl and fl.endswith('.csv'):
-                args.etablissement = os.path.join(folder, f)
-                print(f"Trouvé : {args.etablissement}")
-
-    # Sélectionner la méthode d'import
+            if not is_supported_input(fl):
+                continue
+            # Un CSV déjà extrait est préféré à son archive zip, un Parquet
+            # (typé, lu par COPY binaire) est préféré aux deux
+            if 'unitelegale' in fl:
+                if not args.unite_legale or input_rank(fl) > input_rank(args.unite_legale):
+                    args.unite_legale = os.path.join(folder, f)
+            elif 'etablissement' in fl:
+                if not args.etablissement or input_rank(fl) > input_rank(args.etablissement):
+                    args.etablissement = os.path.join(folder, f)
+
+        for path in (args.unite_legale, args.etablissement):
+            if path:
+                print(f"Trouvé : {path}")
+
+    for path in (args.unite_legale, args.etablissement):
+        if path and not os.path.exists(path):
+            print(f"ERREUR : Fichier non trouvé : {path}")
+            sys.exit(1)
+        if path:
+            METRICS.record_file(path)
+        if path and is_parquet_file(path):
+            if not PYARROW_AVAILABLE:
+                print("ERREUR : pyarrow est requis pour lire un fichier Parquet (pip install pyarrow)")
+                sys.exit(1)
+            if args.method == 'chunked' and not args.incremental:
+                print("ERREUR : la méthode chunked ne lit que des CSV (utiliser streaming ou parallel)")
+                sys.exit(1)
+
+    # Import incrémental : UPSERT dans les tables actives, index conservés
+    if args.incremental:
+        applied = 0
+        if args.unite_legale:
+            applied += import_csv_incremental(args.unite_legale, 'unite_legale', UNITE_LEGALE_MAPPING)
+        if args.etablissement:
+            applied += import_csv_incremental(args.etablissement, 'etablissement', ETABLISSEMENT_MAPPING)
+        if applied:
+            analyze_tables(tables=[
+                t for t, p in (('unite_legale', args.unite_legale),
+                               ('etablissement', args.etablissement)) if p
+            ])
+        # Documents des SIREN modifiés uniquement (y compris ceux laissés en
+        # attente par une exécution interrompue)
+        refresh_search_document(index_options)
+        REJECTS.print_summary()
+        METRICS.context = {'method': 'incremental', 'rejects': REJECTS.counts()}
+        METRICS.write(args.metrics_file or default_metrics_path())
+        sys.exit(0)
+
+    # Import parallèle : les deux tables sont chargées en même temps
+    if args.method == 'parallel':
+        sources = []
+        if args.unite_legale:
+            sources.append((args.unite_legale, 'unite_legale', UNITE_LEGALE_MAPPING))
+        if args.etablissement:
+            sources.append((args.etablissement, 'etablissement', ETABLISSEMENT_MAPPING))
+        if sources:
+            import_csv_parallel(sources, workers=max(1, args.workers), partition=args.partition)
+
+    # Sélectionner la méthode d'import : changer de disposition passe par
+    # une table de staging
+    swap = args.swap or args.method == 'parallel' or args.partition is not None
     if args.method == 'streaming':
-        import_func = import_csv_streaming
+        import_func = lambda fp, tn, mp: import_csv_streaming(fp, tn, mp, swap=swap,
+                                                              partition=args.partition)
+    elif args.method == 'chunked':
+        import_func = lambda fp, tn, mp: import_csv_chunked(fp, tn, mp, args.chunk_size, swap=swap,
+                                                            resume=args.resume,
+                                                            partition=args.partition)
     else:
-        import_func = lambda fp, tn, mp: import_csv_chunked(fp, tn, mp, args.chunk_size)
+        import_func = None
 
     # Import des unités légales (d'abord car FK)
-    if args.unite_legale:
-        if not os.path.exists(args.unite_legale):
-            print(f"ERREUR : Fichier non trouvé : {args.unite_legale}")
-            sys.exit(1)
+    if args.unite_legale and import_func:
         import_func(args.unite_legale, 'unite_legale', UNITE_LEGALE_MAPPING)
 
     # Import des établissements
-    if args.etablissement:
-        if not os.path.exists(args.etablissement):
-            print(f"ERREUR : Fichier non trouvé : {args.etablissement}")
-            sys.exit(1)
+    if args.etablissement and import_func:
         import_func(args.etablissement, 'etablissement', ETABLISSEMENT_MAPPING)
 
+    loaded = [
+        table for table, path in (('unite_legale', args.unite_legale),
+                                  ('etablissement', args.etablissement))
+        if path
+    ]
+
+    # Bascule : index et statistiques construits avant publication
+    if swap and loaded:
+        # Tri encore UNLOGGED : CLUSTER n'écrit pas de WAL, SET LOGGED ensuite
+        if args.optimize:
+            cluster_tables(loaded, suffix=STAGING_SUFFIX, **index_options)
+        print("\nFinalisation des tables de staging...")
+        finalize_staging_tables(loaded, workers=index_options['workers'])
+        if not args.no_index:
+            create_indexes(tables=loaded, suffix=STAGING_SUFFIX, **index_options)
+        if args.optimize:
+            vacuum_tables(loaded, suffix=STAGING_SUFFIX, workers=index_options['workers'])
+        else:
+            analyze_tables(tables=loaded, suffix=STAGING_SUFFIX)
+        print("\nPublication des tables...")
+        publish_staging_tables(loaded)
+
     # Création des index
-    if not args.no_index and (args.unite_legale or args.etablissement):
-        create_indexes()
-        analyze_tables()
+    elif not args.no_index and loaded:
+        if args.optimize:
+            cluster_tables(loaded, **index_options)
+        create_indexes(**index_options)
+        if args.optimize:
+            vacuum_tables(workers=index_options['workers'])
+        else:
+            analyze_tables()
+
+    if args.method == 'chunked':
+        clear_checkpoints(loaded)
+
+    # Nouvelle génération dès que les tables actives ont changé, quels que
+    # soient les index ; search_document en publie une autre une fois à jour
+    if loaded:
+        mark_dataset_changed()
+
+    # Document de recherche reconstruit sur les tables publiées
+    if loaded and not args.no_index:
+        build_search_document(index_options)
 
     if args.unite_legale or args.etablissement:
+        REJECTS.print_summary()
+        METRICS.context = {
+            'method': args.method,
+            'workers': args.workers if args.method == 'parallel' else 1,
+            'swap': swap,
+            'partition': args.partition,
+            'optimize': args.optimize,
+            'rejects': REJECTS.counts(),
+        }
+        METRICS.write(args.metrics_file or default_metrics_path())
+
         print("\n" + "="*70)
         print("IMPORT COMPLET TERMINÉ !")
         print("="*70)
@@ -0,0 +1,31 @@
+"""
+Fixtures de test
+
+Les tests qui atteignent PostgreSQL sont ignorés sans TEST_DATABASE_URL
+(base jetable, par exemple postgresql://localhost/sirene_test).
+"""
+
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL non défini")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', TEST_DATABASE_URL or 'postgresql://localhost/sirene_test')
+    monkeypatch.setenv('SEARCH_CACHE_PATH', '')
+    monkeypatch.setenv('SQL_SLOW_LOG', str(tmp_path / 'slow_queries.log'))
+
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
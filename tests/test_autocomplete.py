@@ -0,0 +1,51 @@
+"""Index d'autocomplétion : snapshot et génération des données"""
+
+import pytest
+
+from app.utils import autocomplete
+from tests.conftest import requires_db
+
+ROWS = [('123456789', 'Boulangerie Martin', None, 3)]
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    monkeypatch.setattr(autocomplete, '_state', {'index': None, 'mtime': None, 'checked': 0.0})
+
+
+def test_snapshot_porte_la_generation(tmp_path):
+    path = str(tmp_path / 'autocomplete.idx')
+    autocomplete.write_snapshot(path, autocomplete.build_snapshot(ROWS, generation=7))
+
+    index = autocomplete.get_index(path, 7)
+    assert index.generation == 7
+    assert index.search('boul') == [('123456789', 'Boulangerie Martin')]
+
+
+def test_jamais_construit_pendant_une_requete(tmp_path, monkeypatch):
+    def load_rows():
+        raise AssertionError("index construit depuis la base")
+    monkeypatch.setattr(autocomplete, 'load_rows', load_rows)
+
+    assert autocomplete.get_index(str(tmp_path / 'absent.idx'), 1) is None
+
+
+@requires_db
+def test_sans_snapshot_503(client, app, tmp_path):
+    app.config['AUTOCOMPLETE_INDEX'] = str(tmp_path / 'absent.idx')
+
+    response = client.get('/search/autocomplete?q=boul')
+
+    assert response.status_code == 503
+
+
+def test_snapshot_perime_recharge_des_que_reecrit(tmp_path):
+    path = str(tmp_path / 'autocomplete.idx')
+    autocomplete.write_snapshot(path, autocomplete.build_snapshot(ROWS, generation=1))
+    assert autocomplete.get_index(path, 2).generation == 1
+
+    rows = ROWS + [('987654321', 'Pharmacie Durand', None, 1)]
+    autocomplete.write_snapshot(path, autocomplete.build_snapshot(rows, generation=2))
+    index = autocomplete.get_index(path, 2)
+    assert index.generation == 2
+    assert index.search('pharm') == [('987654321', 'Pharmacie Durand')]
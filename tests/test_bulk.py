@@ -0,0 +1,65 @@
+"""Recherche en masse (/search/bulk) : corps invalides -> 400, jamais 500"""
+
+import io
+
+from app.utils import bulk
+from tests.conftest import requires_db
+
+
+def post_ndjson(client, body):
+    return client.post('/search/bulk', data=body, content_type='application/x-ndjson')
+
+
+def post_csv(client, content):
+    return client.post(
+        '/search/bulk',
+        data={'file': (io.BytesIO(content), 'liste.csv')},
+        content_type='multipart/form-data'
+    )
+
+
+def test_corps_non_json(client):
+    response = client.post('/search/bulk', data='pas du json', content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_objet_sans_identifiants(client):
+    response = client.post('/search/bulk', json={'x': 1})
+    assert response.status_code == 400
+
+
+def test_liste_vide(client):
+    response = client.post('/search/bulk', json=[])
+    assert response.status_code == 400
+
+
+def test_ndjson_premiere_ligne_invalide(client):
+    response = post_ndjson(client, b'{pas du json\n"443061841"\n')
+    assert response.status_code == 400
+
+
+@requires_db
+def test_ndjson_ligne_invalide_en_cours(client):
+    response = post_ndjson(client, b'"443061841"\n"552032534"\n{pas du json\n')
+    assert response.status_code == 400
+    assert 'NDJSON' in response.get_json()['error']
+
+
+@requires_db
+def test_trop_d_identifiants(client, monkeypatch):
+    monkeypatch.setattr(bulk, 'MAX_IDENTIFIERS', 3)
+    response = client.post('/search/bulk', json=['443061841'] * 5)
+    assert response.status_code == 400
+
+
+def test_csv_non_utf8_en_tete(client):
+    response = post_csv(client, 'siren;dénomination\n443061841;Société\n'.encode('latin-1'))
+    assert response.status_code == 400
+
+
+@requires_db
+def test_csv_non_utf8_en_cours(client):
+    content = b'siren\n' + b'443061841\n' * 5000 + 'Société\n'.encode('latin-1')
+    response = post_csv(client, content)
+    assert response.status_code == 400
+    assert 'UTF-8' in response.get_json()['error']
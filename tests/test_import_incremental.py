@@ -0,0 +1,63 @@
+"""Import incrémental : fusion des lignes à partir du high-water mark"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+from tests.conftest import TEST_DATABASE_URL, requires_db
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'scripts'))
+import import_csv  # noqa: E402
+
+HWM = datetime(2024, 3, 1, 12, 0, 0)
+COLUMNS = ['siren', 'denomination', 'date_dernier_traitement']
+
+
+@pytest.fixture
+def cursor():
+    psycopg2 = pytest.importorskip('psycopg2')
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    cursor = conn.cursor()
+    # Schéma jetable : tout est annulé à la fin du test
+    cursor.execute("CREATE SCHEMA test_incremental")
+    cursor.execute("SET LOCAL search_path TO test_incremental")
+    cursor.execute("""
+        CREATE TABLE unite_legale (
+            siren VARCHAR(9) PRIMARY KEY,
+            denomination TEXT,
+            date_dernier_traitement TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE TABLE source (LIKE unite_legale)")
+    try:
+        yield cursor
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def merge(cursor, rows, hwm):
+    cursor.executemany("INSERT INTO source VALUES (%s, %s, %s)", rows)
+    cursor.execute(import_csv.build_upsert_sql('unite_legale', 'source', COLUMNS), {'hwm': hwm})
+    cursor.execute("SELECT siren, denomination FROM unite_legale ORDER BY siren")
+    return dict(cursor.fetchall())
+
+
+@requires_db
+def test_ligne_au_high_water_mark_appliquee(cursor):
+    cursor.execute("INSERT INTO unite_legale VALUES ('000000001', 'Existante', %s)", (HWM,))
+
+    result = merge(cursor, [
+        ('000000001', 'Rejouée', HWM),                      # déjà à jour
+        ('000000002', 'Même seconde', HWM),                 # nouvelle, à la borne
+        ('000000003', 'Ancienne', datetime(2024, 2, 1)),    # avant la borne
+        ('000000004', 'Récente', datetime(2024, 3, 2)),
+    ], HWM)
+
+    assert result == {
+        '000000001': 'Existante',
+        '000000002': 'Même seconde',
+        '000000004': 'Récente',
+    }
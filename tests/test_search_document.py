@@ -0,0 +1,17 @@
+"""Document de recherche : champs dérivés utilisés par les exports"""
+
+import pytest
+
+from app.models import SearchDocument
+
+
+@pytest.mark.parametrize('adresse, code_postal, ville, attendu', [
+    ('12 RUE DE LA PAIX, BAT A, 75002 PARIS', '75002', 'PARIS', '12 RUE DE LA PAIX, BAT A'),
+    ('75002 PARIS', '75002', 'PARIS', ''),
+    ('1 RUE DU PORT, 13001', '13001', None, '1 RUE DU PORT'),
+    (None, None, None, ''),
+])
+def test_adresse_voie_sans_code_postal_ni_ville(adresse, code_postal, ville, attendu):
+    document = SearchDocument(adresse=adresse, code_postal=code_postal, libelle_commune=ville)
+
+    assert document.adresse_voie == attendu
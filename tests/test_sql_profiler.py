@@ -0,0 +1,57 @@
+"""Instrumentation SQL : mesures par requête, EXPLAIN hors du chemin de la requête"""
+
+import time
+
+import pytest
+
+from app.utils import sql_profiler
+from tests.conftest import requires_db
+
+
+@pytest.fixture
+def profiled_app(app, monkeypatch):
+    monkeypatch.setenv('SQL_PROFILING', '1')
+    monkeypatch.setenv('SQL_EXPLAIN', '1')
+    monkeypatch.setenv('SQL_SLOW_MS', '0')
+    from app import create_app
+    return create_app()
+
+
+def test_desactivee_par_defaut(app):
+    assert app.config['SQL_PROFILING'] is False
+    assert app.config['SQL_EXPLAIN'] is False
+
+
+@requires_db
+def test_explain_ne_retarde_pas_la_reponse(profiled_app, monkeypatch):
+    monkeypatch.setattr(sql_profiler, 'explain', lambda *args: time.sleep(1) or 'plan')
+
+    started = time.perf_counter()
+    response = profiled_app.test_client().get('/entreprise/000000000/json')
+    elapsed = time.perf_counter() - started
+
+    assert 'db;dur=' in response.headers['Server-Timing']
+    assert elapsed < 0.5
+
+
+@requires_db
+def test_explain_ne_reexecute_pas_une_cte_d_ecriture(app):
+    from sqlalchemy import text
+    from app import db
+
+    with app.app_context():
+        engine = db.engine
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE IF NOT EXISTS test_profiler_ecriture (n INTEGER)"))
+        try:
+            with pytest.raises(Exception, match='read-only'):
+                sql_profiler.explain(
+                    engine,
+                    "WITH ajout AS (INSERT INTO test_profiler_ecriture VALUES (1) RETURNING n) "
+                    "SELECT n FROM ajout",
+                    None
+                )
+            assert 'Seq Scan' in sql_profiler.explain(engine, "SELECT n FROM test_profiler_ecriture", None)
+        finally:
+            with engine.begin() as connection:
+                connection.execute(text("DROP TABLE test_profiler_ecriture"))